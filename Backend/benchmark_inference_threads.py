@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+AgriNova Inference Thread Benchmark
+
+Times crop probability inference for a range of batch sizes with different
+thread counts, for the flat forest and the sklearn model, and reports the
+crossover: the smallest batch size from which parallel inference is clearly
+faster than one thread. Set INFERENCE_PARALLEL_MIN_ROWS to that value on the
+serving machine (run the benchmark there, with the same core count).
+
+Native BLAS/OpenMP pools are pinned to one thread, as in the API.
+
+Usage: python benchmark_inference_threads.py [--threads 1,2,4] [--sizes 1,32,256,1024,4096]
+                                             [--repeat 5] [--engine flat|sklearn|both]
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from joblib import parallel_config
+from controllers.prediction_controller import (
+    load_models,
+    model_registry,
+    build_feature_matrix,
+    historical_weather,
+    get_season_rainfall,
+    serving_model,
+    inference_threads,
+    ALL_FEATURE_COLUMNS
+)
+from models.prediction_model import PredictionInput
+from utils.model_bundle import ModelBundle, current_bundle_path
+from config.constants import MODEL_BUNDLES_DIR
+
+SPEEDUP_THRESHOLD = 1.1  # parallel must be at least 10% faster to count
+
+
+def parse_ints(value: str) -> list:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def sample_features(generation, n_rows: int) -> np.ndarray:
+    """Scaled feature rows from the serving grid (city × season × soil × water × temperature), tiled to n_rows"""
+    label_encoders = generation.label_encoders
+    inputs, weathers = [], []
+    for city, season in itertools.product(generation.cities, label_encoders['Season'].classes_.tolist()):
+        base_weather = historical_weather(city, 'Gujarat', get_season_rainfall(city, season, generation), generation)
+        for soil_type, water in itertools.product(label_encoders['Soil Type'].classes_.tolist(),
+                                                  label_encoders['Water_Availability'].classes_.tolist()):
+            inputs.append(PredictionInput(state='Gujarat', city=city, season=season, soil_type=soil_type,
+                                          water_availability=water, area=1.0))
+            weathers.append(base_weather)
+    features = build_feature_matrix(inputs, weathers, generation)
+
+    # Vary temperature so rows take different paths through the trees
+    rng = np.random.default_rng(42)
+    rows = features[rng.integers(0, len(features), n_rows)]
+    rows[:, ALL_FEATURE_COLUMNS.index('avgTemp')] = rng.uniform(5, 45, n_rows)
+
+    import pandas as pd
+    selected = generation.feature_selector.transform(pd.DataFrame(rows, columns=ALL_FEATURE_COLUMNS))
+    return generation.scaler.transform(selected)
+
+
+def load_sklearn_model(generation):
+    if generation.rf_model is not None:
+        return generation.rf_model
+    bundle_path = current_bundle_path(MODEL_BUNDLES_DIR)
+    return serving_model(ModelBundle.open(bundle_path).load_model()) if bundle_path else None
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median wall time in milliseconds (after one untimed warm-up call)"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def benchmark(name: str, predict, features: np.ndarray, sizes: list, threads: list, repeat: int):
+    print(f"\n🌲 {name}")
+    print("   " + "rows".rjust(7) + "".join(f"{t:>4} thr (ms)".rjust(14) for t in threads) + "   best speedup")
+
+    crossover = None
+    for size in sizes:
+        X = features[:size]
+        timings = [time_call(lambda: predict(X, n_threads), repeat) for n_threads in threads]
+        speedup = timings[0] / min(timings)
+        print("   " + f"{size:>7}" + "".join(f"{ms:>14.2f}" for ms in timings) + f"   {speedup:>6.2f}x")
+        if speedup >= SPEEDUP_THRESHOLD:
+            crossover = crossover or size
+        else:
+            crossover = None  # must stay faster for every larger batch too
+
+    if crossover is None:
+        print(f"   ➡️ No crossover: one thread is as fast for every batch size up to {sizes[-1]:,} rows")
+    else:
+        print(f"   ➡️ Crossover at {crossover:,} rows: set INFERENCE_PARALLEL_MIN_ROWS={crossover}")
+    return crossover
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark single-threaded vs parallel inference")
+    parser.add_argument("--threads", type=parse_ints,
+                        default=sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1))))
+    parser.add_argument("--sizes", type=parse_ints, default=[1, 8, 32, 128, 512, 1024, 2048, 4096, 8192])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", choices=["flat", "sklearn", "both"], default="both")
+    args = parser.parse_args()
+    threads = sorted(set(args.threads) | {1})
+    sizes = sorted(args.sizes)
+
+    print("🌾 AgriNova Inference Thread Benchmark")
+    print("=" * 60)
+    if not load_models():
+        print("❌ Models not loaded. Please run: python train_simple_model.py")
+        raise SystemExit(1)
+    generation = model_registry.current
+    inference_threads.limit_native_threads()
+    print(f"🖥️ {cpu_count} CPU cores, threads tested: {threads}, batch sizes: {sizes}")
+
+    features = sample_features(generation, max(sizes))
+    pool = ThreadPoolExecutor(max_workers=max(threads))
+
+    if args.engine in ("flat", "both") and generation.forest_engine is not None:
+        forest = generation.forest_engine
+        benchmark("Flat forest (row chunks on a thread pool)",
+                  lambda X, n: forest.predict_proba(X, n_chunks=n, executor=pool if n > 1 else None),
+                  features, sizes, threads, args.repeat)
+
+    if args.engine in ("sklearn", "both"):
+        model = load_sklearn_model(generation)
+        if model is None:
+            print("\n⚠️ sklearn model not available, skipped")
+        else:
+            def predict_sklearn(X, n):
+                with parallel_config(backend="threading", n_jobs=n):
+                    return model.predict_proba(X)
+            benchmark("scikit-learn (joblib threads)", predict_sklearn, features, sizes, threads, args.repeat)
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
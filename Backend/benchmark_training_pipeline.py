@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+AgriNova Training Pipeline Benchmark
+
+Times each preprocessing stage of train_simple_model.py (clean, feature
+engineering, categorical encoding, season filtering, crop balancing) on the
+real dataset and on synthetic datasets up to 10M rows, to show how the
+vectorized pipeline scales as years of district data are added.
+
+Synthetic rows are real rows drawn with replacement, with numerical columns
+jittered by ±5% so lookups and thresholds see varied values. For sizes up to
+--legacy-max-rows, the previous row-wise season filter (df.apply) is timed
+alongside for comparison.
+
+Usage: python benchmark_training_pipeline.py [--sizes 8436,100000,1000000,10000000]
+                                             [--chunk-rows N] [--workers N] [--legacy-max-rows 100000]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.regions import RegionRegistry
+from utils.training_data import (
+    NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS, timed_stage, load_dataset, clean_dataset, dataset_feature_inputs,
+    engineer_dataset, encode_categoricals, season_filter_mask, balance_crops, is_season_appropriate
+)
+
+DATASET_PATH = 'data/Final_dataset.csv'
+STAGES = ['clean', 'features', 'encode', 'season filter', 'balance']
+JITTER = 0.05
+
+
+def parse_ints(value: str) -> list:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def synthetic_dataset(source: pd.DataFrame, n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """n_rows real rows drawn with replacement (categoricals keep their dtype), numerical columns jittered"""
+    if n_rows == len(source):
+        return source.copy()
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(source), n_rows)
+    df = source.iloc[picks].reset_index(drop=True)
+    for col in NUMERICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].to_numpy() * rng.uniform(1 - JITTER, 1 + JITTER, n_rows)
+    return df
+
+
+def run_pipeline(df: pd.DataFrame, regions: RegionRegistry, calendar: dict, chunk_rows, executor) -> dict:
+    """Stage timings (seconds) of the training preprocessing on df"""
+    timings = {}
+    with timed_stage(timings, 'clean'):
+        df = clean_dataset(df)
+    with timed_stage(timings, 'features'):
+        engineered = engineer_dataset(regions, dataset_feature_inputs(df), chunk_rows=chunk_rows, executor=executor)
+        for name, values in engineered.items():
+            df[name] = values
+    with timed_stage(timings, 'encode'):
+        encode_categoricals(df, CATEGORICAL_COLUMNS)
+    with timed_stage(timings, 'season filter'):
+        df = df[season_filter_mask(df['Crop'], df['Season'], calendar)]
+    with timed_stage(timings, 'balance'):
+        balance_crops(df, min_samples=50, max_samples=800)
+    return timings
+
+
+def legacy_season_filter(df: pd.DataFrame, calendar: dict) -> float:
+    """Seconds taken by the previous row-wise season filter"""
+    start = time.perf_counter()
+    df[df.apply(lambda row: is_season_appropriate(row['Crop'], row['Season'], calendar), axis=1)]
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the training preprocessing pipeline")
+    parser.add_argument("--sizes", type=parse_ints, default=[8436, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--legacy-max-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print("🌾 AgriNova Training Pipeline Benchmark")
+    print("=" * 60)
+    regions = RegionRegistry.load('data/gujarat_regions.json')
+    with open('data/gujarat_crop_calendar.json') as f:
+        calendar = json.load(f)
+    source = load_dataset(DATASET_PATH)
+    executor = ThreadPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    print(f"📊 Source dataset: {len(source):,} rows; chunk rows: {args.chunk_rows or 'none'}, "
+          f"workers: {args.workers}")
+
+    header = ["rows".rjust(12)] + [stage.rjust(14) for stage in STAGES]
+    header += ["total (s)".rjust(10), "rows/s".rjust(12), "legacy filter".rjust(14)]
+    print("\n" + " ".join(header))
+
+    for n_rows in sorted(args.sizes):
+        df = synthetic_dataset(source, n_rows)
+        timings = run_pipeline(df, regions, calendar, args.chunk_rows, executor)
+        total = sum(timings.values())
+        legacy = f"{legacy_season_filter(df, calendar):13.2f}s" if n_rows <= args.legacy_max_rows else "-"
+        row = [f"{n_rows:12,}"] + [f"{timings[stage]:13.3f}s" for stage in STAGES]
+        row += [f"{total:10.2f}", f"{n_rows / total:12,.0f}", legacy.rjust(14)]
+        print(" ".join(row))
+        del df
+
+    if executor is not None:
+        executor.shutdown()
+    print("\n➡️ Stage times should grow linearly with rows; train with --chunk-rows to bound memory on large data")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 # Password Reset OTP Settings
 MAX_PASSWORD_RESET_ATTEMPTS = 3
 PASSWORD_RESET_BLOCK_DURATION_HOURS = 1
@@ -19,3 +21,100 @@ CONTACT_ERROR_PHONE_DIGITS_ONLY = "Phone number must contain only digits"
 CONTACT_ERROR_MESSAGE_TOO_SHORT = f"Message must be at least {CONTACT_MESSAGE_MIN_LENGTH} characters"
 CONTACT_ERROR_MESSAGE_TOO_LONG = f"Message must not exceed {CONTACT_MESSAGE_MAX_LENGTH} characters"
 CONTACT_ERROR_RATE_LIMIT = "You've already submitted a query recently. Please wait {days} more day(s) before submitting again."
+
+# Prediction Settings
+MAX_BATCH_PREDICTION_SIZE = 5000
+PREDICTION_TOP_K = int(os.getenv("PREDICTION_TOP_K", "6"))  # Crops kept per prediction (before profit sort)
+
+# Inference Micro-Batching Settings
+INFERENCE_BATCHING_ENABLED = os.getenv("INFERENCE_BATCHING_ENABLED", "true").lower() == "true"
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "32"))
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "3"))
+
+# Inference Executor Settings
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", "2"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "5"))
+INFERENCE_RETRY_AFTER_SECONDS = 1
+
+# Flat Forest Inference Settings
+FLAT_FOREST_ENABLED = os.getenv("FLAT_FOREST_ENABLED", "true").lower() == "true"
+FOREST_FORMAT = os.getenv("FOREST_FORMAT", "flat")  # "flat" (exact) or "compact" (quantized, ~3x smaller)
+
+# Precomputed Recommendation Table Settings
+RECOMMENDATION_TABLE_ENABLED = os.getenv("RECOMMENDATION_TABLE_ENABLED", "true").lower() == "true"
+RECOMMENDATION_TABLE_TEMP_MIN = 5  # °C, inclusive (1 °C buckets)
+RECOMMENDATION_TABLE_TEMP_MAX = 45
+# Coarse bins for the other live weather inputs: field → (bin edges, value scored for each bin)
+RECOMMENDATION_TABLE_WEATHER_BINS = {
+    "precipitation": ([0.0, float("inf")], [0.0]),  # mm in the last hour; the model does not separate these
+    "vap_pressure": ([0.0, 10.0, 20.0, 30.0, 40.0, float("inf")], [5.0, 15.0, 25.0, 35.0, 45.0]),  # hPa
+    "cloud_cover": ([0.0, 25.0, 50.0, 75.0, float("inf")], [12.5, 37.5, 62.5, 87.5]),  # %
+}
+
+# Weather Refresh Settings
+WEATHER_REFRESH_INTERVAL_SECONDS = int(os.getenv("WEATHER_REFRESH_INTERVAL_SECONDS", "900"))
+
+# Prediction Result Cache Settings
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_MAX_SIZE = int(os.getenv("PREDICTION_CACHE_MAX_SIZE", "4096"))
+PREDICTION_CACHE_TTL_SECONDS = WEATHER_REFRESH_INTERVAL_SECONDS  # cached results expire with the weather
+
+# Weather Cache Settings
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", str(WEATHER_REFRESH_INTERVAL_SECONDS)))
+WEATHER_CACHE_MAX_STALE_SECONDS = int(os.getenv("WEATHER_CACHE_MAX_STALE_SECONDS", "21600"))  # serve stale up to 6h
+WEATHER_FAILURE_TTL_SECONDS = 60  # how long a failed upstream lookup is remembered
+WEATHER_API_TIMEOUT_SECONDS = 10
+
+# Weather Prefetch Settings
+WEATHER_PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH_ENABLED", "true").lower() == "true"
+WEATHER_PREFETCH_GROUP_SIZE = 20  # OpenWeatherMap group endpoint limit
+WEATHER_PREFETCH_REQUEST_GAP_SECONDS = float(os.getenv("WEATHER_PREFETCH_REQUEST_GAP_SECONDS", "1.1"))
+WEATHER_PREFETCH_JITTER_SECONDS = 5.0
+
+# Outbound HTTP Settings
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))  # per service
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF_SECONDS = 0.2  # doubled after every attempt
+EMAIL_API_TIMEOUT_SECONDS = 30
+GOOGLE_API_TIMEOUT_SECONDS = 15
+
+# Weather Circuit Breaker Settings
+WEATHER_LATENCY_BUDGET_MS = float(os.getenv("WEATHER_LATENCY_BUDGET_MS", "300"))
+WEATHER_BREAKER_FAILURE_THRESHOLD = int(os.getenv("WEATHER_BREAKER_FAILURE_THRESHOLD", "5"))
+WEATHER_BREAKER_RESET_SECONDS = float(os.getenv("WEATHER_BREAKER_RESET_SECONDS", "30"))
+WEATHER_BREAKER_HALF_OPEN_MAX_CALLS = 1
+
+# Weather History Settings
+WEATHER_HISTORY_ENABLED = os.getenv("WEATHER_HISTORY_ENABLED", "true").lower() == "true"
+WEATHER_OBSERVATION_RETENTION_DAYS = 30  # raw observations; rollups are kept
+WEATHER_WRITER_BATCH_SIZE = 100
+WEATHER_WRITER_FLUSH_SECONDS = 5
+WEATHER_WRITER_MAX_BUFFER = 10000
+WEATHER_ROLLUP_INTERVAL_SECONDS = 3600
+WEATHER_RECENT_AVERAGE_DAYS = 7
+WEATHER_HISTORY_MAX_DAYS = 365
+
+# Model Artifact Paths (resolved from the Backend directory, not the working directory)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+TRAINED_MODELS_DIR = os.path.join(BACKEND_DIR, "trained_models")
+MODEL_BUNDLES_DIR = os.getenv("MODEL_BUNDLES_DIR", os.path.join(TRAINED_MODELS_DIR, "bundles"))
+MODEL_BUNDLES_KEEP = int(os.getenv("MODEL_BUNDLES_KEEP", "5"))  # newest bundles kept when training writes a new one
+SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", os.path.join(TRAINED_MODELS_DIR, "search_cache"))  # halving fold scores
+STAGE_CACHE_DIR = os.getenv("STAGE_CACHE_DIR", os.path.join(TRAINED_MODELS_DIR, "stage_cache"))  # training stage outputs
+STAGE_CACHE_KEEP = int(os.getenv("STAGE_CACHE_KEEP", "5"))  # newest cached runs kept per stage
+
+# Model Loading Settings
+MODEL_WATCH_ENABLED = os.getenv("MODEL_WATCH_ENABLED", "true").lower() == "true"
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "10"))
+MODEL_LOAD_IN_BACKGROUND = os.getenv("MODEL_LOAD_IN_BACKGROUND", "false").lower() == "true"
+
+# Inference Thread Budget Settings
+# Threads for model inference on this machine, shared by all serving processes
+INFERENCE_GLOBAL_THREADS = int(os.getenv("INFERENCE_GLOBAL_THREADS", str(os.cpu_count() or 1)))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # uvicorn/gunicorn worker processes
+INFERENCE_THREADS_PER_CALL = int(os.getenv("INFERENCE_THREADS_PER_CALL", "0"))  # 0 = the whole per-process share
+INFERENCE_PARALLEL_MIN_ROWS = int(os.getenv("INFERENCE_PARALLEL_MIN_ROWS", "1024"))  # see benchmark_inference_threads.py
@@ -1,7 +1,9 @@
 import os
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import CollectionInvalid
 from contextlib import asynccontextmanager
+from config.constants import WEATHER_HISTORY_ENABLED, WEATHER_OBSERVATION_RETENTION_DAYS
 
 load_dotenv()
 
@@ -12,6 +14,23 @@ database = client["Agrinova"]
 users = database["users"]
 reset_otps = database["password_reset_otps"]
 reset_limits = database["password_reset_limits"]
+weather_observations = database["weather_observations"]
+weather_rollups = database["weather_rollups"]
+
+async def ensure_weather_collections():
+    """Create the weather observation time-series collection (once) and rollup indexes"""
+    if "weather_observations" not in await database.list_collection_names():
+        try:
+            await database.create_collection(
+                "weather_observations",
+                timeseries={"timeField": "timestamp", "metaField": "location", "granularity": "minutes"},
+                expireAfterSeconds=WEATHER_OBSERVATION_RETENTION_DAYS * 24 * 3600
+            )
+        except CollectionInvalid:
+            pass  # another worker created it between the check and the create
+    await weather_rollups.create_index(
+        [("city", 1), ("state", 1), ("granularity", 1), ("period", 1)], unique=True
+    )
 
 @asynccontextmanager
 async def lifespan(app):
@@ -22,6 +41,8 @@ async def lifespan(app):
     await reset_otps.create_index("expiresAt", expireAfterSeconds=0)
     await reset_limits.create_index("userId", unique=True)
     await reset_limits.create_index("blockedUntil", expireAfterSeconds=0)
+    if WEATHER_HISTORY_ENABLED:
+        await ensure_weather_collections()
 
     yield
 
@@ -0,0 +1,17 @@
+from fastapi import Depends
+from middlewares.auth_middlewares import admin_only
+from controllers import prediction_controller
+
+
+async def reload_models(user_data = Depends(admin_only)):
+    """
+    Reload the models from the current artifacts without downtime
+    - Loads and warms the new model generation in the background
+    - Swaps it in atomically; in-flight requests finish on the old one
+    - Invalidates caches that depend on the model
+    """
+    return await prediction_controller.reload_models(reason=f"admin:{user_data['email']}")
+
+async def get_model_status(user_data = Depends(admin_only)):
+    """Active model version, generation number and reload history"""
+    return prediction_controller.model_registry.stats(detailed=True)
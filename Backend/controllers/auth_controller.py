@@ -153,7 +153,7 @@ async def forgot_password(data: ForgotPasswordRequest):
     )
 
     # 📧 SEND EMAIL
-    send_otp_email(
+    await send_otp_email(
         to_email=user["email"],
         user_name=user["name"],
         otp=otp,
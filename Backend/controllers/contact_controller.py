@@ -57,7 +57,7 @@ async def submit_contact(data: ContactRequest):
     # Send emails (don't fail request if emails fail)
     try:
         # 1. Send to admin
-        send_contact_admin_email(
+        await send_contact_admin_email(
             name=data.name,
             email=data.email,
             phone=data.phone,
@@ -65,7 +65,7 @@ async def submit_contact(data: ContactRequest):
         )
         
         # 2. Send thank you to user
-        send_contact_user_email(
+        await send_contact_user_email(
             name=data.name,
             email=data.email,
             message=data.message
@@ -0,0 +1,31 @@
+"""
+Health Controller
+
+Probes for load balancers and orchestrators:
+- /health/live: the process is up and serving HTTP
+- /health/ready: the models are loaded and warmed, so traffic can be routed here
+"""
+
+from fastapi.responses import JSONResponse
+from controllers import prediction_controller
+from utils.startup_timer import startup_timer
+
+
+async def liveness():
+    """Always 200 while the event loop is responsive"""
+    return {"status": "alive"}
+
+async def readiness():
+    """200 once a warmed model generation is active, 503 before that (loading, or no models trained)"""
+    registry = prediction_controller.model_registry
+    body = {
+        "status": "ready" if registry.current is not None else (
+            "loading" if prediction_controller.models_loading() else "not_ready"
+        ),
+        "model_version": getattr(registry.current, "version", None),
+        "startup_seconds": startup_timer.stats(),
+    }
+    if registry.current is None:
+        body["error"] = registry.last_error_type  # class only; the message is on the admin endpoint
+        return JSONResponse(status_code=503, content=body)
+    return body
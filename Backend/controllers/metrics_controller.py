@@ -0,0 +1,50 @@
+from fastapi import Depends
+from controllers import prediction_controller
+from controllers.weather_history_controller import weather_history_stats
+from utils.http_client import http_client_stats
+from middlewares.auth_middlewares import admin_only
+from utils.startup_timer import startup_timer
+
+
+async def get_metrics(user_data = Depends(admin_only)):
+    """
+    Runtime counters for monitoring (admin only)
+    - Startup phase timings (seconds since process start)
+    - Model registry (active version, generation, reloads)
+    - Forest engine format and array memory
+    - Prediction result cache (size, hits, misses, evictions)
+    - Precomputed recommendation table hits, misses and hit rate
+    - Inference micro-batching scheduler, executor and thread budget
+    - Weather observation cache (fresh/stale hits, coalesced upstream calls)
+    - Background weather prefetcher (last successful refresh per city)
+    - Weather circuit breaker state and fallback counts
+    - Weather history writer and rollups
+    - Outbound HTTP clients (requests, retries, errors, latency)
+    """
+    generation = prediction_controller.model_registry.current
+    table_stats = prediction_controller.recommendation_table_stats
+    table_lookups = table_stats["hits"] + table_stats["misses"]
+    forest_engine = generation.forest_engine if generation is not None else None
+    return {
+        "startup_seconds": startup_timer.stats(),
+        "model_registry": prediction_controller.model_registry.stats(),
+        "forest_engine": {
+            "type": type(forest_engine).__name__ if forest_engine is not None else None,
+            "bytes": forest_engine.nbytes if forest_engine is not None else 0,
+        },
+        "prediction_cache": prediction_controller.prediction_cache.stats(),
+        "recommendation_table": {
+            "loaded": generation is not None and generation.recommendation_table is not None,
+            **table_stats,
+            "hit_rate": round(table_stats["hits"] / table_lookups, 4) if table_lookups else 0.0,
+        },
+        "inference_scheduler": prediction_controller.inference_scheduler.stats(),
+        "inference_executor": prediction_controller.inference_executor.stats(),
+        "inference_threads": prediction_controller.inference_threads.stats(),
+        "weather_cache": prediction_controller.weather_store.stats(),
+        "weather_prefetcher": prediction_controller.weather_prefetcher.stats(),
+        "weather_breaker": prediction_controller.weather_breaker.stats(),
+        "weather_fallback": prediction_controller.weather_fallback_stats,
+        "weather_history": weather_history_stats(),
+        "http_clients": http_client_stats(),
+    }
@@ -19,33 +19,107 @@ Database Structure:
 """
 
 from fastapi import HTTPException
-from models.prediction_model import PredictionInput, CropRecommendation, WeatherData
-from typing import List
-import pandas as pd
-import joblib
+from models.prediction_model import PredictionInput, CropRecommendation, WeatherData, PredictionResponse
+from config.constants import (
+    MAX_BATCH_PREDICTION_SIZE,
+    INFERENCE_BATCHING_ENABLED,
+    INFERENCE_BATCH_MAX_SIZE,
+    INFERENCE_BATCH_MAX_WAIT_MS,
+    INFERENCE_EXECUTOR,
+    INFERENCE_MAX_WORKERS,
+    INFERENCE_MAX_QUEUE,
+    INFERENCE_TIMEOUT_SECONDS,
+    INFERENCE_RETRY_AFTER_SECONDS,
+    INFERENCE_GLOBAL_THREADS,
+    WEB_CONCURRENCY,
+    INFERENCE_THREADS_PER_CALL,
+    INFERENCE_PARALLEL_MIN_ROWS,
+    FLAT_FOREST_ENABLED,
+    FOREST_FORMAT,
+    RECOMMENDATION_TABLE_ENABLED,
+    RECOMMENDATION_TABLE_TEMP_MIN,
+    RECOMMENDATION_TABLE_TEMP_MAX,
+    RECOMMENDATION_TABLE_WEATHER_BINS,
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_MAX_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS,
+    PREDICTION_TOP_K,
+    DATA_DIR,
+    TRAINED_MODELS_DIR,
+    MODEL_BUNDLES_DIR,
+    WEATHER_CACHE_TTL_SECONDS,
+    WEATHER_CACHE_MAX_STALE_SECONDS,
+    WEATHER_FAILURE_TTL_SECONDS,
+    WEATHER_REFRESH_INTERVAL_SECONDS,
+    WEATHER_PREFETCH_ENABLED,
+    WEATHER_PREFETCH_GROUP_SIZE,
+    WEATHER_PREFETCH_REQUEST_GAP_SECONDS,
+    WEATHER_PREFETCH_JITTER_SECONDS,
+    WEATHER_LATENCY_BUDGET_MS,
+    WEATHER_BREAKER_FAILURE_THRESHOLD,
+    WEATHER_BREAKER_RESET_SECONDS,
+    WEATHER_BREAKER_HALF_OPEN_MAX_CALLS,
+    MODEL_WATCH_ENABLED,
+    MODEL_WATCH_INTERVAL_SECONDS,
+    MODEL_LOAD_IN_BACKGROUND
+)
+from utils.cache import TTLCache
+from utils.flat_forest import FlatForest
+from utils.compact_forest import CompactForest
+from utils.model_bundle import ModelBundle, current_bundle_path
+from utils.model_registry import ModelRegistry, GenerationMismatchError
+from utils.regions import RegionRegistry
+from utils.features import ALL_FEATURE_COLUMNS, engineer_features
+from utils.recommendation_table import RecommendationTable
+from utils.inference_scheduler import InferenceScheduler
+from utils.inference_executor import InferenceExecutor, InferenceOverloadedError
+from utils.thread_budget import ThreadBudget
+from utils.weather_store import WeatherStore
+from utils.weather_prefetcher import WeatherPrefetcher
+from utils.climatology import ClimatologyIndex
+from utils.http_client import weather_client
+from utils.circuit_breaker import CircuitBreaker
+from utils.startup_timer import startup_timer
+from controllers.weather_history_controller import record_weather_observation, recent_weather_averages
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Union
+import asyncio
 import numpy as np
-import requests
+import itertools
+import json
 import os
 from dotenv import load_dotenv
 
+# pandas, joblib and sklearn are only imported once models are loaded (in the
+# app lifespan), so importing the routes - and starting the app - stays fast
+if TYPE_CHECKING:
+    import pandas as pd
+
 # ============================================================================
 # MODEL INITIALIZATION
 # ============================================================================
 
+RECOMMENDATION_TABLE_PATH = os.path.join(TRAINED_MODELS_DIR, 'recommendation_table.pkl')
+
+# Static reference data shipped with the code
+CROP_CALENDAR_PATH = os.path.join(DATA_DIR, 'gujarat_crop_calendar.json')
+REGIONS_PATH = os.path.join(DATA_DIR, 'gujarat_regions.json')
+
+# Legacy layout: separate pickles in trained_models/ (used when no model bundle exists)
+LEGACY_MODEL_FILES = {
+    'rf_model': 'crop_model.pkl',
+    'crop_encoder': 'crop_encoder.pkl',
+    'label_encoders': 'label_encoders.pkl',
+    'scaler': 'scaler.pkl',
+    'selected_features': 'feature_cols.pkl',  # These are now selected features
+    'feature_selector': 'feature_selector.pkl',
+}
+
 def check_models_exist():
-    """Check if all required model files exist"""
-    required_files = [
-        'trained_models/crop_model.pkl',
-        'trained_models/crop_encoder.pkl', 
-        'trained_models/label_encoders.pkl',
-        'trained_models/scaler.pkl',
-        'trained_models/feature_cols.pkl',
-        'trained_models/feature_selector.pkl',  # Added for high-accuracy model
-        'data/crop_stats.csv',
-        'data/Final_dataset.csv',
-        'data/gujarat_crop_calendar.json',  # Added for season filtering
-        'data/gujarat_city_season_rainfall.json'  # Added for season-specific rainfall data
-    ]
+    """Check if a model bundle, or all legacy model files, exist"""
+    required_files = [CROP_CALENDAR_PATH, REGIONS_PATH]
+    if current_bundle_path(MODEL_BUNDLES_DIR) is None:
+        required_files += [os.path.join(TRAINED_MODELS_DIR, name) for name in LEGACY_MODEL_FILES.values()]
+        required_files += [os.path.join(DATA_DIR, 'crop_stats.csv'), os.path.join(DATA_DIR, 'Final_dataset.csv')]
     
     missing_files = []
     for file_path in required_files:
@@ -58,46 +132,267 @@ def check_models_exist():
         return False
     return True
 
-# Initialize models only if they exist
-models_loaded = False
-gujarat_crop_calendar = {}
-gujarat_city_season_rainfall = {}
+def load_forest_engine(model):
+    """Load the exported flat forest, or flatten the sklearn model if the export is missing or stale"""
+    flat_path = os.path.join(TRAINED_MODELS_DIR, 'flat_forest.npz')
+    if os.path.exists(flat_path):
+        engine = FlatForest.load(flat_path)
+        if engine.n_estimators == len(model.estimators_) and engine.n_classes == model.n_classes_:
+            print(f"✅ Flat forest engine loaded ({engine.n_estimators} trees)")
+            return engine
+        print("⚠️ flat_forest.npz does not match crop_model.pkl, re-flattening")
+    engine = FlatForest.from_model(model)
+    print(f"✅ Flat forest engine built from crop model ({engine.n_estimators} trees)")
+    return engine
 
-if check_models_exist():
+def compact_forest_engine(engine: FlatForest):
+    """Quantize a flat forest for serving when FOREST_FORMAT=compact"""
+    if FOREST_FORMAT != "compact":
+        return engine
+    compact = CompactForest.from_flat(engine)
+    print(f"✅ Compact forest built ({compact.nbytes / 1e6:.1f} MB)")
+    return compact
+
+def load_bundle_forest(bundle: ModelBundle):
+    """The bundle's forest in the configured FOREST_FORMAT"""
+    if FOREST_FORMAT == "compact":
+        if bundle.has_compact_forest:
+            return bundle.load_compact_forest()
+        print("⚠️ Model bundle has no compact forest, building one from the flat forest")
+    return compact_forest_engine(bundle.load_forest())
+
+def serving_model(model):
+    """Clear the pickled n_jobs (-1 = every core) so the inference thread budget decides parallelism"""
+    model.n_jobs = None
+    return model
+
+def load_bundle_components(bundle_path: str) -> dict:
+    """Model components from a versioned bundle (flat forest memory-mapped, sklearn model only if needed)"""
+    bundle = ModelBundle.open(bundle_path)
+    preprocessing = bundle.load_preprocessing()
+    components = {
+        'model_version': f"bundle:{bundle.version}",
+        'crop_encoder': preprocessing['crop_encoder'],
+        'label_encoders': preprocessing['label_encoders'],
+        'scaler': preprocessing['scaler'],
+        'selected_features': preprocessing['selected_features'],
+        'feature_selector': preprocessing['feature_selector'],
+        'forest_engine': load_bundle_forest(bundle) if FLAT_FOREST_ENABLED else None,
+        'rf_model': None if FLAT_FOREST_ENABLED else serving_model(bundle.load_model()),
+        'crop_stats': bundle.load_crop_stats(),
+        'climatology': bundle.load_climatology(),
+    }
+    print(f"✅ Model bundle {bundle.version} loaded ({len(bundle.manifest['classes'])} crops, "
+          f"{bundle.manifest['model']['n_estimators']} trees)")
+    return components
+
+def load_legacy_components() -> dict:
+    """Model components from the legacy pickle layout"""
+    import joblib
+    import pandas as pd
+    components = {
+        name: joblib.load(os.path.join(TRAINED_MODELS_DIR, filename))
+        for name, filename in LEGACY_MODEL_FILES.items()
+    }
+    serving_model(components['rf_model'])
+    model_stat = os.stat(os.path.join(TRAINED_MODELS_DIR, LEGACY_MODEL_FILES['rf_model']))
+    components['model_version'] = f"legacy:{model_stat.st_size}:{model_stat.st_mtime}"
+    # Array-backed forest engine (exported by training, or flattened here)
+    components['forest_engine'] = (
+        compact_forest_engine(load_forest_engine(components['rf_model'])) if FLAT_FOREST_ENABLED else None
+    )
+    components['crop_stats'] = pd.read_csv(os.path.join(DATA_DIR, 'crop_stats.csv'))
+    # Historical weather averages per city (the full dataset is not kept in memory)
+    components['climatology'] = ClimatologyIndex.from_csv(os.path.join(DATA_DIR, 'Final_dataset.csv'))
+    return components
+
+class ModelGeneration(NamedTuple):
+    """
+    One immutable set of loaded models and the data derived from them
+
+    Requests take the active generation from the model registry once and use
+    it for every step, so a reload never mixes components from two models.
+    """
+    version: str  # "bundle:<version>" or "legacy:<size>:<mtime>", plus the region data checksum (used to detect stale precomputed data)
+    rf_model: object  # sklearn model, only loaded when the flat forest is disabled (bundles)
+    crop_encoder: object
+    label_encoders: dict
+    scaler: object
+    selected_features: list
+    feature_selector: object
+    forest_engine: Optional[Union[FlatForest, CompactForest]]
+    crop_stats: 'pd.DataFrame'
+    climatology: ClimatologyIndex
+    crop_calendar: dict  # season → crops (Gujarat crop calendar)
+    regions: RegionRegistry  # per-city pH, climate factor, crop affinity and seasonal rainfall
+    cities: List[str]  # Gujarat cities in the dataset
+    crop_index: 'CropIndex'
+    recommendation_table: Optional[RecommendationTable]
+
+def load_recommendation_table(version: str):
+    """Load the precomputed recommendation table if it exists and matches the model version"""
+    if not os.path.exists(RECOMMENDATION_TABLE_PATH):
+        return None
     try:
-        # Load all model components
-        rf_model = joblib.load('trained_models/crop_model.pkl')
-        crop_encoder = joblib.load('trained_models/crop_encoder.pkl')
-        label_encoders = joblib.load('trained_models/label_encoders.pkl')
-        scaler = joblib.load('trained_models/scaler.pkl')
-        selected_features = joblib.load('trained_models/feature_cols.pkl')  # These are now selected features
-        feature_selector = joblib.load('trained_models/feature_selector.pkl')
-        
-        # Load data
-        crop_stats = pd.read_csv('data/crop_stats.csv')
-        df_original = pd.read_csv('data/Final_dataset.csv')
-        
-        # Load Gujarat crop calendar for season filtering
-        import json
-        with open('data/gujarat_crop_calendar.json', 'r') as f:
-            gujarat_crop_calendar = json.load(f)
-        
-        # Load Gujarat city and season-specific rainfall data
-        with open('data/gujarat_city_season_rainfall.json', 'r') as f:
-            gujarat_city_season_rainfall = json.load(f)
-        
+        table = RecommendationTable.load(RECOMMENDATION_TABLE_PATH)
+    except ValueError as e:
+        print(f"⚠️ {e}. Run: python precompute_recommendations.py")
+        return None
+    if table.meta.get("fingerprint") != version:
+        print("⚠️ Recommendation table was built for a different model. Run: python precompute_recommendations.py")
+        return None
+    print(f"✅ Precomputed recommendation table loaded ({len(table):,} entries)")
+    return table
+
+def invalidate_prediction_caches():
+    """Drop cached results that depend on the loaded models (call whenever models are (re)loaded)"""
+    prediction_cache.clear()
+
+def load_generation() -> Optional[ModelGeneration]:
+    """Load all model components and data files into a new generation (None if models are not trained)"""
+    if not check_models_exist():
+        print("❌ Models not found. Please train models first.")
+        return None
+    
+    # Load all model components (versioned bundle, falling back to the legacy pickles)
+    bundle_path = current_bundle_path(MODEL_BUNDLES_DIR)
+    components = load_bundle_components(bundle_path) if bundle_path else load_legacy_components()
+    
+    # The model libraries are imported now; keep their native thread pools within the budget
+    inference_threads.limit_native_threads()
+    
+    # Load Gujarat crop calendar for season filtering
+    with open(CROP_CALENDAR_PATH, 'r') as f:
+        crop_calendar = json.load(f)
+    
+    # Load and validate the Gujarat region registry (city pH, climate, crop affinity, seasonal rainfall)
+    regions = RegionRegistry.load(REGIONS_PATH, known_crops={crop for crops in crop_calendar.values() for crop in crops})
+    # Region data changes predictions too, so it is part of the version
+    version = f"{components['model_version']}+regions:{regions.checksum[:12]}"
+    
+    generation = ModelGeneration(
+        version=version,
+        rf_model=components['rf_model'],
+        crop_encoder=components['crop_encoder'],
+        label_encoders=components['label_encoders'],
+        scaler=components['scaler'],
+        selected_features=components['selected_features'],
+        feature_selector=components['feature_selector'],
+        forest_engine=components['forest_engine'],
+        crop_stats=components['crop_stats'],
+        climatology=components['climatology'],
+        crop_calendar=crop_calendar,
+        regions=regions,
         # Get unique cities for Gujarat
-        gujarat_cities = sorted(df_original[df_original['State'] == 'Gujarat']['City'].unique().tolist())
-        models_loaded = True
-        print("✅ High-accuracy crop model with season filtering loaded successfully")
-        print(f"✅ Gujarat city-season rainfall data loaded for {len(gujarat_city_season_rainfall)} cities")
-        
+        cities=components['climatology'].cities('Gujarat'),
+        # Class-id aligned arrays for ranking and profit calculation
+        crop_index=build_crop_index(components['crop_encoder'], components['label_encoders'],
+                                    components['crop_stats'], crop_calendar, regions),
+        # Precomputed recommendation table (built by precompute_recommendations.py)
+        recommendation_table=load_recommendation_table(version) if RECOMMENDATION_TABLE_ENABLED else None
+    )
+    
+    print("✅ High-accuracy crop model with season filtering loaded successfully")
+    print(f"✅ Gujarat region registry loaded for {len(regions)} cities")
+    return generation
+
+def warm_generation(generation: ModelGeneration):
+    """
+    Run dummy predictions before a generation takes traffic
+    
+    Pages in the memory-mapped forest arrays and pays the one-time costs of
+    the first transform/predict_proba calls (batched and single-row) here
+    instead of in the first user request.
+    """
+    city = generation.cities[0] if generation.cities else 'Ahmedabad'
+    inputs = [
+        PredictionInput(state='Gujarat', city=city, season=season,
+                        soil_type=generation.label_encoders['Soil Type'].classes_.tolist()[0],
+                        water_availability='Medium', area=1.0)
+        for season in generation.label_encoders['Season'].classes_.tolist()
+    ]
+    weathers = [
+        historical_weather(city, 'Gujarat', get_season_rainfall(city, item.season, generation), generation)
+        for item in inputs
+    ]
+    features = build_feature_matrix(inputs, weathers, generation)
+    rank_crops_matrix(inputs, predict_probabilities(features, generation), generation)
+    predict_probabilities(features[:1], generation)
+
+def on_model_swap(old: Optional[ModelGeneration], new: ModelGeneration):
+    """Drop state tied to the previous generation once a new one is active"""
+    # Cached results were computed with the previous models
+    invalidate_prediction_caches()
+    # Process workers load their own copy of the models; new workers pick up the new bundle
+    if old is not None and inference_executor.kind == "process":
+        inference_executor.restart()
+
+def model_artifacts_token():
+    """Changes whenever a new bundle becomes current, the legacy model is replaced, the table is rebuilt or region data is edited"""
+    bundle_path = current_bundle_path(MODEL_BUNDLES_DIR)
+    legacy_path = os.path.join(TRAINED_MODELS_DIR, LEGACY_MODEL_FILES['rf_model'])
+    model_token = bundle_path or (os.path.getmtime(legacy_path) if os.path.exists(legacy_path) else None)
+    table_token = os.path.getmtime(RECOMMENDATION_TABLE_PATH) if os.path.exists(RECOMMENDATION_TABLE_PATH) else None
+    regions_token = os.path.getmtime(REGIONS_PATH) if os.path.exists(REGIONS_PATH) else None
+    return model_token, table_token, regions_token
+
+# Active model generation; reloads build the next one in the background and swap it in atomically
+model_registry = ModelRegistry(
+    load_generation,
+    warm_fn=warm_generation,
+    on_swap=on_model_swap,
+    watch_fn=model_artifacts_token,
+    watch_interval_seconds=MODEL_WATCH_INTERVAL_SECONDS
+)
+
+def load_models():
+    """Load the models synchronously (scripts and process workers; the API loads them in start_models())"""
+    return model_registry.load() is not None
+
+async def reload_models(reason: str = "manual") -> dict:
+    """Load, warm and swap in the current model artifacts (admin endpoint); in-flight requests finish on the old generation"""
+    try:
+        await model_registry.reload(reason)
     except Exception as e:
-        print(f"❌ Error loading models: {e}")
-        models_loaded = False
-else:
-    print("❌ Models not found. Please train models first.")
-    models_loaded = False
+        print(f"❌ Model reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+    print(f"🔄 Models reloaded ({model_registry.current.version}, reason: {reason})")
+    return model_registry.stats(detailed=True)
+
+def start_model_watch():
+    """Reload automatically when new model artifacts appear (called from the app lifespan)"""
+    if MODEL_WATCH_ENABLED:
+        model_registry.start_watch()
+
+async def stop_model_watch():
+    await model_registry.stop_watch()
+
+def init_inference_worker():
+    """Process worker initializer: load the models unless the worker was forked with them loaded"""
+    if model_registry.current is None:
+        load_models()
+
+def models_loading() -> bool:
+    """True while models are loading, including a background startup load that has not begun yet"""
+    return model_registry.loading or (_model_startup_task is not None and not _model_startup_task.done())
+
+def models_unavailable_error() -> HTTPException:
+    """503 for requests that arrive before any model generation is active"""
+    if models_loading():
+        return HTTPException(
+            status_code=503,
+            detail="Models are loading. Please retry shortly.",
+            headers={"Retry-After": str(INFERENCE_RETRY_AFTER_SECONDS)}
+        )
+    return HTTPException(
+        status_code=503, 
+        detail="Models not loaded. Please run 'python train_simple_model.py' first."
+    )
+
+recommendation_table_stats = {"hits": 0, "misses": 0}
+
+# Per-acre results keyed on the model version, the non-area inputs and the weather they were computed with
+prediction_cache = TTLCache(max_size=PREDICTION_CACHE_MAX_SIZE, ttl_seconds=PREDICTION_CACHE_TTL_SECONDS)
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -114,31 +409,32 @@ def format_indian_currency(amount):
     else:
         return f"₹{amount:.2f}"
 
-def is_season_appropriate_crop(crop_name, season):
+def is_season_appropriate_crop(crop_name, season, crop_calendar):
     """
     STRICT season filtering based on Gujarat agricultural practices
     
     Args:
         crop_name: Name of the crop
         season: Season (Kharif, Rabi, Summer, Whole Year)
+        crop_calendar: Season → crops mapping (Gujarat crop calendar)
         
     Returns:
         bool: True if crop is appropriate for the season
     """
-    if not gujarat_crop_calendar:
+    if not crop_calendar:
         return True  # If calendar not loaded, allow all crops
     
     # STRICT FILTERING: Only allow crops that are specifically meant for that season
-    if season in gujarat_crop_calendar and crop_name in gujarat_crop_calendar[season]:
+    if season in crop_calendar and crop_name in crop_calendar[season]:
         return True
     
     # Whole Year crops can be grown in any season (but these are very limited)
-    if crop_name in gujarat_crop_calendar.get('Whole Year', []):
+    if crop_name in crop_calendar.get('Whole Year', []):
         return True
     
     # If season is 'Whole Year', allow crops from all seasons
     if season == 'Whole Year':
-        for season_crops in gujarat_crop_calendar.values():
+        for season_crops in crop_calendar.values():
             if crop_name in season_crops:
                 return True
     
@@ -146,283 +442,592 @@ def is_season_appropriate_crop(crop_name, season):
     return False
 
 # ============================================================================
-# MAIN PREDICTION FUNCTION
+# FEATURE ENGINEERING
 # ============================================================================
 
-async def predict_crops(input_data: PredictionInput) -> List[CropRecommendation]:
+def build_feature_matrix(inputs: List[PredictionInput], weathers: List[WeatherData],
+                         generation: ModelGeneration) -> np.ndarray:
     """
-    Get crop recommendations based on farm conditions using simple, accurate method
+    Build the engineered feature matrix (one row per farm) in ALL_FEATURE_COLUMNS order
+    
+    The engineered features come from utils.features, the same code training uses.
     
     Args:
-        input_data: Farm conditions (state, city, season, soil, water, area)
+        inputs: Farm conditions for each row
+        weathers: Weather data used for each row (aligned with inputs)
+        generation: Model generation whose label encoders and region registry are used
         
     Returns:
-        List of crop recommendations sorted by profitability
-        
+        np.ndarray of shape (len(inputs), len(ALL_FEATURE_COLUMNS))
+    """
+    # Encode categorical inputs column-wise (one encoder call per column)
+    label_encoders = generation.label_encoders
+    seasons = [item.season for item in inputs]
+    soil_types = [item.soil_type for item in inputs]
+    water_availability = [item.water_availability for item in inputs]
+    
+    columns = {
+        'Season_encoded': label_encoders['Season'].transform(seasons),
+        'Soil Type_encoded': label_encoders['Soil Type'].transform(soil_types),
+        'Water_Availability_encoded': label_encoders['Water_Availability'].transform(water_availability),
+        'avgTemp': [weather.avg_temp for weather in weathers],
+        'Rainfall': [weather.rainfall for weather in weathers],
+        'Cloud Cover': [weather.cloud_cover for weather in weathers],
+        'Precipitation': [weather.precipitation for weather in weathers],
+        'vapPressure': [weather.vap_pressure for weather in weathers],
+        'Wet Day Freq': [weather.wet_day_freq for weather in weathers],
+    }
+    columns.update(engineer_features(
+        generation.regions,
+        city=[item.city for item in inputs],
+        season=seasons,
+        soil_type=soil_types,
+        water_availability=water_availability,
+        avg_temp=columns['avgTemp'],
+        rainfall=columns['Rainfall'],
+        ph=[weather.ph for weather in weathers],
+    ))
+    
+    features = np.empty((len(inputs), len(ALL_FEATURE_COLUMNS)), dtype=np.float64)
+    for index, name in enumerate(ALL_FEATURE_COLUMNS):
+        features[:, index] = columns[name]
+    return features
+
+def predict_probabilities(features: np.ndarray, generation: ModelGeneration = None) -> np.ndarray:
+    """Run feature selection, scaling and the forest once for a whole feature matrix (active generation by default)"""
+    import pandas as pd
+    if generation is None:
+        generation = model_registry.current
+    all_features_df = pd.DataFrame(features, columns=ALL_FEATURE_COLUMNS)
+    features_selected = generation.feature_selector.transform(all_features_df)
+    features_scaled = generation.scaler.transform(features_selected)
+    
+    # Small batches run on this thread; large ones are split across the threads the budget grants
+    with inference_threads.lease(len(features_scaled)) as n_threads:
+        if generation.forest_engine is not None:
+            return generation.forest_engine.predict_proba(
+                features_scaled, n_chunks=n_threads, executor=inference_threads.pool if n_threads > 1 else None
+            )
+        # The served model has n_jobs=None, so joblib takes the thread count from this context
+        from joblib import parallel_config
+        with parallel_config(backend="threading", n_jobs=n_threads):
+            return generation.rf_model.predict_proba(features_scaled)
+
+def predict_probabilities_in_worker(features: np.ndarray, version: str) -> np.ndarray:
+    """
+    Process worker entry point: predict_probabilities with the worker's own models
+    
+    Raises GenerationMismatchError when the worker holds a different generation
+    than the job was built for (e.g. the pool was recycled after a swap while
+    the request still holds the previous generation, or a worker loaded a
+    newer bundle from disk).
+    """
+    generation = model_registry.current
+    if generation is None or generation.version != version:
+        raise GenerationMismatchError(
+            f"Job for model {version} reached a worker with {generation.version if generation else 'no model'}"
+        )
+    return predict_probabilities(features, generation)
+
+# Thread workers get the request's generation; process workers their own copy, checked against the job's version
+inference_fn = predict_probabilities if INFERENCE_EXECUTOR == "thread" else predict_probabilities_in_worker
+
+# CPU threads model inference may use in this process (its share of the machine)
+inference_threads = ThreadBudget(
+    global_threads=INFERENCE_GLOBAL_THREADS,
+    processes=WEB_CONCURRENCY * (INFERENCE_MAX_WORKERS if INFERENCE_EXECUTOR == "process" else 1),
+    max_threads_per_call=INFERENCE_THREADS_PER_CALL,
+    parallel_min_rows=INFERENCE_PARALLEL_MIN_ROWS
+)
+
+# Bounded pool that keeps model inference off the event loop
+inference_executor = InferenceExecutor(
+    kind=INFERENCE_EXECUTOR,
+    max_workers=INFERENCE_MAX_WORKERS,
+    max_queue=INFERENCE_MAX_QUEUE,
+    timeout_s=INFERENCE_TIMEOUT_SECONDS,
+    initializer=init_inference_worker
+)
+
+# Merges concurrent single-row predictions into one predict_proba call
+inference_scheduler = InferenceScheduler(
+    inference_fn,
+    max_batch_size=INFERENCE_BATCH_MAX_SIZE,
+    max_wait_ms=INFERENCE_BATCH_MAX_WAIT_MS,
+    executor=inference_executor
+)
+
+async def run_inference(features: np.ndarray, generation: ModelGeneration) -> np.ndarray:
+    """
+    Get crop probabilities for a feature matrix without blocking the event loop
+    
+    Single rows go through the micro-batching scheduler (when enabled), larger
+    matrices are submitted to the inference executor as one job. Thread workers
+    use the request's generation. Process workers use their own loaded copy
+    (the pool is restarted on every model swap) and refuse jobs for another
+    generation; those rows are then predicted in this process with the
+    request's generation, so a request never mixes two models.
+    
     Raises:
-        HTTPException: If models not loaded or prediction fails
+        HTTPException: 503 with Retry-After when the inference queue is full,
+                       504 when inference exceeds the configured timeout
     """
-    if not models_loaded:
+    args = (generation,) if inference_executor.kind == "thread" else (generation.version,)
+    try:
+        if INFERENCE_BATCHING_ENABLED and len(features) == 1:
+            return (await inference_scheduler.predict(features[0], *args))[np.newaxis, :]
+        return await inference_executor.run(inference_fn, features, *args)
+    except GenerationMismatchError as e:
+        print(f"🔄 {e}; predicting in this process")
+        return await asyncio.get_running_loop().run_in_executor(None, predict_probabilities, features, generation)
+    except InferenceOverloadedError:
         raise HTTPException(
-            status_code=503, 
-            detail="Models not loaded. Please run 'python train_simple_model.py' first."
+            status_code=503,
+            detail="Prediction service is busy. Please retry shortly.",
+            headers={"Retry-After": str(INFERENCE_RETRY_AFTER_SECONDS)}
         )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Prediction timed out. Please try again.")
+
+# ============================================================================
+# RANKING AND PROFIT CALCULATION
+# ============================================================================
+
+class RankedCrop(NamedTuple):
+    """Area-independent (per-acre) recommendation for one crop"""
+    crop: str
+    suitability: float
+    production_per_acre: float  # Quintals per acre
+    price_per_quintal: float  # ₹ per quintal
+
+class CropIndex(NamedTuple):
+    """Per-class lookup arrays built once per model generation, aligned with crop_encoder class ids"""
+    class_names: np.ndarray  # class id → crop name
+    season_masks: dict  # season → bool array of season-appropriate classes
+    other_season_mask: np.ndarray  # eligibility for any season not in season_masks (not in the calendar)
+    has_stats: np.ndarray  # class has crop statistics (required for profit calculation)
+    production_per_acre: np.ndarray  # Quintals per acre
+    price_per_quintal: np.ndarray  # ₹ per quintal
+    profit_per_acre: np.ndarray  # ₹ per acre
+    city_affinity: np.ndarray  # (n_cities + 1, n_classes) suitability boosts by region registry row, last row = no affinity
+    cotton_id: int  # class id of Cotton(lint), -1 if not a class
+
+def build_crop_index(crop_encoder, label_encoders: dict, crop_stats: 'pd.DataFrame', crop_calendar: dict,
+                     regions: RegionRegistry) -> CropIndex:
+    """Build class-id aligned arrays for season filtering, affinity boosts and profit math"""
+    class_names = np.asarray(crop_encoder.classes_)
+    n_classes = len(class_names)
     
-    try:
-        # Step 1: Get weather data with season-specific rainfall
-        weather_data = await fetch_weather_data(input_data.city, input_data.state, input_data.season)
-        
-        # Step 2: Encode categorical inputs
-        season_encoded = label_encoders['Season'].transform([input_data.season])[0]
-        soil_encoded = label_encoders['Soil Type'].transform([input_data.soil_type])[0]
-        water_encoded = label_encoders['Water_Availability'].transform([input_data.water_availability])[0]
-        
-        # Step 3: Prepare enhanced features (same as training)
-        # Calculate enhanced features for better accuracy
-        
-        # Climate suitability
-        def calculate_climate_suitability(temp, rainfall, season):
-            if season == 'Kharif':
-                temp_score = 1.0 if 25 <= temp <= 35 else 0.5
-                rain_score = 1.0 if 400 <= rainfall <= 1200 else 0.3
-            elif season == 'Rabi':
-                temp_score = 1.0 if 15 <= temp <= 28 else 0.5
-                rain_score = 1.0 if 200 <= rainfall <= 600 else 0.3
-            elif season == 'Summer':
-                temp_score = 1.0 if 30 <= temp <= 40 else 0.5
-                rain_score = 1.0 if 100 <= rainfall <= 400 else 0.3
-            else:  # Whole Year
-                temp_score = 1.0 if 20 <= temp <= 35 else 0.5
-                rain_score = 1.0 if 300 <= rainfall <= 800 else 0.3
-            return (temp_score + rain_score) / 2
-        
-        # Water-soil compatibility
-        def water_soil_compatibility(water_avail, soil_type):
-            compatibility_matrix = {
-                ('High', 'Black'): 1.0, ('High', 'Clay'): 0.9, ('High', 'Loamy'): 0.8,
-                ('Medium', 'Red'): 1.0, ('Medium', 'Loamy'): 0.9, ('Medium', 'Sandy'): 0.7,
-                ('Low', 'Sandy'): 1.0, ('Low', 'Red'): 0.8, ('Low', 'Laterite'): 0.7
-            }
-            return compatibility_matrix.get((water_avail, soil_type), 0.5)
+    # Season eligibility bitmask per season from the Gujarat crop calendar. Every season the
+    # calendar does not list gets the same mask, so one extra mask covers them all and nothing
+    # is added after load (the generation stays immutable)
+    seasons = set(crop_calendar) | set(label_encoders['Season'].classes_) | {'Whole Year'}
+    season_masks = {
+        season: np.array([is_season_appropriate_crop(name, season, crop_calendar) for name in class_names])
+        for season in seasons
+    }
+    other_season = next(f"unlisted-{i}" for i in itertools.count() if f"unlisted-{i}" not in seasons)
+    other_season_mask = np.array([is_season_appropriate_crop(name, other_season, crop_calendar)
+                                  for name in class_names])
+    
+    # Per-acre yield and price from crop statistics
+    has_stats = np.zeros(n_classes, dtype=bool)
+    production_per_acre = np.zeros(n_classes)
+    price_per_quintal = np.zeros(n_classes)
+    stats_by_crop = {row['Crop']: row for row in crop_stats.to_dict('records')}
+    for idx, name in enumerate(class_names):
+        crop_data = stats_by_crop.get(name)
+        if crop_data is None:
+            continue
+        has_stats[idx] = True
+        production_per_acre[idx] = crop_data['Production'] / crop_data['Area'] if crop_data['Area'] > 0 else crop_data['Production']
+        price_per_quintal[idx] = crop_data['AVG_Price']
+    
+    class_ids = {name: idx for idx, name in enumerate(class_names)}
+    
+    return CropIndex(
+        class_names=class_names,
+        season_masks=season_masks,
+        other_season_mask=other_season_mask,
+        has_stats=has_stats,
+        production_per_acre=production_per_acre,
+        price_per_quintal=price_per_quintal,
+        profit_per_acre=production_per_acre * price_per_quintal,
+        # City affinity boosts as dense vectors (zero row for cities outside the registry)
+        city_affinity=regions.affinity_matrix(class_names),
+        cotton_id=class_ids.get('Cotton(lint)', -1)
+    )
+
+def season_mask(season: str, generation: ModelGeneration) -> np.ndarray:
+    """Season eligibility bitmask (all built at load time)"""
+    crop_index = generation.crop_index
+    return crop_index.season_masks.get(season, crop_index.other_season_mask)
+
+def rank_crops_matrix(inputs: List[PredictionInput], probabilities: np.ndarray, generation: ModelGeneration,
+                      k: int = PREDICTION_TOP_K) -> List[List[RankedCrop]]:
+    """
+    Turn class probabilities into profit-ranked, per-acre crop results for many rows at once
+    
+    Per row: keep season-appropriate crops, take the top k by probability (ties
+    resolved by class id), drop crops without statistics, apply city affinity
+    and cotton boosts, then order by profit per acre.
+    
+    Args:
+        inputs: Farm conditions for each row (area is not used)
+        probabilities: (n_rows, n_classes) class probabilities
+        generation: Model generation the probabilities came from
+        k: Number of crops to keep per row
         
-        # Enhanced pH based on soil type and city
-        soil_ph_map = {
-            "Loamy": 6.8, "Clay": 7.5, "Sandy": 6.2, "Black": 7.8, 
-            "Red": 6.5, "Alluvial": 7.0, "Laterite": 5.5
-        }
+    Returns:
+        One list of RankedCrop per row, sorted by profit per acre
+    """
+    crop_index = generation.crop_index
+    n_rows, n_classes = probabilities.shape
+    class_ids = np.arange(n_classes)
+    
+    # Season masking: ineligible classes can never be selected
+    eligible = np.stack([season_mask(item.season, generation) for item in inputs])
+    masked = np.where(eligible, probabilities, -np.inf)
+    
+    # Top-k by probability; at the k-th value keep the lowest class ids (same as a stable sort)
+    k = min(k, n_classes)
+    if k <= 0:
+        return [[] for _ in inputs]
+    kth_value = -np.partition(-masked, k - 1, axis=1)[:, k - 1:k]
+    above = masked > kth_value
+    at_kth = (masked == kth_value) & eligible
+    remaining = k - above.sum(axis=1, keepdims=True)
+    selected = above | (at_kth & (np.cumsum(at_kth, axis=1) <= remaining))
+    
+    # Only crops with statistics can be recommended
+    selected &= crop_index.has_stats
+    
+    # Suitability: probability × city affinity boost × cotton boost
+    city_rows = [generation.regions.row(item.city) for item in inputs]
+    suitability = probabilities * 100
+    suitability = suitability * (1 + crop_index.city_affinity[city_rows])
+    if crop_index.cotton_id >= 0:
+        cotton_boost = np.array([
+            item.state == 'Gujarat' and item.season == 'Kharif' and
+            item.soil_type in ['Red', 'Black'] and item.water_availability == 'High'
+            for item in inputs
+        ])
+        suitability[cotton_boost, crop_index.cotton_id] *= 1.3  # 30% boost for cotton
+    suitability = np.minimum(suitability, 100.0)
+    
+    # Order: selected first, then profit per acre, probability, class id
+    profit = np.broadcast_to(crop_index.profit_per_acre, (n_rows, n_classes))
+    order = np.lexsort((np.broadcast_to(class_ids, (n_rows, n_classes)), -probabilities, -profit, ~selected), axis=1)
+    counts = selected.sum(axis=1)
+    
+    ranked_rows = []
+    for row in range(n_rows):
+        ranked_rows.append([
+            RankedCrop(
+                crop=crop_index.class_names[idx],
+                suitability=float(suitability[row, idx]),
+                production_per_acre=float(crop_index.production_per_acre[idx]),
+                price_per_quintal=float(crop_index.price_per_quintal[idx])
+            )
+            for idx in order[row, :counts[row]]
+        ])
+    return ranked_rows
+
+def rank_crops(input_data: PredictionInput, probabilities: np.ndarray, generation: ModelGeneration,
+               verbose: bool = False) -> List[RankedCrop]:
+    """Profit-ranked, per-acre crop results for one row of class probabilities"""
+    ranked = rank_crops_matrix([input_data], probabilities[np.newaxis, :], generation)[0]
+    
+    if verbose:
+        eligible_count = int(season_mask(input_data.season, generation).sum())
+        if eligible_count < PREDICTION_TOP_K:
+            print(f"⚠️ Only {eligible_count} season-appropriate crops found for {input_data.season}")
+        print(f"🌾 STRICT season filtering applied for {input_data.season} season:")
+        print(f"   Total crops available: {len(probabilities)}")
+        print(f"   Season-appropriate crops found: {eligible_count}")
+        print(f"   Final recommendations: {len(ranked)}")
+        print(f"   Recommended crops: {[item.crop for item in ranked]}")
+    
+    return ranked
+
+def build_recommendations(ranked: List[RankedCrop], area: float) -> List[CropRecommendation]:
+    """Apply the farm area to per-acre results and format the response"""
+    recommendations = []
+    for item in ranked:
+        # Production calculations (quintals → kg for display)
+        avg_production_per_acre_kg = item.production_per_acre * 100  # Convert to kg
+        expected_production_quintals = item.production_per_acre * area
+        expected_production_kg = expected_production_quintals * 100  # Convert to kg
         
-        # City-specific pH adjustments for Gujarat
-        city_ph_adjustments = {
-            'Ahmedabad': 0.2, 'Surat': -0.1, 'Vadodara': 0.0, 'Rajkot': 0.1,
-            'Bhavnagar': 0.3, 'Jamnagar': 0.4, 'Junagadh': -0.3, 'Gandhinagar': 0.1,
-            'Anand': -0.1, 'Nadiad': 0.0, 'Valsad': -0.5, 'Navsari': -0.4,
-            'Bharuch': -0.2, 'Bhuj': 0.8, 'Gandhidham': 0.9, 'Mandvi': 0.7,
-            'Porbandar': 0.2, 'Dwarka': 0.5, 'Veraval': 0.1, 'Amreli': -0.1,
-            'Surendranagar': 0.6, 'Morbi': 0.4, 'Mehsana': 0.3, 'Patan': 0.5,
-            'Palanpur': 0.0, 'Godhra': -0.2, 'Dahod': -0.4
-        }
+        # Profit calculations (quintals × ₹/quintal)
+        profit_per_acre = item.production_per_acre * item.price_per_quintal
+        total_profit = expected_production_quintals * item.price_per_quintal
         
-        base_ph = soil_ph_map.get(input_data.soil_type, weather_data.ph)
-        city_adjustment = city_ph_adjustments.get(input_data.city, 0.0)
-        ph_enhanced = base_ph + city_adjustment
+        # Price conversion for display (₹/quintal → ₹/kg)
+        avg_price_per_kg = item.price_per_quintal / 100
         
-        # Calculate enhanced features with city-specific adjustments
-        climate_suitability = calculate_climate_suitability(
-            weather_data.avg_temp, weather_data.rainfall, input_data.season
-        )
+        recommendations.append(CropRecommendation(
+            crop=item.crop,
+            suitability=item.suitability,
+            profit_per_acre=float(profit_per_acre),
+            total_profit=float(total_profit),
+            expected_production=float(avg_production_per_acre_kg),  # Display in kg
+            total_production=float(expected_production_kg),  # Display in kg
+            avg_price=float(avg_price_per_kg),
+            profit_per_acre_formatted=format_indian_currency(profit_per_acre),
+            total_profit_formatted=format_indian_currency(total_profit)
+        ))
+    return recommendations
+
+# ============================================================================
+# PRECOMPUTED RECOMMENDATION TABLE
+# ============================================================================
+
+def lookup_recommendations(input_data: PredictionInput, weather_data: WeatherData, generation: ModelGeneration):
+    """
+    (ranked per-acre results, weather they were scored with) from the generation's
+    precomputed table, or None on a miss
+    
+    Live and historical weather both hit: temperature, precipitation, vapour
+    pressure and cloud cover are snapped to the table's bins, and the rest
+    is fixed per city and season. On a hit the weather is the table row's
+    (the bin values instead of the request's).
+    """
+    recommendation_table = generation.recommendation_table
+    if recommendation_table is None:
+        return None
+    
+    keys = (input_data.state, input_data.city, input_data.season,
+            input_data.soil_type, input_data.water_availability)
+    found = recommendation_table.lookup(keys, weather_data.model_dump())
+    if found is None:
+        recommendation_table_stats["misses"] += 1
+        return None
+    
+    recommendation_table_stats["hits"] += 1
+    entries, weather_used = found
+    return [RankedCrop(*entry) for entry in entries], WeatherData(**weather_used)
+
+def prediction_cache_key(input_data: PredictionInput, weather_data: WeatherData, generation: ModelGeneration) -> tuple:
+    """Model version, normalized non-area inputs and a fingerprint of the weather used for the prediction"""
+    # The version keeps results from requests still running on an old generation out of the new one's entries
+    return (
+        generation.version,
+        input_data.state, input_data.city, input_data.season,
+        input_data.soil_type, input_data.water_availability,
+        tuple(weather_data.model_dump().values())
+    )
+
+def get_ranked_without_inference(input_data: PredictionInput, weather_data: WeatherData, generation: ModelGeneration):
+    """
+    (per-acre results, weather they were computed with) from the precomputed table or
+    the result cache; the results are None if inference is needed
+    """
+    found = lookup_recommendations(input_data, weather_data, generation)
+    if found is not None:
+        return found
+    ranked = None
+    if PREDICTION_CACHE_ENABLED:
+        ranked = prediction_cache.get(prediction_cache_key(input_data, weather_data, generation))
+    return ranked, weather_data
+
+def remember_ranked(input_data: PredictionInput, weather_data: WeatherData, ranked: List[RankedCrop],
+                    generation: ModelGeneration):
+    """Store per-acre results from live inference in the result cache"""
+    if PREDICTION_CACHE_ENABLED:
+        prediction_cache.set(prediction_cache_key(input_data, weather_data, generation), tuple(ranked))
+
+def precompute_recommendation_table(generation: ModelGeneration = None,
+                                    temp_min: int = RECOMMENDATION_TABLE_TEMP_MIN,
+                                    temp_max: int = RECOMMENDATION_TABLE_TEMP_MAX,
+                                    weather_bins: dict = None) -> RecommendationTable:
+    """
+    Score every (state, city, season, soil, water, weather bin) combination
+    
+    Temperature is bucketed to 1 °C and precipitation, vapour pressure and
+    cloud cover to coarse bins (RECOMMENDATION_TABLE_WEATHER_BINS by default),
+    each scored at its bin's value. Rainfall and wet day frequency come from
+    the city-season rainfall data, as for any request, and are stored with the
+    table. pH is not part of the grid: it only enters the features for soil
+    types without a reference pH, and every soil type on the grid has one.
+    
+    Returns:
+        RecommendationTable with ranked per-acre results for every grid point
+        of the given generation (the active one by default)
+    """
+    if generation is None:
+        generation = model_registry.current
+    label_encoders = generation.label_encoders
+    crop_index = generation.crop_index
+    axes = {
+        "state": ["Gujarat"],
+        "city": generation.cities,
+        "season": label_encoders['Season'].classes_.tolist(),
+        "soil_type": label_encoders['Soil Type'].classes_.tolist(),
+        "water_availability": label_encoders['Water_Availability'].classes_.tolist()
+    }
+    missing_ph = [soil_type for soil_type in axes["soil_type"] if soil_type not in generation.regions.soil_type_ph]
+    if missing_ph:
+        raise ValueError(f"Soil types without a reference pH cannot be tabulated: {', '.join(missing_ph)}")
+    bins = {"avg_temp": ([temp - 0.5 for temp in range(temp_min, temp_max + 2)],
+                         [float(temp) for temp in range(temp_min, temp_max + 1)])}
+    bins.update(weather_bins or RECOMMENDATION_TABLE_WEATHER_BINS)
+    bin_points = [dict(zip(bins, values)) for values in itertools.product(*(values for _, values in bins.values()))]
+    groups = list(itertools.product(*axes.values()))
+    
+    # Score one categorical grid point (all its weather bins) at a time, in itertools.product order
+    weather_fields = ["rainfall", "wet_day_freq"]
+    crop_id_by_name = {name: idx for idx, name in enumerate(crop_index.class_names)}
+    width = min(PREDICTION_TOP_K, len(crop_index.class_names))
+    crop_ids = np.full((len(groups) * len(bin_points), width), -1, dtype=np.int16)
+    suitability = np.zeros(crop_ids.shape)
+    group_weather = np.zeros((len(groups), len(weather_fields)))
+    for group, (state, city, season, soil_type, water) in enumerate(groups):
+        base_weather = historical_weather(city, state, get_season_rainfall(city, season, generation), generation)
+        group_weather[group] = [getattr(base_weather, field) for field in weather_fields]
+        item = PredictionInput(state=state, city=city, season=season, soil_type=soil_type,
+                               water_availability=water, area=1.0)
+        inputs = [item] * len(bin_points)
+        weathers = [base_weather.model_copy(update=point) for point in bin_points]
+        features = build_feature_matrix(inputs, weathers, generation)
+        ranked_rows = rank_crops_matrix(inputs, predict_probabilities(features, generation), generation)
+        for offset, ranked in enumerate(ranked_rows):
+            row = group * len(bin_points) + offset
+            for col, entry in enumerate(ranked):
+                crop_ids[row, col] = crop_id_by_name[entry.crop]
+                suitability[row, col] = entry.suitability
+    
+    return RecommendationTable(
+        axes=axes,
+        bins=bins,
+        crop_names=crop_index.class_names.tolist(),
+        production_per_acre=crop_index.production_per_acre,
+        price_per_quintal=crop_index.price_per_quintal,
+        crop_ids=crop_ids,
+        suitability=suitability,
+        weather_fields=weather_fields,
+        weather=group_weather,
+        meta={"fingerprint": generation.version}
+    )
+
+# ============================================================================
+# MAIN PREDICTION FUNCTIONS
+# ============================================================================
+
+async def predict_crops(input_data: PredictionInput, include: Optional[str] = None) -> Union[List[CropRecommendation], PredictionResponse]:
+    """
+    Get crop recommendations based on farm conditions using simple, accurate method
+    
+    Args:
+        input_data: Farm conditions (state, city, season, soil, water, area)
+        include: Optional comma-separated extras ("weather" embeds the weather data used)
         
-        # City-specific climate adjustments for better differentiation
-        city_climate_factors = {
-            # Coastal cities - higher humidity, better for certain crops
-            'Surat': 1.2, 'Valsad': 1.3, 'Navsari': 1.2, 'Bharuch': 1.1,
-            # Arid regions - lower suitability for water-intensive crops
-            'Bhuj': 0.7, 'Gandhidham': 0.6, 'Mandvi': 0.8, 'Rapar': 0.5,
-            # Central Gujarat - moderate conditions
-            'Ahmedabad': 1.0, 'Gandhinagar': 1.0, 'Anand': 1.1, 'Vadodara': 1.1,
-            # Saurashtra - variable conditions
-            'Rajkot': 0.9, 'Jamnagar': 0.8, 'Porbandar': 0.9, 'Dwarka': 0.8,
-            'Bhavnagar': 0.8, 'Amreli': 0.9, 'Surendranagar': 0.7, 'Morbi': 0.7,
-            # North Gujarat
-            'Mehsana': 0.9, 'Patan': 0.8, 'Palanpur': 1.0,
-            # Eastern Gujarat - higher rainfall areas
-            'Godhra': 1.1, 'Dahod': 1.2
-        }
+    Returns:
+        List of crop recommendations sorted by profitability, or a PredictionResponse
+        with recommendations and weather when include=weather
         
-        city_factor = city_climate_factors.get(input_data.city, 1.0)
-        climate_suitability *= city_factor
-        water_soil_comp = water_soil_compatibility(
-            input_data.water_availability, input_data.soil_type
-        )
+    Raises:
+        HTTPException: If models not loaded or prediction fails
+    """
+    # Every step of this request uses the same generation, even if a reload swaps in a new one meanwhile
+    generation = model_registry.current
+    if generation is None:
+        raise models_unavailable_error()
+    
+    try:
+        # Step 1: Get weather data with season-specific rainfall
+        weather_data = await fetch_weather_data(input_data.city, input_data.state, input_data.season, generation)
         
-        # Regional affinity based on city and historical crop patterns
-        city_crop_affinity = {
-            # Cotton-growing regions
-            'Surendranagar': {'Cotton(lint)': 0.9, 'Groundnut': 0.8},
-            'Rajkot': {'Cotton(lint)': 0.8, 'Groundnut': 0.9},
-            'Bhavnagar': {'Cotton(lint)': 0.7, 'Onion': 0.8},
-            
-            # Rice-growing regions  
-            'Surat': {'Rice': 0.9, 'Sugarcane': 0.8},
-            'Navsari': {'Rice': 0.8, 'Sugarcane': 0.7},
-            'Bharuch': {'Rice': 0.7, 'Cotton(lint)': 0.6},
-            
-            # Wheat belt
-            'Mehsana': {'Wheat': 0.9, 'Bajra': 0.8},
-            'Patan': {'Wheat': 0.8, 'Gram': 0.7},
-            'Palanpur': {'Wheat': 0.8, 'Maize': 0.7},
+        # Fast path: precomputed or cached per-acre results, scaled by area
+        # (a table hit reports the weather of the table row it came from)
+        ranked, weather_data = get_ranked_without_inference(input_data, weather_data, generation)
+        if ranked is None:
+            # Step 2: Encode inputs and prepare enhanced features (same as training)
+            features = build_feature_matrix([input_data], [weather_data], generation)
             
-            # Diverse cropping
-            'Ahmedabad': {'Wheat': 0.7, 'Cotton(lint)': 0.6, 'Bajra': 0.7},
-            'Vadodara': {'Rice': 0.6, 'Wheat': 0.7, 'Maize': 0.6},
-            'Anand': {'Wheat': 0.8, 'Potato': 0.7, 'Onion': 0.6},
+            # Step 3: Feature selection, scaling and crop probabilities (off the event loop)
+            probabilities = (await run_inference(features, generation))[0]
             
-            # Arid region crops
-            'Bhuj': {'Bajra': 0.9, 'Jowar': 0.8},
-            'Gandhidham': {'Bajra': 0.8, 'Gram': 0.6},
-            
-            # Eastern Gujarat
-            'Dahod': {'Maize': 0.8, 'Rice': 0.7, 'Wheat': 0.6},
-            'Godhra': {'Maize': 0.7, 'Rice': 0.6, 'Wheat': 0.7}
-        }
-        
-        # Get city-specific affinity or use default
-        city_affinities = city_crop_affinity.get(input_data.city, {})
-        regional_affinity = 0.5  # Default value
+            # Step 4: Season filtering, ranking and profit calculation
+            ranked = rank_crops(input_data, probabilities, generation, verbose=True)
+            remember_ranked(input_data, weather_data, ranked, generation)
         
-        # Productivity index (simplified)
-        productivity_index = weather_data.rainfall * weather_data.avg_temp / 1000
-        
-        # All features (before selection)
-        all_features_dict = {
-            'Season_encoded': season_encoded,
-            'Soil Type_encoded': soil_encoded,
-            'Water_Availability_encoded': water_encoded,
-            'avgTemp': weather_data.avg_temp,
-            'Rainfall': weather_data.rainfall,
-            'pH_enhanced': ph_enhanced,
-            'Cloud Cover': weather_data.cloud_cover,
-            'Precipitation': weather_data.precipitation,
-            'vapPressure': weather_data.vap_pressure,
-            'Wet Day Freq': weather_data.wet_day_freq,
-            'climate_suitability': climate_suitability,
-            'water_soil_compatibility': water_soil_comp,
-            'regional_affinity': regional_affinity,
-            'productivity_index': productivity_index
-        }
-        
-        # Create DataFrame with all features
-        all_features_df = pd.DataFrame([all_features_dict])
-        
-        # Apply feature selection (this will select the same features as training)
-        features_selected = feature_selector.transform(all_features_df)
-        
-        # Step 4: Scale selected features
-        features_scaled = scaler.transform(features_selected)
+        recommendations = build_recommendations(ranked, input_data.area)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in prediction: {e}")
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+    
+    # Single round trip: return the weather used alongside the recommendations
+    if include and 'weather' in [part.strip() for part in include.split(',')]:
+        return PredictionResponse(recommendations=recommendations, weather=weather_data)
+    return recommendations
+
+async def predict_crops_batch(inputs: List[PredictionInput]) -> List[List[CropRecommendation]]:
+    """
+    Get crop recommendations for many farms with a single vectorized model call
+    
+    Args:
+        inputs: List of farm conditions (state, city, season, soil, water, area)
         
-        # Step 5: Get crop predictions with season filtering
-        probabilities = rf_model.predict_proba(features_scaled)[0]
+    Returns:
+        One list of crop recommendations per input, in the same order
         
-        # Get all crops with their probabilities
-        all_crop_predictions = []
-        for idx, prob in enumerate(probabilities):
-            crop_name = crop_encoder.inverse_transform([idx])[0]
-            
-            # Apply season filtering - only include season-appropriate crops
-            if is_season_appropriate_crop(crop_name, input_data.season):
-                all_crop_predictions.append((idx, crop_name, prob))
+    Raises:
+        HTTPException: If models not loaded, batch is too large or prediction fails
+    """
+    # Every step of this request uses the same generation, even if a reload swaps in a new one meanwhile
+    generation = model_registry.current
+    if generation is None:
+        raise models_unavailable_error()
+    
+    if len(inputs) > MAX_BATCH_PREDICTION_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large. Maximum {MAX_BATCH_PREDICTION_SIZE} farms per request."
+        )
+    
+    if not inputs:
+        return []
+    
+    try:
+        # Step 1: Fetch weather once per distinct (city, state, season)
+        weather_by_location = {}
+        for item in inputs:
+            key = (item.city, item.state, item.season)
+            if key not in weather_by_location:
+                weather_by_location[key] = await fetch_weather_data(*key, generation)
+        weathers = [weather_by_location[(item.city, item.state, item.season)] for item in inputs]
         
-        # Sort by probability and take top crops
-        all_crop_predictions.sort(key=lambda x: x[2], reverse=True)
+        # Step 2: Precomputed or cached results where available, live inference for the rest
+        ranked_rows = [get_ranked_without_inference(item, weather, generation)[0]
+                       for item, weather in zip(inputs, weathers)]
+        misses = [row for row, ranked in enumerate(ranked_rows) if ranked is None]
         
-        # Ensure we have at least 6 recommendations
-        if len(all_crop_predictions) < 6:
-            # If we have fewer than 6 season-appropriate crops, add more from the same season only
-            print(f"⚠️ Only {len(all_crop_predictions)} season-appropriate crops found for {input_data.season}")
+        if misses:
+            # One feature matrix, one forest traversal for all missed rows
+            miss_inputs = [inputs[row] for row in misses]
+            features = build_feature_matrix(miss_inputs, [weathers[row] for row in misses], generation)
+            probabilities = await run_inference(features, generation)
             
-            # Get all crops sorted by probability but still filter by season
-            all_general_predictions = []
-            for idx, prob in enumerate(probabilities):
-                crop_name = crop_encoder.inverse_transform([idx])[0]
-                # STRICT: Only add crops that are season-appropriate
-                if is_season_appropriate_crop(crop_name, input_data.season):
-                    all_general_predictions.append((idx, crop_name, prob))
-            
-            all_general_predictions.sort(key=lambda x: x[2], reverse=True)
-            
-            # Replace with the sorted season-appropriate crops
-            all_crop_predictions = all_general_predictions
-            
-            # If still less than 6, that's fine - we'll only show season-appropriate crops
-            if len(all_crop_predictions) < 6:
-                print(f"📋 Final count: {len(all_crop_predictions)} season-appropriate crops for {input_data.season}")
-        
-        # Take up to 6 crops (or all available if less than 6)
-        top_predictions = all_crop_predictions[:6]
-        
-        print(f"🌾 STRICT season filtering applied for {input_data.season} season:")
-        print(f"   Total crops available: {len(probabilities)}")
-        print(f"   Season-appropriate crops found: {len(all_crop_predictions)}")
-        print(f"   Final recommendations: {len(top_predictions)}")
-        print(f"   Recommended crops: {[pred[1] for pred in top_predictions]}")
+            # Season filtering, top-k, boosts and profit ranking for all rows at once
+            for i, ranked in enumerate(rank_crops_matrix(miss_inputs, probabilities, generation)):
+                row = misses[i]
+                ranked_rows[row] = ranked
+                remember_ranked(miss_inputs[i], weathers[row], ranked, generation)
         
-        # Step 6: Calculate profits for each recommended crop with city-specific adjustments
-        recommendations = []
-        for idx, crop_name, probability in top_predictions:
-            
-            # Get crop statistics from database
-            if crop_name in crop_stats['Crop'].values:
-                crop_data = crop_stats[crop_stats['Crop'] == crop_name].iloc[0]
-                
-                # Production calculations (quintals → kg for display)
-                avg_production_per_acre_quintals = crop_data['Production'] / crop_data['Area'] if crop_data['Area'] > 0 else crop_data['Production']
-                avg_production_per_acre_kg = avg_production_per_acre_quintals * 100  # Convert to kg
-                
-                expected_production_quintals = avg_production_per_acre_quintals * input_data.area
-                expected_production_kg = expected_production_quintals * 100  # Convert to kg
-                
-                # Profit calculations (quintals × ₹/quintal)
-                avg_price_per_quintal = crop_data['AVG_Price']
-                profit_per_acre = avg_production_per_acre_quintals * avg_price_per_quintal
-                total_profit = expected_production_quintals * avg_price_per_quintal
-                
-                # Price conversion for display (₹/quintal → ₹/kg)
-                avg_price_per_kg = avg_price_per_quintal / 100
-                
-                # City-specific suitability adjustments
-                suitability_score = float(probability * 100)
-                
-                # Apply city-specific crop affinity
-                if crop_name in city_affinities:
-                    affinity_boost = city_affinities[crop_name]
-                    suitability_score *= (1 + affinity_boost)
-                    print(f"   🎯 {crop_name} affinity boost in {input_data.city}: {affinity_boost:.1f}")
-                
-                # Cotton boost for suitable conditions in Gujarat
-                if (crop_name == 'Cotton(lint)' and 
-                    input_data.state == 'Gujarat' and 
-                    input_data.season == 'Kharif' and 
-                    input_data.soil_type in ['Red', 'Black'] and 
-                    input_data.water_availability == 'High'):
-                    suitability_score *= 1.3  # 30% boost for cotton
-                
-                recommendations.append(CropRecommendation(
-                    crop=crop_name,  # Remove boost message from crop name
-                    suitability=min(suitability_score, 100.0),
-                    profit_per_acre=float(profit_per_acre),
-                    total_profit=float(total_profit),
-                    expected_production=float(avg_production_per_acre_kg),  # Display in kg
-                    total_production=float(expected_production_kg),  # Display in kg
-                    avg_price=float(avg_price_per_kg),
-                    profit_per_acre_formatted=format_indian_currency(profit_per_acre),
-                    total_profit_formatted=format_indian_currency(total_profit)
-                ))
+        results = [build_recommendations(ranked, item.area) for ranked, item in zip(ranked_rows, inputs)]
         
-        # Sort by total profit (most profitable first)
-        recommendations.sort(key=lambda x: x.total_profit, reverse=True)
-        return recommendations
+        print(f"🌾 Batch prediction completed for {len(inputs)} farms "
+              f"({len(weather_by_location)} distinct locations, {len(inputs) - len(misses)} without inference)")
+        return results
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in prediction: {e}")
+        print(f"Error in batch prediction: {e}")
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
 # ============================================================================
@@ -430,113 +1035,38 @@ async def predict_crops(input_data: PredictionInput) -> List[CropRecommendation]
 # ============================================================================
 
 
-async def fetch_weather_data(city: str, state: str, season: str = 'Whole Year') -> WeatherData:
-    """
-    Fetch weather data with realistic Gujarat city and season-specific rainfall data
-    Uses pre-defined rainfall values based on both city and season for accuracy
-    """
-    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
-    print("--------------------api key----------------------")
-    url = f'http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric'
-    
-    # Get realistic rainfall for Gujarat cities based on city AND season
-    realistic_rainfall = 600.0  # Default fallback
-    if gujarat_city_season_rainfall and city in gujarat_city_season_rainfall:
-        city_data = gujarat_city_season_rainfall[city]
-        if season in city_data:
-            realistic_rainfall = city_data[season]
-            print(f"🌧️ Using realistic rainfall for {city} in {season}: {realistic_rainfall}mm")
-        else:
-            realistic_rainfall = city_data.get('Whole Year', 600.0)
-            print(f"🌧️ Season {season} not found, using annual average for {city}: {realistic_rainfall}mm")
-    else:
-        print(f"⚠️ City {city} not found in rainfall data, using default: {realistic_rainfall}mm")
-        if gujarat_city_season_rainfall:
-            print(f"🔍 Available cities: {list(gujarat_city_season_rainfall.keys())[:10]}...")  # Show first 10 cities
-    
-    try:
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            weather_data = response.json()
-            
-            # Extract weather data (except rainfall)
-            main = weather_data.get('main', {})
-            clouds = weather_data.get('clouds', {})
-            rain = weather_data.get('rain', {})
-            
-            avg_temp = main.get('temp', 27.0)
-            humidity = main.get('humidity', 60.0)
-            cloud_cover = clouds.get('all', 20.0)
-            
-            # Get precipitation (rain in last 1 hour or 3 hours) - but don't use for annual rainfall
-            precipitation = rain.get('1h', rain.get('3h', 0.0))
-            
-            # Calculate vapor pressure from humidity and temperature
-            vap_pressure = (humidity / 100) * 6.11 * (10 ** ((7.5 * avg_temp) / (237.3 + avg_temp)))
-            
-            # Calculate wet day frequency based on realistic rainfall
-            # Higher rainfall cities have more wet days
-            if realistic_rainfall >= 1500:  # High rainfall areas (South Gujarat, Coastal)
-                wet_day_freq = 25.0
-            elif realistic_rainfall >= 800:  # Medium rainfall areas (Central Gujarat)
-                wet_day_freq = 18.0
-            elif realistic_rainfall >= 500:  # Moderate rainfall areas (North Gujarat)
-                wet_day_freq = 12.0
-            else:  # Low rainfall areas (Kutch, Saurashtra)
-                wet_day_freq = 8.0
-            
-            # Soil pH mapping for Gujarat regions
-            ph_map = {
-                'ahmedabad': 7.2, 'surat': 6.9, 'vadodara': 6.8, 'rajkot': 7.0,
-                'bhavnagar': 7.3, 'jamnagar': 7.4, 'junagadh': 6.7, 'gandhinagar': 7.1,
-                'anand': 6.9, 'nadiad': 7.0, 'valsad': 6.5, 'navsari': 6.6,
-                'bharuch': 6.8, 'bhuj': 7.8, 'gandhidham': 7.9, 'mandvi': 7.7,
-                'porbandar': 7.2, 'dwarka': 7.5, 'veraval': 7.1, 'amreli': 6.9,
-                'surendranagar': 7.6, 'morbi': 7.4, 'mehsana': 7.3, 'patan': 7.5,
-                'palanpur': 7.0, 'godhra': 6.8, 'dahod': 6.6
-            }
-            ph = ph_map.get(city.lower(), 7.0)
-            
-            return WeatherData(
-                avg_temp=round(avg_temp, 2),
-                rainfall=round(realistic_rainfall, 2),  # Use realistic rainfall instead of API
-                precipitation=round(precipitation, 2),
-                vap_pressure=round(vap_pressure, 2),
-                wet_day_freq=round(wet_day_freq, 2),
-                ph=ph,
-                cloud_cover=round(cloud_cover, 2)
-            )
-    except Exception as e:
-        print(f"Weather API Error: {e}")
-    
-    # Fallback to historical averages from dataset with realistic rainfall
-    if df_original is not None:
-        city_data = df_original[
-            (df_original['City'] == city) & 
-            (df_original['State'] == state)
-        ]
-        
-        if not city_data.empty:
-            # Calculate wet day frequency based on realistic rainfall
-            if realistic_rainfall >= 1500:
-                wet_day_freq = 25.0
-            elif realistic_rainfall >= 800:
-                wet_day_freq = 18.0
-            elif realistic_rainfall >= 500:
-                wet_day_freq = 12.0
-            else:
-                wet_day_freq = 8.0
-                
-            return WeatherData(
-                avg_temp=round(city_data['avgTemp'].mean(), 2),
-                rainfall=round(realistic_rainfall, 2),  # Use realistic rainfall
-                precipitation=round(city_data['Precipitation'].mean(), 2),
-                vap_pressure=round(city_data['vapPressure'].mean(), 2),
-                wet_day_freq=round(wet_day_freq, 2),
-                ph=round(city_data['pH'].mean(), 2),
-                cloud_cover=round(city_data['Cloud Cover'].mean(), 2)
-            )
+def get_season_rainfall(city: str, season: str, generation: ModelGeneration = None) -> float:
+    """Get realistic rainfall (mm) for a Gujarat city and season, falling back to the annual value"""
+    generation = generation or model_registry.current
+    if generation is None:
+        return 600.0  # Default fallback
+    return generation.regions.rainfall(city, season)
+
+def wet_day_frequency(rainfall: float) -> float:
+    """Wet day frequency from rainfall - higher rainfall cities have more wet days"""
+    if rainfall >= 1500:  # High rainfall areas (South Gujarat, Coastal)
+        return 25.0
+    elif rainfall >= 800:  # Medium rainfall areas (Central Gujarat)
+        return 18.0
+    elif rainfall >= 500:  # Moderate rainfall areas (North Gujarat)
+        return 12.0
+    else:  # Low rainfall areas (Kutch, Saurashtra)
+        return 8.0
+
+def historical_weather(city: str, state: str, realistic_rainfall: float, generation: ModelGeneration = None) -> WeatherData:
+    """Historical averages from the dataset (used when the weather API is unavailable)"""
+    generation = generation or model_registry.current
+    city_data = generation.climatology.lookup(state, city) if generation else None
+    if city_data is not None:
+        return WeatherData(
+            avg_temp=round(city_data['avg_temp'], 2),
+            rainfall=round(realistic_rainfall, 2),  # Use realistic rainfall
+            precipitation=round(city_data['precipitation'], 2),
+            vap_pressure=round(city_data['vap_pressure'], 2),
+            wet_day_freq=round(wet_day_frequency(realistic_rainfall), 2),
+            ph=round(city_data['ph'], 2),
+            cloud_cover=round(city_data['cloud_cover'], 2)
+        )
     
     # Ultimate fallback with realistic rainfall
     wet_day_freq = 15.0 if realistic_rainfall >= 600 else 10.0
@@ -551,6 +1081,221 @@ async def fetch_weather_data(city: str, state: str, season: str = 'Whole Year')
         cloud_cover=35.0
     )
 
+OPENWEATHERMAP_API_URL = 'https://api.openweathermap.org/data/2.5'
+
+# OpenWeatherMap city ids, learned from single-city responses (enables group queries)
+weather_city_ids = {}
+
+def parse_weather_observation(weather_data: dict) -> dict:
+    """Temperature, precipitation, vapour pressure and cloud cover from an OpenWeatherMap payload"""
+    # Extract weather data (rainfall comes from the seasonal tables instead)
+    main = weather_data.get('main', {})
+    clouds = weather_data.get('clouds', {})
+    rain = weather_data.get('rain', {})
+
+    avg_temp = main.get('temp', 27.0)
+    humidity = main.get('humidity', 60.0)
+
+    return {
+        "avg_temp": avg_temp,
+        "humidity": humidity,
+        # Rain in last 1 hour or 3 hours - but don't use for annual rainfall
+        "precipitation": rain.get('1h', rain.get('3h', 0.0)),
+        # Calculate vapor pressure from humidity and temperature
+        "vap_pressure": (humidity / 100) * 6.11 * (10 ** ((7.5 * avg_temp) / (237.3 + avg_temp))),
+        "cloud_cover": clouds.get('all', 20.0),
+    }
+
+# Trips after repeated upstream failures so an outage costs no network time per request
+weather_breaker = CircuitBreaker(
+    "openweathermap",
+    failure_threshold=WEATHER_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout_seconds=WEATHER_BREAKER_RESET_SECONDS,
+    half_open_max_calls=WEATHER_BREAKER_HALF_OPEN_MAX_CALLS
+)
+
+async def call_weather_api(endpoint: str, params: dict) -> Optional[dict]:
+    """
+    GET an OpenWeatherMap endpoint through the circuit breaker
+    Returns the JSON payload, or None when the key is missing, the circuit is open or the call fails
+    """
+    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+    if not api_key or not weather_breaker.allow_request():
+        return None
+
+    try:
+        response = await weather_client.get(f'{OPENWEATHERMAP_API_URL}/{endpoint}', params={
+            **params, 'appid': api_key, 'units': 'metric'
+        })
+    except Exception as e:
+        print(f"Weather API Error: {e}")
+        weather_breaker.record_failure()
+        return None
+    except BaseException:
+        # Cancelled (e.g. shutdown): an outcome must still be recorded, or a half-open trial slot stays taken
+        weather_breaker.record_failure()
+        raise
+
+    if response.status_code == 404:
+        weather_breaker.record_success()  # unknown city, the service itself is fine
+        return None
+    if response.status_code != 200:
+        weather_breaker.record_failure()
+        return None
+
+    weather_breaker.record_success()
+    return response.json()
+
+async def fetch_weather_observation(city: str, state: str) -> Optional[dict]:
+    """Current conditions for a city from OpenWeatherMap, or None if unavailable"""
+    try:
+        weather_data = await call_weather_api('weather', {'q': city})
+        if weather_data is None:
+            return None
+
+        if weather_data.get('id'):
+            weather_city_ids[city] = weather_data['id']
+        observation = parse_weather_observation(weather_data)
+        record_weather_observation(city, state, observation)
+        return observation
+    except Exception as e:
+        print(f"Weather API Error: {e}")
+        return None
+
+async def fetch_weather_group(locations: List[tuple]) -> dict:
+    """
+    Current conditions for up to 20 locations with known city ids in one call
+    Returns {(city, state): observation} for the cities present in the response (empty on error)
+    """
+    locations_by_id = {weather_city_ids[city]: (city, state) for city, state in locations}
+    try:
+        weather_data = await call_weather_api('group', {
+            'id': ",".join(str(city_id) for city_id in locations_by_id)
+        })
+        if weather_data is None:
+            return {}
+
+        observations = {
+            locations_by_id[item['id']]: parse_weather_observation(item)
+            for item in weather_data.get('list', [])
+            if item.get('id') in locations_by_id
+        }
+        for (city, state), observation in observations.items():
+            record_weather_observation(city, state, observation)
+        return observations
+    except Exception as e:
+        print(f"Weather API Error: {e}")
+        return {}
+
+weather_fallback_stats = {"budget_exceeded": 0, "last_known": 0, "recent_average": 0, "climatology": 0}
+
+def known_weather_locations() -> List[tuple]:
+    """Every (city, state) the app serves: dataset cities plus region registry cities"""
+    generation = model_registry.current
+    if generation is None:
+        return []
+    cities = set(generation.cities) | set(generation.regions.cities)
+    return [(city, "Gujarat") for city in sorted(cities)]
+
+def is_known_weather_location(city: str, state: str) -> bool:
+    generation = model_registry.current
+    return (generation is not None and state == "Gujarat" and
+            (city in generation.regions or city in generation.cities))
+
+# Observations are cached per location; season only changes the rainfall applied on top
+weather_store = WeatherStore(
+    fetch_weather_observation,
+    ttl_seconds=WEATHER_CACHE_TTL_SECONDS,
+    max_stale_seconds=WEATHER_CACHE_MAX_STALE_SECONDS,
+    failure_ttl_seconds=WEATHER_FAILURE_TTL_SECONDS
+)
+
+weather_prefetcher = WeatherPrefetcher(
+    weather_store,
+    known_weather_locations,
+    fetch_one_fn=fetch_weather_observation,
+    fetch_group_fn=fetch_weather_group,
+    can_group_fn=lambda location: location[0] in weather_city_ids,
+    interval_seconds=WEATHER_REFRESH_INTERVAL_SECONDS,
+    group_size=WEATHER_PREFETCH_GROUP_SIZE,
+    request_gap_seconds=WEATHER_PREFETCH_REQUEST_GAP_SECONDS,
+    jitter_seconds=WEATHER_PREFETCH_JITTER_SECONDS
+)
+
+def start_weather_prefetcher():
+    """Start the background weather refresh (called from the app lifespan)"""
+    if not WEATHER_PREFETCH_ENABLED:
+        return
+    if not os.getenv("OPENWEATHERMAP_API_KEY"):
+        print("⚠️ OPENWEATHERMAP_API_KEY not set, weather prefetch disabled")
+        return
+    weather_prefetcher.start()
+    print(f"🌦️ Weather prefetch started for {len(known_weather_locations())} cities")
+
+async def stop_weather_prefetcher():
+    await weather_prefetcher.stop()
+
+async def fetch_weather_data(city: str, state: str, season: str = 'Whole Year',
+                             generation: ModelGeneration = None) -> WeatherData:
+    """
+    Fetch weather data with realistic Gujarat city and season-specific rainfall data
+    Uses pre-defined rainfall values based on both city and season for accuracy
+    Live conditions come from the weather store (cached, refreshed in the background)
+    """
+    generation = generation or model_registry.current
+    regions = generation.regions if generation else None
+    
+    # Get realistic rainfall for Gujarat cities based on city AND season
+    realistic_rainfall = get_season_rainfall(city, season, generation)
+    if regions is not None and city in regions:
+        if season in regions.seasons:
+            print(f"🌧️ Using realistic rainfall for {city} in {season}: {realistic_rainfall}mm")
+        else:
+            print(f"🌧️ Season {season} not found, using annual average for {city}: {realistic_rainfall}mm")
+    else:
+        print(f"⚠️ City {city} not found in rainfall data, using default: {realistic_rainfall}mm")
+        if regions is not None:
+            print(f"🔍 Available cities: {regions.cities[:10]}...")  # Show first 10 cities
+
+    location = (city, state)
+    if weather_prefetcher.running and is_known_weather_location(city, state):
+        # Kept warm in the background - never wait on the network for a known city
+        observation = weather_store.peek(location)
+    else:
+        try:
+            # The upstream call keeps running (and fills the store) if the budget runs out
+            observation = await asyncio.wait_for(weather_store.get(location), WEATHER_LATENCY_BUDGET_MS / 1000)
+        except asyncio.TimeoutError:
+            weather_fallback_stats["budget_exceeded"] += 1
+            observation = None
+
+    if observation is None:
+        # Hedge: last observation seen for this city, however old, before the dataset averages
+        observation = weather_store.last_known(location)
+        if observation is not None:
+            weather_fallback_stats["last_known"] += 1
+
+    if observation is None:
+        # Then our own recorded averages for the city (see weather_history_controller)
+        observation = recent_weather_averages.get(location)
+        if observation is not None:
+            weather_fallback_stats["recent_average"] += 1
+
+    if observation is not None:
+        return WeatherData(
+            avg_temp=round(observation["avg_temp"], 2),
+            rainfall=round(realistic_rainfall, 2),  # Use realistic rainfall instead of API
+            precipitation=round(observation["precipitation"], 2),
+            vap_pressure=round(observation["vap_pressure"], 2),
+            wet_day_freq=round(wet_day_frequency(realistic_rainfall), 2),
+            ph=float(regions.soil_ph[regions.row(city)]) if regions is not None else 7.0,
+            cloud_cover=round(observation["cloud_cover"], 2)
+        )
+
+    # Fallback to historical averages from dataset with realistic rainfall
+    weather_fallback_stats["climatology"] += 1
+    return historical_weather(city, state, realistic_rainfall, generation)
+
 
 async def get_weather(state: str, city: str, season: str = 'Whole Year') -> WeatherData:
     """Get weather data for a specific city and optional season"""
@@ -562,7 +1307,8 @@ async def get_weather(state: str, city: str, season: str = 'Whole Year') -> Weat
 
 async def get_options():
     """Get available options for form dropdowns"""
-    if not models_loaded:
+    generation = model_registry.current
+    if generation is None:
         # Return default options if models aren't loaded
         return {
             "states": ["Gujarat"],
@@ -575,9 +1321,9 @@ async def get_options():
     try:
         return {
             "states": ["Gujarat"],
-            "cities": gujarat_cities,
-            "seasons": label_encoders['Season'].classes_.tolist(),
-            "soil_types": label_encoders['Soil Type'].classes_.tolist(),
+            "cities": generation.cities,
+            "seasons": generation.label_encoders['Season'].classes_.tolist(),
+            "soil_types": generation.label_encoders['Soil Type'].classes_.tolist(),
             "water_availability": ["High", "Medium", "Low"]
         }
     except Exception as e:
@@ -589,4 +1335,48 @@ async def get_options():
             "seasons": ["Kharif", "Rabi", "Summer", "Whole Year"],
             "soil_types": ["Black", "Red", "Loamy"],
             "water_availability": ["High", "Medium", "Low"]
-        }
\ No newline at end of file
+        }
+
+# ============================================================================
+# STARTUP
+# ============================================================================
+
+_model_startup_task = None
+
+async def _load_models_and_start_background_tasks():
+    try:
+        await model_registry.reload("startup")
+        ready_at = startup_timer.mark("models_ready")
+        print(f"✅ Models ready {ready_at:.2f}s after startup "
+              f"(load {model_registry.last_load_seconds}s, warm-up {model_registry.last_warm_seconds}s)")
+    except Exception as e:
+        print(f"❌ Models not loaded: {e}")
+    # Prefetch needs the city list from the models; the watcher also picks up models trained later
+    start_weather_prefetcher()
+    start_model_watch()
+
+async def start_models():
+    """
+    Load and warm the models, then start the weather prefetcher and model watcher (called from the app lifespan)
+    
+    By default the app only accepts traffic once the models are warm. With
+    MODEL_LOAD_IN_BACKGROUND=true it starts at once, and /health/ready and
+    prediction requests answer 503 until loading has finished.
+    """
+    global _model_startup_task
+    if MODEL_LOAD_IN_BACKGROUND:
+        _model_startup_task = asyncio.get_running_loop().create_task(_load_models_and_start_background_tasks())
+    else:
+        await _load_models_and_start_background_tasks()
+
+async def stop_models():
+    global _model_startup_task
+    if _model_startup_task is not None:
+        _model_startup_task.cancel()
+        try:
+            await _model_startup_task
+        except asyncio.CancelledError:
+            pass
+        _model_startup_task = None
+    await stop_model_watch()
+    await stop_weather_prefetcher()
@@ -0,0 +1,198 @@
+"""
+Weather History Controller
+
+Persists every live OpenWeatherMap observation into the `weather_observations`
+MongoDB time-series collection and downsamples it into hourly/daily rollups
+(`weather_rollups`). Recent per-city averages are kept in memory so the
+weather fallback can use our own observations before the dataset climatology.
+"""
+
+from fastapi import HTTPException
+from config.database import weather_observations, weather_rollups
+from config.constants import (
+    WEATHER_HISTORY_ENABLED,
+    WEATHER_WRITER_BATCH_SIZE,
+    WEATHER_WRITER_FLUSH_SECONDS,
+    WEATHER_WRITER_MAX_BUFFER,
+    WEATHER_ROLLUP_INTERVAL_SECONDS,
+    WEATHER_RECENT_AVERAGE_DAYS,
+    WEATHER_HISTORY_MAX_DAYS
+)
+from models.weather_model import WeatherHistoryPoint, WeatherHistoryResponse
+from utils.observation_writer import ObservationWriter
+from datetime import datetime, timezone, timedelta
+import asyncio
+
+OBSERVATION_FIELDS = ["avg_temp", "humidity", "precipitation", "vap_pressure", "cloud_cover"]
+
+# Rollup granularity -> how many periods back are re-aggregated each run (the current one is partial)
+ROLLUP_GRANULARITIES = {"hour": 2, "day": 1}
+
+observation_writer = ObservationWriter(
+    weather_observations,
+    batch_size=WEATHER_WRITER_BATCH_SIZE,
+    flush_interval_seconds=WEATHER_WRITER_FLUSH_SECONDS,
+    max_buffer=WEATHER_WRITER_MAX_BUFFER
+)
+
+# (city, state) -> mean observation over the last WEATHER_RECENT_AVERAGE_DAYS days
+recent_weather_averages = {}
+rollup_stats = {"runs": 0, "failures": 0, "last_run_at": None}
+_rollup_task = None
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+def record_weather_observation(city: str, state: str, observation: dict):
+    """Queue a live observation for the time-series collection (never waits on the database)"""
+    observation_writer.record({
+        "timestamp": datetime.now(timezone.utc),
+        "location": {"city": city, "state": state},
+        **{field: observation[field] for field in OBSERVATION_FIELDS if field in observation}
+    })
+
+# ============================================================================
+# ROLLUPS
+# ============================================================================
+
+def period_start(now: datetime, unit: str, periods_back: int) -> datetime:
+    """Start of the hour/day `periods_back` periods before the one containing `now`"""
+    if unit == "hour":
+        return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=periods_back)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=periods_back)
+
+async def rollup_weather_observations():
+    """Re-aggregate the latest hourly and daily periods from raw observations into weather_rollups"""
+    now = datetime.now(timezone.utc)
+    for unit, periods_back in ROLLUP_GRANULARITIES.items():
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": period_start(now, unit, periods_back)}}},
+            {"$group": {
+                "_id": {
+                    "city": "$location.city",
+                    "state": "$location.state",
+                    "period": {"$dateTrunc": {"date": "$timestamp", "unit": unit}}
+                },
+                **{field: {"$avg": f"${field}"} for field in OBSERVATION_FIELDS},
+                "samples": {"$sum": 1}
+            }},
+            {"$project": {
+                "_id": 0,
+                "city": "$_id.city",
+                "state": "$_id.state",
+                "granularity": unit,
+                "period": "$_id.period",
+                **{field: 1 for field in OBSERVATION_FIELDS},
+                "samples": 1
+            }},
+            {"$merge": {
+                "into": "weather_rollups",
+                "on": ["city", "state", "granularity", "period"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }}
+        ]
+        await weather_observations.aggregate(pipeline).to_list(length=None)
+
+async def refresh_recent_weather_averages():
+    """Reload per-city averages over the last WEATHER_RECENT_AVERAGE_DAYS days of daily rollups"""
+    since = datetime.now(timezone.utc) - timedelta(days=WEATHER_RECENT_AVERAGE_DAYS)
+    pipeline = [
+        {"$match": {"granularity": "day", "period": {"$gte": since}}},
+        {"$group": {
+            "_id": {"city": "$city", "state": "$state"},
+            **{field: {"$avg": f"${field}"} for field in OBSERVATION_FIELDS}
+        }}
+    ]
+    averages = {}
+    for doc in await weather_rollups.aggregate(pipeline).to_list(length=None):
+        if all(doc.get(field) is not None for field in OBSERVATION_FIELDS):
+            averages[(doc["_id"]["city"], doc["_id"]["state"])] = {field: doc[field] for field in OBSERVATION_FIELDS}
+
+    recent_weather_averages.clear()
+    recent_weather_averages.update(averages)
+
+async def _rollup_loop():
+    while True:
+        try:
+            await rollup_weather_observations()
+            await refresh_recent_weather_averages()
+            rollup_stats["runs"] += 1
+            rollup_stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            rollup_stats["failures"] += 1
+            print(f"Weather rollup failed: {e}")
+        await asyncio.sleep(WEATHER_ROLLUP_INTERVAL_SECONDS)
+
+# ============================================================================
+# LIFECYCLE
+# ============================================================================
+
+def start_weather_history():
+    """Start the observation writer and rollup task (called from the app lifespan)"""
+    global _rollup_task
+    if not WEATHER_HISTORY_ENABLED:
+        return
+    observation_writer.start()
+    if _rollup_task is None or _rollup_task.done():
+        _rollup_task = asyncio.get_running_loop().create_task(_rollup_loop())
+
+async def stop_weather_history():
+    global _rollup_task
+    if _rollup_task is not None:
+        _rollup_task.cancel()
+        try:
+            await _rollup_task
+        except asyncio.CancelledError:
+            pass
+        _rollup_task = None
+    await observation_writer.stop()
+
+def weather_history_stats() -> dict:
+    return {
+        "writer": observation_writer.stats(),
+        "rollups": rollup_stats,
+        "cities_with_recent_averages": len(recent_weather_averages),
+    }
+
+# ============================================================================
+# API
+# ============================================================================
+
+async def get_weather_history(state: str, city: str, days: int = 7, granularity: str = "day") -> WeatherHistoryResponse:
+    """
+    Recorded weather for a city from our own observations
+    - granularity: 'hour' or 'day' rollups
+    - days: how far back to look
+    Averages are weighted by the number of observations in each period
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    if days < 1 or days > WEATHER_HISTORY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {WEATHER_HISTORY_MAX_DAYS}")
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    cursor = weather_rollups.find(
+        {"city": city, "state": state, "granularity": granularity, "period": {"$gte": since}},
+        {"_id": 0}
+    ).sort("period", 1)
+    points = [WeatherHistoryPoint(**doc) for doc in await cursor.to_list(length=None)]
+
+    averages = {}
+    for field in OBSERVATION_FIELDS:
+        weighted = [(getattr(point, field), point.samples) for point in points if getattr(point, field) is not None]
+        total_samples = sum(samples for _, samples in weighted)
+        if total_samples:
+            averages[field] = round(sum(value * samples for value, samples in weighted) / total_samples, 2)
+
+    return WeatherHistoryResponse(
+        state=state,
+        city=city,
+        granularity=granularity,
+        days=days,
+        points=points,
+        averages=averages
+    )
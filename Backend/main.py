@@ -1,10 +1,33 @@
+from utils.startup_timer import startup_timer  # first, so startup timings include the imports below
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from config.database import lifespan
+from config.database import lifespan as database_lifespan
 from fastapi.middleware.cors import CORSMiddleware
 from routes.prediction_routes import router as prediction_router
 from routes.auth_routes import router as auth_router
 from routes.contact_routes import router as contact_router
+from routes.metrics_routes import router as metrics_router
+from routes.admin_routes import router as admin_router
+from routes.health_routes import router as health_router
+from controllers.prediction_controller import start_models, stop_models
+from controllers.weather_history_controller import start_weather_history, stop_weather_history
+from utils.http_client import close_http_clients
+
+startup_timer.mark("imports")
+
+@asynccontextmanager
+async def lifespan(app):
+    async with database_lifespan(app):
+        startup_timer.mark("database")
+        start_weather_history()
+        # Models load and warm here (or in the background, see MODEL_LOAD_IN_BACKGROUND)
+        await start_models()
+        print(f"🚀 Startup finished in {startup_timer.mark('app_started'):.2f}s: {startup_timer.stats()}")
+        yield
+        await stop_models()
+        await stop_weather_history()
+        await close_http_clients()
 
 app = FastAPI(title="AgriNova Crop Recommendation API", lifespan=lifespan)
 
@@ -29,6 +52,9 @@ app.add_middleware(
 app.include_router(prediction_router)
 app.include_router(auth_router)
 app.include_router(contact_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(health_router)
 
 if __name__ == "__main__":
     import uvicorn
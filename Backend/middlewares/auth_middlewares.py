@@ -1,5 +1,5 @@
 
-from fastapi import Request, HTTPException
+from fastapi import Request, HTTPException, Depends
 from utils.auth import decode_token
 from config.database import database
 from bson import ObjectId
@@ -35,3 +35,10 @@ async def protect(request: Request):
     }
 
     return request.state.user
+
+# Admin Middleware (protect + admin role)
+async def admin_only(user: dict = Depends(protect)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return user
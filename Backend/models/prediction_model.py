@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class PredictionInput(BaseModel):
     state: str
@@ -28,3 +28,7 @@ class CropRecommendation(BaseModel):
     avg_price: float
     profit_per_acre_formatted: Optional[str] = None
     total_profit_formatted: Optional[str] = None
+
+class PredictionResponse(BaseModel):
+    recommendations: List[CropRecommendation]
+    weather: WeatherData
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class WeatherHistoryPoint(BaseModel):
+    period: datetime
+    avg_temp: Optional[float] = None
+    humidity: Optional[float] = None
+    precipitation: Optional[float] = None
+    vap_pressure: Optional[float] = None
+    cloud_cover: Optional[float] = None
+    samples: int
+
+class WeatherHistoryResponse(BaseModel):
+    state: str
+    city: str
+    granularity: str
+    days: int
+    points: List[WeatherHistoryPoint]
+    averages: Dict[str, float]
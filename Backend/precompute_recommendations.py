@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+AgriNova Recommendation Table Precompute Job
+
+Scores every (city, season, soil type, water availability) combination with
+temperature bucketed to 1 °C and precipitation, vapour pressure and cloud
+cover in coarse bins (RECOMMENDATION_TABLE_WEATHER_BINS), and saves the
+ranked, per-acre results. At request time /api/predict snaps the request's
+weather, live or historical, to its bins, answers from this table and applies
+the farm area as a multiplier.
+
+Re-run this job after every retraining (a table built for another model is ignored).
+A running server picks up the new table on its next model reload (automatic
+when the model file watcher is enabled).
+
+Usage: python precompute_recommendations.py
+"""
+
+import os
+import time
+from controllers.prediction_controller import (
+    load_models,
+    precompute_recommendation_table,
+    RECOMMENDATION_TABLE_PATH
+)
+
+print("🌾 AgriNova Recommendation Table Precompute")
+print("=" * 60)
+
+if not load_models():
+    print("❌ Models not loaded. Please run: python train_simple_model.py")
+    raise SystemExit(1)
+
+print("🔢 Scoring the full input grid...")
+start = time.perf_counter()
+table = precompute_recommendation_table()
+elapsed = time.perf_counter() - start
+
+table.save(RECOMMENDATION_TABLE_PATH)
+
+print(f"   ✅ Scored {len(table):,} grid points in {elapsed:.1f}s")
+print(f"   📍 Cities: {len(table.axes['city'])}, seasons: {len(table.axes['season'])}, "
+      f"soil types: {len(table.axes['soil_type'])}, water levels: {len(table.axes['water_availability'])}")
+print(f"   🌦️ Per city and season: {', '.join(table.weather_fields)}")
+for field, (_, values) in table.bins.items():
+    print(f"   🌡️ {field}: {len(values)} bins ({values[0]:g} to {values[-1]:g})")
+print(f"💾 Saved to {RECOMMENDATION_TABLE_PATH} ({os.path.getsize(RECOMMENDATION_TABLE_PATH) / 1024:.0f} KB)")
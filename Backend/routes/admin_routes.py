@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+from controllers.admin_controller import reload_models, get_model_status
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+router.get("/models")(get_model_status)
+router.post("/models/reload")(reload_models)
@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+from controllers.health_controller import liveness, readiness
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+router.get("/live")(liveness)
+router.get("/ready")(readiness)
@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+from controllers.metrics_controller import get_metrics
+
+router = APIRouter(prefix="/api", tags=["Metrics"])
+
+router.get("/metrics")(get_metrics)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter
 from controllers.prediction_controller import *
+from controllers.weather_history_controller import get_weather_history
 from models.prediction_model import *
+from models.weather_model import WeatherHistoryResponse
+from typing import List, Union
 
 router = APIRouter(prefix="/api", tags=["Predictions"])
 
 router.get("/options")(get_options)
-router.post("/predict", response_model=List[CropRecommendation])(predict_crops)
+router.post("/predict", response_model=Union[List[CropRecommendation], PredictionResponse])(predict_crops)
+router.post("/predict/batch", response_model=List[List[CropRecommendation]])(predict_crops_batch)
+# Registered before /weather/{state}/{city}/{season} so "history" is not read as a state
+router.get("/weather/history/{state}/{city}", response_model=WeatherHistoryResponse)(get_weather_history)
 router.get("/weather/{state}/{city}")(get_weather)
 router.get("/weather/{state}/{city}/{season}")(get_weather)
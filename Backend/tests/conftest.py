@@ -0,0 +1,61 @@
+"""
+Shared fixtures for the model tests
+
+The tests check the trained model in place: they read the current bundle
+(trained_models/bundles/CURRENT) and never retrain. Without a trained
+bundle they are skipped; run `python train_simple_model.py` first.
+"""
+
+import os
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config.constants import DATA_DIR, MODEL_BUNDLES_DIR  # noqa: E402
+from utils.model_bundle import ModelBundle, current_bundle_path  # noqa: E402
+from utils.regions import RegionRegistry  # noqa: E402
+from utils.training_data import (  # noqa: E402
+    CATEGORICAL_COLUMNS, load_dataset, clean_dataset, dataset_feature_inputs, engineer_dataset
+)
+
+DATASET_PATH = os.path.join(DATA_DIR, 'Final_dataset.csv')
+REGIONS_PATH = os.path.join(DATA_DIR, 'gujarat_regions.json')
+
+
+@pytest.fixture(scope="session")
+def bundle():
+    path = current_bundle_path(MODEL_BUNDLES_DIR)
+    if path is None:
+        pytest.skip("No trained model bundle; run: python train_simple_model.py")
+    return ModelBundle.open(path)
+
+
+@pytest.fixture(scope="session")
+def preprocessing(bundle):
+    return bundle.load_preprocessing()
+
+
+@pytest.fixture(scope="session")
+def regions():
+    return RegionRegistry.load(REGIONS_PATH)
+
+
+@pytest.fixture(scope="session")
+def dataset(preprocessing, regions):
+    """The full cleaned dataset with engineered features and `<col>_encoded` columns, as in training"""
+    df = clean_dataset(load_dataset(DATASET_PATH))
+    for name, values in engineer_dataset(regions, dataset_feature_inputs(df)).items():
+        df[name] = values
+    for col in CATEGORICAL_COLUMNS:
+        df[col + '_encoded'] = preprocessing['label_encoders'][col].transform(df[col].astype(str))
+    return df.dropna(subset=list(preprocessing['feature_cols'])).reset_index(drop=True)
+
+
+@pytest.fixture(scope="session")
+def dataset_matrix(dataset, preprocessing):
+    """Scaled, selected model inputs for every dataset row"""
+    X = dataset[list(preprocessing['feature_cols'])]
+    return preprocessing['scaler'].transform(preprocessing['feature_selector'].transform(X))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.features import ALL_FEATURE_COLUMNS
+
+SAMPLE_ROWS = 400
+
+
+@pytest.fixture(scope="module")
+def generation(bundle):
+    from controllers import prediction_controller
+    if not prediction_controller.load_models():
+        pytest.skip("Models could not be loaded")
+    return prediction_controller.model_registry.current
+
+
+@pytest.fixture(scope="module")
+def sample(dataset):
+    rows = np.random.default_rng(42).choice(len(dataset), size=min(SAMPLE_ROWS, len(dataset)), replace=False)
+    return dataset.iloc[np.sort(rows)].reset_index(drop=True)
+
+
+def serving_requests(rows):
+    """The PredictionInput and WeatherData the API would build for each dataset row"""
+    from models.prediction_model import PredictionInput, WeatherData
+    records = rows.to_dict('records')
+    inputs = [PredictionInput(
+        state=str(record['State']), city=str(record['City']), season=str(record['Season']),
+        soil_type=str(record['Soil Type']), water_availability=str(record['Water_Availability']), area=1.0
+    ) for record in records]
+    weathers = [WeatherData(
+        avg_temp=record['avgTemp'], rainfall=record['Rainfall'], precipitation=record['Precipitation'],
+        vap_pressure=record['vapPressure'], wet_day_freq=record['Wet Day Freq'], ph=record['pH'],
+        cloud_cover=record['Cloud Cover']
+    ) for record in records]
+    return inputs, weathers
+
+
+def test_serving_features_match_training(generation, sample):
+    """Every feature the API computes equals the training pipeline's value for the same row"""
+    from controllers.prediction_controller import build_feature_matrix
+    inputs, weathers = serving_requests(sample)
+    served = build_feature_matrix(inputs, weathers, generation)
+    trained = sample[ALL_FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+    for index, name in enumerate(ALL_FEATURE_COLUMNS):
+        np.testing.assert_array_equal(served[:, index], trained[:, index], err_msg=name)
+
+
+def test_single_row_requests_match_batch(generation, sample):
+    """The single-request fast path builds the same features as a batch"""
+    from controllers.prediction_controller import build_feature_matrix
+    inputs, weathers = serving_requests(sample.iloc[:50])
+    batch = build_feature_matrix(inputs, weathers, generation)
+    for row, (item, weather) in enumerate(zip(inputs, weathers)):
+        np.testing.assert_array_equal(build_feature_matrix([item], [weather], generation)[0], batch[row])
+
+
+def test_model_inputs_match_training(bundle, generation, sample, preprocessing):
+    """After the selector and scaler, the model sees identical inputs from both paths"""
+    from controllers.prediction_controller import build_feature_matrix, predict_probabilities
+    inputs, weathers = serving_requests(sample)
+    served = build_feature_matrix(inputs, weathers, generation)
+    trained = sample[list(preprocessing['feature_cols'])]
+    served_frame = pd.DataFrame(served, columns=ALL_FEATURE_COLUMNS)
+    served_scaled = generation.scaler.transform(generation.feature_selector.transform(served_frame))
+    trained_scaled = preprocessing['scaler'].transform(preprocessing['feature_selector'].transform(trained))
+    np.testing.assert_array_equal(served_scaled, trained_scaled)
+
+    # The served probabilities are the bundled sklearn model's on the training inputs
+    expected = bundle.load_model().predict_proba(trained_scaled)
+    np.testing.assert_allclose(predict_probabilities(served, generation), expected, rtol=0, atol=1e-12)
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.flat_forest import FlatForest, verify_flat_forest
+
+
+def test_flat_forest_matches_sklearn_on_full_dataset(bundle, dataset_matrix):
+    """The bundle's flat forest gives sklearn's probabilities for every dataset row"""
+    model = bundle.load_model()
+    forest = bundle.load_forest()
+    assert forest.n_estimators == len(model.estimators_)
+    assert forest.n_classes == len(model.classes_)
+
+    verify_flat_forest(forest, model, dataset_matrix)
+    np.testing.assert_array_equal(forest.predict_proba(dataset_matrix).argmax(axis=1),
+                                  model.predict(dataset_matrix))
+
+
+def test_flat_forest_chunked_prediction_matches(bundle, dataset_matrix):
+    """Splitting rows into chunks traversed in parallel does not change the probabilities"""
+    forest = bundle.load_forest()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        chunked = forest.predict_proba(dataset_matrix, n_chunks=4, executor=executor)
+    np.testing.assert_array_equal(chunked, forest.predict_proba(dataset_matrix))
+
+
+def test_flat_forest_from_model_round_trips(bundle, dataset_matrix, tmp_path):
+    """Flattening the bundled sklearn model again and saving/loading it gives the stored forest's output"""
+    model = bundle.load_model()
+    path = str(tmp_path / "forest.npz")
+    FlatForest.from_model(model).save(path)
+    np.testing.assert_array_equal(FlatForest.load(path).predict_proba(dataset_matrix[:500]),
+                                  bundle.load_forest().predict_proba(dataset_matrix[:500]))
@@ -11,155 +11,122 @@ Database Structure:
 - Production: in Quintals (total production for that area)
 - AVG_Price: in ₹ per Quintal
 
-Usage: python train_simple_model.py
+Usage: python train_simple_model.py [--latency-budget-ms MS] [--size-budget-mb MB] [--max-accuracy-loss 0.01]
+                                   [--search grid|halving] [--search-budget-s S] [--halving-factor 3]
+                                   [--stages load,...,export] [--force STAGES|all]
+                                   [--chunk-rows N] [--preprocess-workers N]
+
+Training runs as named stages: load → clean → features → balance → select →
+scale → search → export. Each stage's output is cached in
+trained_models/stage_cache under a hash of its code, settings, data files
+and upstream outputs, so a rerun only recomputes invalidated stages.
+--stages runs only the listed stages (plus what they need from the cache),
+--force recomputes stages even when cached.
+
+With a latency or size budget, the script trains the smallest forest (fewer
+trees and/or a depth cap) whose validation accuracy is within
+--max-accuracy-loss of the full model and that fits the budgets (p99
+single-row latency of the served flat forest, forest array size), prints the
+accuracy/latency/size Pareto report and records the choice in the manifest.
+
+With --search halving, hyperparameters are chosen by successive halving over
+trees and rows instead of the full grid. Fold scores are cached on disk
+(interrupted runs resume), and --search-budget-s caps the search time.
 """
 
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.feature_selection import SelectKBest, f_classif
-from sklearn.metrics import classification_report, accuracy_score
-import joblib
+import argparse
+import json
 import os
 import warnings
-warnings.filterwarnings('ignore')
-
-print("🌾 AgriNova High-Accuracy Crop Prediction Model Training")
-print("🎯 Target: 80%+ Accuracy")
-print("=" * 60)
-
-# Create directories if they don't exist
-os.makedirs('trained_models', exist_ok=True)
-os.makedirs('data', exist_ok=True)
-
-# Load dataset
-print("📊 Loading and analyzing dataset...")
-df = pd.read_csv('data/Final_dataset.csv')
-print(f"   Original dataset: {df.shape[0]} rows, {df.shape[1]} columns")
-
-# Data cleaning and preprocessing
-print("🧹 Advanced data cleaning...")
-df = df.dropna(subset=['Crop'])
-
-# Handle missing values in numerical columns
-numerical_cols = ['avgTemp', 'Rainfall', 'pH', 'Cloud Cover', 'Precipitation', 
-                  'Production', 'Area', 'AVG_Price', 'vapPressure', 'Wet Day Freq']
-for col in numerical_cols:
-    if col in df.columns:
-        df[col] = df[col].fillna(df[col].median())
-
-# Handle missing values in categorical columns
-categorical_cols = ['State', 'City', 'Season', 'Soil Type', 'Water_Availability']
-for col in categorical_cols:
-    if col in df.columns:
-        df[col] = df[col].fillna(df[col].mode()[0])
-
-print(f"   After cleaning: {df.shape[0]} rows")
-
-# Advanced Feature Engineering for Higher Accuracy
-print("🔧 Advanced feature engineering...")
-
-# 1. Soil pH mapping with regional variations
-soil_ph_map = {
-    "Loamy": 6.8, "Clay": 7.5, "Sandy": 6.2, "Black": 7.8, 
-    "Red": 6.5, "Alluvial": 7.0, "Laterite": 5.5
-}
-df['pH_enhanced'] = df.apply(
-    lambda row: soil_ph_map.get(row['Soil Type'], row['pH']) if pd.isna(row['pH']) else row['pH'], 
-    axis=1
+from concurrent.futures import ThreadPoolExecutor
+import utils.features
+import utils.flat_forest
+import utils.compact_forest
+import utils.forest_budget
+import utils.hyperparameter_search
+import utils.model_bundle
+import utils.regions
+import utils.training_data
+from utils.flat_forest import FlatForest, verify_flat_forest
+from utils.compact_forest import CompactForest
+from utils.hyperparameter_search import FoldCache, successive_halving_search
+from utils.forest_budget import forest_subset, evaluate_candidate, pareto_front, select_candidate
+from utils.climatology import ClimatologyIndex
+from utils.regions import RegionRegistry
+from utils.features import ALL_FEATURE_COLUMNS, verify_feature_parity
+from utils.training_data import (
+    CATEGORICAL_COLUMNS, load_dataset, clean_dataset, dataset_feature_inputs,
+    engineer_dataset, encode_categoricals, season_filter_mask, balance_crops
 )
-
-# 2. Climate suitability index
-def calculate_climate_suitability(temp, rainfall, season):
-    """Calculate climate suitability based on season-specific optimal ranges"""
-    if season == 'Kharif':  # Monsoon crops
-        temp_score = 1.0 if 25 <= temp <= 35 else 0.5
-        rain_score = 1.0 if 400 <= rainfall <= 1200 else 0.3
-    elif season == 'Rabi':  # Winter crops
-        temp_score = 1.0 if 15 <= temp <= 28 else 0.5
-        rain_score = 1.0 if 200 <= rainfall <= 600 else 0.3
-    elif season == 'Summer':  # Summer crops
-        temp_score = 1.0 if 30 <= temp <= 40 else 0.5
-        rain_score = 1.0 if 100 <= rainfall <= 400 else 0.3
-    else:  # Whole Year
-        temp_score = 1.0 if 20 <= temp <= 35 else 0.5
-        rain_score = 1.0 if 300 <= rainfall <= 800 else 0.3
-    
-    return (temp_score + rain_score) / 2
-
-df['climate_suitability'] = df.apply(
-    lambda row: calculate_climate_suitability(row['avgTemp'], row['Rainfall'], row['Season']), 
-    axis=1
-)
-
-# 3. Water-soil compatibility
-def water_soil_compatibility(water_avail, soil_type):
-    """Calculate water-soil compatibility score"""
-    compatibility_matrix = {
-        ('High', 'Black'): 1.0, ('High', 'Clay'): 0.9, ('High', 'Loamy'): 0.8,
-        ('Medium', 'Red'): 1.0, ('Medium', 'Loamy'): 0.9, ('Medium', 'Sandy'): 0.7,
-        ('Low', 'Sandy'): 1.0, ('Low', 'Red'): 0.8, ('Low', 'Laterite'): 0.7
-    }
-    return compatibility_matrix.get((water_avail, soil_type), 0.5)
-
-df['water_soil_compatibility'] = df.apply(
-    lambda row: water_soil_compatibility(row['Water_Availability'], row['Soil Type']), 
-    axis=1
-)
-
-# 4. Regional crop affinity (based on state-crop combinations)
-state_crop_counts = df.groupby(['State', 'Crop']).size().reset_index(name='count')
-state_totals = df.groupby('State').size().reset_index(name='total')
-state_crop_affinity = state_crop_counts.merge(state_totals, on='State')
-state_crop_affinity['affinity'] = state_crop_affinity['count'] / state_crop_affinity['total']
-
-affinity_dict = {}
-for _, row in state_crop_affinity.iterrows():
-    affinity_dict[(row['State'], row['Crop'])] = row['affinity']
-
-df['regional_affinity'] = df.apply(
-    lambda row: affinity_dict.get((row['State'], row['Crop']), 0.1), 
-    axis=1
+from utils.stage_cache import Stage, StageCache, run_pipeline
+from utils.model_bundle import write_model_bundle, set_current_bundle
+from config.constants import (
+    DATA_DIR, TRAINED_MODELS_DIR, MODEL_BUNDLES_DIR, MODEL_BUNDLES_KEEP, SEARCH_CACHE_DIR, STAGE_CACHE_DIR,
+    STAGE_CACHE_KEEP
 )
+warnings.filterwarnings('ignore')
 
-# 5. Productivity index
-df['productivity_index'] = (df['Production'] / (df['Area'] + 1)) * df['AVG_Price'] / 1000
-
-print("   ✅ Created 5 advanced engineered features")
-
-# Feature encoding
-print("🔢 Encoding categorical features...")
-label_encoders = {}
-for col in categorical_cols:
-    le = LabelEncoder()
-    df[col + '_encoded'] = le.fit_transform(df[col])
-    label_encoders[col] = le
-
-# Enhanced feature set with engineered features
-feature_cols = [
-    'Season_encoded', 'Soil Type_encoded', 'Water_Availability_encoded', 
-    'avgTemp', 'Rainfall', 'pH_enhanced', 'Cloud Cover', 'Precipitation', 
-    'vapPressure', 'Wet Day Freq', 'climate_suitability', 'water_soil_compatibility',
-    'regional_affinity', 'productivity_index'
-]
-
-# Remove any remaining NaN values
-df = df.dropna(subset=feature_cols + ['Crop'])
-print(f"   Final dataset: {df.shape[0]} rows")
-
-# Gujarat Crop Calendar - Season-Crop Filtering
-print("🌾 Implementing Gujarat crop calendar filtering...")
+STAGE_NAMES = ['load', 'clean', 'features', 'balance', 'select', 'scale', 'search', 'export']
+
+
+def parse_stage_names(value: str) -> list:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if names == ['all']:
+        return list(STAGE_NAMES)
+    unknown = [name for name in names if name not in STAGE_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown stages {unknown}; stages are {', '.join(STAGE_NAMES)}")
+    return names
+
+
+parser = argparse.ArgumentParser(description="Train the AgriNova crop recommendation model")
+parser.add_argument("--latency-budget-ms", type=float, default=None,
+                    help="p99 single-row latency budget for the served forest (enables budget mode)")
+parser.add_argument("--size-budget-mb", type=float, default=None,
+                    help="forest array size budget in MB (enables budget mode)")
+parser.add_argument("--max-accuracy-loss", type=float, default=0.01,
+                    help="tolerated validation accuracy loss against the full model in budget mode")
+parser.add_argument("--search", choices=["grid", "halving"], default="grid",
+                    help="hyperparameter search: full grid, or successive halving with cached folds")
+parser.add_argument("--search-budget-s", type=float, default=None,
+                    help="wall-clock budget in seconds for the halving search (rerun to resume from the cache)")
+parser.add_argument("--halving-factor", type=int, default=3,
+                    help="halving search: keep 1/factor of the configs per rung, with factor x more trees and rows")
+parser.add_argument("--stages", type=parse_stage_names, default=None,
+                    help=f"comma-separated stages to run, with what they need from the cache ({','.join(STAGE_NAMES)})")
+parser.add_argument("--force", type=parse_stage_names, default=[],
+                    help="comma-separated stages to recompute even if cached, or 'all'")
+parser.add_argument("--chunk-rows", type=int, default=None,
+                    help="engineer features in chunks of this many rows (bounds memory on large datasets)")
+parser.add_argument("--preprocess-workers", type=int, default=1,
+                    help="threads for chunked feature engineering (with --chunk-rows)")
+args = parser.parse_args()
+
+# Absolute, so the script can run from any directory
+DATASET_PATH = os.path.join(DATA_DIR, 'Final_dataset.csv')
+REGIONS_PATH = os.path.join(DATA_DIR, 'gujarat_regions.json')
+CROP_CALENDAR_PATH = os.path.join(DATA_DIR, 'gujarat_crop_calendar.json')
+
+# Candidate shapes for budget mode (each combined with the grid search's best settings)
+BUDGET_TREE_COUNTS = [25, 50, 100, 200, 300]
+BUDGET_DEPTH_CAPS = [8, 12, 16, 20]
+SEARCH_CV_FOLDS = 3
 
 # Define Gujarat crop calendar based on agricultural practices
 gujarat_crop_calendar = {
     'Kharif': [
-        'Rice', 'Cotton(lint)', 'Maize', 'Bajra', 'Jowar', 'Groundnut', 
+        'Rice', 'Cotton(lint)', 'Maize', 'Bajra', 'Jowar', 'Groundnut',
         'Soyabean', 'Sugarcane'  # Sugarcane is planted in Kharif but harvested later
     ],
     'Rabi': [
-        'Wheat', 'Gram', 'Potato', 'Onion', 'Mustard', 'Cumin', 'Coriander', 
+        'Wheat', 'Gram', 'Potato', 'Onion', 'Mustard', 'Cumin', 'Coriander',
         'Fennel', 'Barley'
     ],
     'Summer': [
@@ -171,76 +138,7 @@ gujarat_crop_calendar = {
     ]
 }
 
-# Filter dataset to include only season-appropriate crops
-def is_season_appropriate(crop, season):
-    """Check if crop is appropriate for the given season"""
-    for season_key, crops in gujarat_crop_calendar.items():
-        if crop in crops and season_key == season:
-            return True
-        elif crop in crops and season == 'Whole Year':
-            return True
-        elif season == 'Whole Year' and crop in gujarat_crop_calendar['Whole Year']:
-            return True
-    return False
-
-# Apply season filtering
-print("   Filtering crops by season appropriateness...")
-df_season_filtered = df[df.apply(lambda row: is_season_appropriate(row['Crop'], row['Season']), axis=1)].copy()
-print(f"   After season filtering: {df_season_filtered.shape[0]} rows (removed {df.shape[0] - df_season_filtered.shape[0]} inappropriate season-crop combinations)")
-
-# Smart crop balancing for better accuracy
-print("⚖️ Smart crop balancing...")
-crop_counts = df_season_filtered['Crop'].value_counts()
-print(f"   Season-appropriate crops: {len(crop_counts)} unique crops")
-
-# Focus on top crops with sufficient data (minimum 50 samples after filtering)
-min_samples = 50  # Reduced threshold due to season filtering
-major_crops = crop_counts[crop_counts >= min_samples].index.tolist()
-df_filtered = df_season_filtered[df_season_filtered['Crop'].isin(major_crops)].copy()
-
-print(f"   Filtered to {len(major_crops)} major crops with {df_filtered.shape[0]} samples")
-print(f"   Major crops: {major_crops}")
-
-# Balance the dataset to prevent overfitting on dominant crops
-max_samples_per_crop = 800  # Limit to prevent any single crop from dominating
-balanced_dfs = []
-
-for crop in major_crops:
-    crop_data = df_filtered[df_filtered['Crop'] == crop]
-    if len(crop_data) > max_samples_per_crop:
-        crop_data = crop_data.sample(n=max_samples_per_crop, random_state=42)
-    balanced_dfs.append(crop_data)
-
-df_balanced = pd.concat(balanced_dfs, ignore_index=True)
-print(f"   Balanced dataset: {df_balanced.shape[0]} rows")
-
-# Prepare features and target
-X = df_balanced[feature_cols]
-y_crop = df_balanced['Crop']
-
-# Encode crop labels
-crop_encoder = LabelEncoder()
-y_crop_encoded = crop_encoder.fit_transform(y_crop)
-
-# Feature selection for optimal performance
-print("🔍 Selecting best features...")
-selector = SelectKBest(score_func=f_classif, k=12)  # Select top 12 features
-X_selected = selector.fit_transform(X, y_crop_encoded)
-selected_features = [feature_cols[i] for i in selector.get_support(indices=True)]
-print(f"   Selected {len(selected_features)} best features: {selected_features}")
-
-# Scale features
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X_selected)
-
-# Train-test split with stratification
-print("🎯 Training optimized model...")
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y_crop_encoded, test_size=0.2, random_state=42, stratify=y_crop_encoded
-)
-
 # Hyperparameter optimization for higher accuracy
-print("   🔧 Optimizing hyperparameters...")
 param_grid = {
     'n_estimators': [400, 500],
     'max_depth': [25, 30],
@@ -249,278 +147,386 @@ param_grid = {
     'max_features': ['sqrt', 'log2']
 }
 
-# Use a smaller grid search for speed
-rf_base = RandomForestClassifier(random_state=42, n_jobs=-1, class_weight='balanced')
-grid_search = GridSearchCV(
-    rf_base, param_grid, cv=3, scoring='accuracy', n_jobs=-1, verbose=1
-)
-grid_search.fit(X_train, y_train)
-
-# Best model
-rf_model = grid_search.best_estimator_
-print(f"   ✅ Best parameters: {grid_search.best_params_}")
-
-# Model evaluation
-train_accuracy = rf_model.score(X_train, y_train)
-test_accuracy = rf_model.score(X_test, y_test)
-
-# Cross-validation for robust accuracy estimate
-cv_scores = cross_val_score(rf_model, X_scaled, y_crop_encoded, cv=5, scoring='accuracy')
-
-# Save all model components
-print("💾 Saving optimized model files...")
-joblib.dump(rf_model, 'trained_models/crop_model.pkl')
-joblib.dump(crop_encoder, 'trained_models/crop_encoder.pkl')
-joblib.dump(label_encoders, 'trained_models/label_encoders.pkl')
-joblib.dump(scaler, 'trained_models/scaler.pkl')
-joblib.dump(selected_features, 'trained_models/feature_cols.pkl')  # Save selected features
-joblib.dump(selector, 'trained_models/feature_selector.pkl')  # Save selector for prediction
-
-# Create crop statistics for profit calculations
-print("📈 Creating crop statistics...")
-df_original = pd.read_csv('data/Final_dataset.csv')
-df_original = df_original.dropna(subset=['Crop', 'Production', 'Area', 'AVG_Price'])
-
-crop_stats = df_original.groupby('Crop').agg({
-    'Production': 'mean',  # Average production in quintals
-    'Area': 'mean',        # Average area in acres
-    'AVG_Price': 'mean'    # Average price in ₹ per quintal
-}).reset_index()
-
-crop_stats.to_csv('data/crop_stats.csv', index=False)
-
-# Save Gujarat crop calendar for prediction use
-print("📅 Saving Gujarat crop calendar...")
-import json
-with open('data/gujarat_crop_calendar.json', 'w') as f:
-    json.dump(gujarat_crop_calendar, f, indent=2)
-
-print("   ✅ Crop calendar saved for prediction filtering")
-
-# Create Gujarat city and season-specific realistic rainfall data
-print("🌧️ Creating Gujarat city and season-specific rainfall data...")
-
-# Gujarat cities with season-specific rainfall data (in mm)
-# Based on historical meteorological data and agricultural patterns
-gujarat_city_season_rainfall = {
-    # Major Cities
-    'Ahmedabad': {
-        'Kharif': 480,      # Monsoon season (June-Sept) - 85% of annual
-        'Rabi': 45,         # Winter season (Oct-Feb) - 8% of annual  
-        'Summer': 25,       # Summer season (Mar-May) - 7% of annual
-        'Whole Year': 550   # Annual average
-    },
-    'Surat': {
-        'Kharif': 1020,     # High monsoon rainfall
-        'Rabi': 120,        # Moderate winter rainfall
-        'Summer': 60,       # Low summer rainfall
-        'Whole Year': 1200
-    },
-    'Vadodara': {
-        'Kharif': 765,
-        'Rabi': 90,
-        'Summer': 45,
-        'Whole Year': 900
-    },
-    'Rajkot': {
-        'Kharif': 550,      # Good for cotton
-        'Rabi': 65,
-        'Summer': 35,
-        'Whole Year': 650
-    },
-    'Bhavnagar': {
-        'Kharif': 425,
-        'Rabi': 50,
-        'Summer': 25,
-        'Whole Year': 500
-    },
-    'Jamnagar': {
-        'Kharif': 380,
-        'Rabi': 45,
-        'Summer': 25,
-        'Whole Year': 450
-    },
-    'Junagadh': {
-        'Kharif': 765,
-        'Rabi': 90,
-        'Summer': 45,
-        'Whole Year': 900
-    },
-    'Gandhinagar': {
-        'Kharif': 510,
-        'Rabi': 60,
-        'Summer': 30,
-        'Whole Year': 600
-    },
-    'Anand': {
-        'Kharif': 680,
-        'Rabi': 80,
-        'Summer': 40,
-        'Whole Year': 800
-    },
-    'Nadiad': {
-        'Kharif': 635,
-        'Rabi': 75,
-        'Summer': 40,
-        'Whole Year': 750
-    },
-    
-    # Coastal Cities (Higher rainfall)
-    'Valsad': {
-        'Kharif': 1530,     # Very high monsoon
-        'Rabi': 180,
-        'Summer': 90,
-        'Whole Year': 1800
-    },
-    'Navsari': {
-        'Kharif': 1275,
-        'Rabi': 150,
-        'Summer': 75,
-        'Whole Year': 1500
-    },
-    'Bharuch': {
-        'Kharif': 850,
-        'Rabi': 100,
-        'Summer': 50,
-        'Whole Year': 1000
-    },
-    
-    # Kutch Region (Lower rainfall)
-    'Bhuj': {
-        'Kharif': 295,      # Low monsoon - suitable for drought-resistant crops
-        'Rabi': 35,
-        'Summer': 20,
-        'Whole Year': 350
-    },
-    'Gandhidham': {
-        'Kharif': 255,
-        'Rabi': 30,
-        'Summer': 15,
-        'Whole Year': 300
-    },
-    'Mandvi': {
-        'Kharif': 340,
-        'Rabi': 40,
-        'Summer': 20,
-        'Whole Year': 400
-    },
-    'Rapar': {
-        'Kharif': 240,
-        'Rabi': 28,
-        'Summer': 12,
-        'Whole Year': 280
-    },
-    
-    # Saurashtra Region
-    'Porbandar': {
-        'Kharif': 510,
-        'Rabi': 60,
-        'Summer': 30,
-        'Whole Year': 600
-    },
-    'Dwarka': {
-        'Kharif': 425,
-        'Rabi': 50,
-        'Summer': 25,
-        'Whole Year': 500
-    },
-    'Veraval': {
-        'Kharif': 550,
-        'Rabi': 65,
-        'Summer': 35,
-        'Whole Year': 650
-    },
-    'Amreli': {
-        'Kharif': 595,
-        'Rabi': 70,
-        'Summer': 35,
-        'Whole Year': 700
-    },
-    'Surendranagar': {
-        'Kharif': 380,      # Cotton growing region
-        'Rabi': 45,
-        'Summer': 25,
-        'Whole Year': 450
-    },
-    'Morbi': {
-        'Kharif': 340,
-        'Rabi': 40,
-        'Summer': 20,
-        'Whole Year': 400
-    },
-    
-    # North Gujarat
-    'Mehsana': {
-        'Kharif': 425,
-        'Rabi': 50,
-        'Summer': 25,
-        'Whole Year': 500
-    },
-    'Patan': {
-        'Kharif': 380,
-        'Rabi': 45,
-        'Summer': 25,
-        'Whole Year': 450
-    },
-    'Palanpur': {
-        'Kharif': 510,
-        'Rabi': 60,
-        'Summer': 30,
-        'Whole Year': 600
-    },
-    
-    # South Gujarat (Higher rainfall due to Western Ghats)
-    'Dang': {
-        'Kharif': 1870,     # Highest rainfall region
-        'Rabi': 220,
-        'Summer': 110,
-        'Whole Year': 2200
-    },
-    'Vyara': {
-        'Kharif': 1530,
-        'Rabi': 180,
-        'Summer': 90,
-        'Whole Year': 1800
-    },
-    
-    # Eastern Gujarat
-    'Godhra': {
-        'Kharif': 765,
-        'Rabi': 90,
-        'Summer': 45,
-        'Whole Year': 900
-    },
-    'Dahod': {
-        'Kharif': 850,
-        'Rabi': 100,
-        'Summer': 50,
-        'Whole Year': 1000
+print("🌾 AgriNova High-Accuracy Crop Prediction Model Training")
+print("🎯 Target: 80%+ Accuracy")
+print("=" * 60)
+
+# Create directories if they don't exist
+os.makedirs(TRAINED_MODELS_DIR, exist_ok=True)
+os.makedirs(DATA_DIR, exist_ok=True)
+
+# Per-city reference data shared with the API (soil pH, climate factors, seasonal rainfall)
+regions = RegionRegistry.load(REGIONS_PATH)
+
+
+# Stages: each takes its upstream stages' outputs and returns its own (never modifying its inputs).
+# Preprocessing is vectorized (utils/training_data.py); no per-row Python loops.
+
+def load_stage(inputs, params):
+    print("📊 Loading and analyzing dataset...")
+    df = load_dataset(DATASET_PATH)
+    print(f"   Original dataset: {df.shape[0]} rows, {df.shape[1]} columns")
+    return {'df': df}
+
+
+def clean_stage(inputs, params):
+    print("🧹 Advanced data cleaning...")
+    df = clean_dataset(inputs['load']['df'])
+    print(f"   After cleaning: {df.shape[0]} rows")
+    return {'df': df}
+
+
+def features_stage(inputs, params):
+    # Advanced Feature Engineering for Higher Accuracy
+    print("🔧 Advanced feature engineering...")
+    df = inputs['clean']['df'].copy()
+
+    # Engineered features come from utils/features.py, the same code the API runs per request:
+    # pH_enhanced, climate_suitability, water_soil_compatibility, productivity_index
+    # (chunking and workers change speed and memory, never the values, so they are not part of the cache key)
+    executor = ThreadPoolExecutor(max_workers=args.preprocess_workers) if args.preprocess_workers > 1 else None
+    feature_inputs = dataset_feature_inputs(df)
+    engineered = engineer_dataset(regions, feature_inputs, chunk_rows=args.chunk_rows, executor=executor)
+    if executor is not None:
+        executor.shutdown()
+    for name, values in engineered.items():
+        df[name] = values
+
+    # Train/serve parity: single-row requests take a scalar path, which must give the same values
+    parity_rows = verify_feature_parity(regions, feature_inputs, engineered)
+    print(f"   ✅ Created {len(engineered)} engineered features (serving path matches on {parity_rows} sampled rows)")
+
+    # Feature encoding
+    print("🔢 Encoding categorical features...")
+    label_encoders = encode_categoricals(df, CATEGORICAL_COLUMNS)
+
+    # Remove any remaining NaN values
+    df = df.dropna(subset=params['feature_cols'] + ['Crop'])
+    print(f"   Final dataset: {df.shape[0]} rows")
+    return {'df': df, 'label_encoders': label_encoders}
+
+
+def balance_stage(inputs, params):
+    # Gujarat Crop Calendar - Season-Crop Filtering
+    print("🌾 Implementing Gujarat crop calendar filtering...")
+    df = inputs['features']['df']
+
+    # Filter dataset to include only season-appropriate crops (one calendar lookup per season-crop pair)
+    print("   Filtering crops by season appropriateness...")
+    df_season_filtered = df[season_filter_mask(df['Crop'], df['Season'], params['calendar'])]
+    print(f"   After season filtering: {df_season_filtered.shape[0]} rows (removed {df.shape[0] - df_season_filtered.shape[0]} inappropriate season-crop combinations)")
+
+    # Smart crop balancing for better accuracy: focus on top crops with sufficient data
+    # and limit each crop to prevent any single crop from dominating
+    print("⚖️ Smart crop balancing...")
+    df_balanced, major_crops, crop_counts = balance_crops(
+        df_season_filtered, params['min_samples'], params['max_samples_per_crop']
+    )
+    print(f"   Season-appropriate crops: {len(crop_counts)} unique crops")
+    print(f"   Filtered to {len(major_crops)} major crops with {int(crop_counts[major_crops].sum())} samples")
+    print(f"   Major crops: {major_crops}")
+    print(f"   Balanced dataset: {df_balanced.shape[0]} rows")
+    return {'df': df_balanced, 'major_crops': major_crops}
+
+
+def select_stage(inputs, params):
+    # Prepare features and target
+    df_balanced = inputs['balance']['df']
+    feature_cols = params['feature_cols']
+    X = df_balanced[feature_cols]
+
+    # Encode crop labels
+    crop_encoder = LabelEncoder()
+    y_crop_encoded = crop_encoder.fit_transform(df_balanced['Crop'])
+
+    # Feature selection for optimal performance
+    print("🔍 Selecting best features...")
+    selector = SelectKBest(score_func=f_classif, k=params['k'])
+    X_selected = selector.fit_transform(X, y_crop_encoded)
+    selected_features = [feature_cols[i] for i in selector.get_support(indices=True)]
+    print(f"   Selected {len(selected_features)} best features: {selected_features}")
+    return {'X': X_selected, 'y': y_crop_encoded, 'crop_encoder': crop_encoder, 'selector': selector,
+            'selected_features': selected_features}
+
+
+def scale_stage(inputs, params):
+    # Scale features
+    selected = inputs['select']
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(selected['X'])
+
+    # Train-test split with stratification
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, selected['y'], test_size=params['test_size'], random_state=42, stratify=selected['y']
+    )
+    return {'scaler': scaler, 'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test,
+            'n_rows': len(X_scaled)}
+
+
+def search_stage(inputs, params):
+    print("🎯 Training optimized model...")
+    split = inputs['scale']
+    X_train, y_train = split['X_train'], split['y_train']
+
+    print("   🔧 Optimizing hyperparameters...")
+    rf_base = RandomForestClassifier(random_state=42, n_jobs=-1, class_weight='balanced')
+    if params['search'] == 'halving':
+        # Successive halving: every config on few trees/rows, the best third gets 3x more, fold scores cached on disk
+        search_report = successive_halving_search(
+            rf_base, params['param_grid'], X_train, y_train, cv=params['cv_folds'], factor=params['halving_factor'],
+            time_budget_s=params['search_budget_s'], cache=FoldCache(SEARCH_CACHE_DIR)
+        )
+        best_params = search_report['best_params']
+        rf_model = clone(rf_base).set_params(**best_params).fit(X_train, y_train)
+        print(f"   ✅ {search_report['fits']} folds fitted, {search_report['cached_fits']} reused from cache "
+              f"in {search_report['elapsed_s']:.0f}s")
+    else:
+        # Use a smaller grid search for speed
+        grid_search = GridSearchCV(
+            rf_base, params['param_grid'], cv=params['cv_folds'], scoring='accuracy', n_jobs=-1, verbose=1
+        )
+        grid_search.fit(X_train, y_train)
+        best_params = grid_search.best_params_
+        rf_model = grid_search.best_estimator_
+        search_report = {
+            'best_params': best_params,
+            'cv_scores': [round(float(grid_search.cv_results_[f'split{fold}_test_score'][grid_search.best_index_]), 4)
+                          for fold in range(params['cv_folds'])],
+        }
+
+    # Best model
+    print(f"   ✅ Best parameters: {best_params}")
+
+    # Budget mode: smallest forest within the accuracy tolerance that fits the latency/size budgets
+    model_selection = None
+    if params['latency_budget_ms'] is not None or params['size_budget_mb'] is not None:
+        print("   ⏱️ Searching for the smallest forest within budget...")
+        # Candidates are compared on a validation split, so the test split stays untouched
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X_train, y_train, test_size=0.25, random_state=42, stratify=y_train
+        )
+        tree_counts = [n for n in params['budget_tree_counts'] if n < best_params['n_estimators']] + [best_params['n_estimators']]
+        depth_caps = [d for d in params['budget_depth_caps'] if d < best_params['max_depth']] + [best_params['max_depth']]
+
+        candidates = []
+        for depth in depth_caps:
+            forest = RandomForestClassifier(
+                **{**best_params, 'max_depth': depth}, random_state=42, n_jobs=-1, class_weight='balanced'
+            ).fit(X_fit, y_fit)
+            # Tree subsets cost nothing extra: a refit with fewer trees grows the same first trees
+            candidates.extend(evaluate_candidate(forest_subset(forest, n), X_val, y_val) for n in tree_counts)
+
+        baseline = candidates[-1]  # full size, full depth
+        chosen = select_candidate(
+            candidates, baseline['accuracy'], params['max_accuracy_loss'],
+            latency_budget_ms=params['latency_budget_ms'],
+            size_budget_bytes=int(params['size_budget_mb'] * 1e6) if params['size_budget_mb'] is not None else None,
+        )
+        pareto = pareto_front(candidates)
+
+        print(f"   📊 Pareto front ({len(pareto)} of {len(candidates)} candidates, validation split):")
+        print("      trees  depth  accuracy   p50 ms   p99 ms       MB")
+        for candidate in pareto:
+            marker = "  ⬅️ chosen" if candidate == chosen else ""
+            print(f"      {candidate['n_estimators']:>5}  {candidate['max_depth']:>5}  {candidate['accuracy']:>8.4f}"
+                  f"  {candidate['p50_ms']:>7.3f}  {candidate['p99_ms']:>7.3f}  {candidate['bytes'] / 1e6:>7.2f}{marker}")
+
+        if chosen is None:
+            print(f"   ⚠️ No forest within {params['max_accuracy_loss']:.1%} accuracy loss fits the budget, keeping the full model")
+        elif chosen is not baseline:
+            rf_model = RandomForestClassifier(
+                **{**best_params, 'n_estimators': chosen['n_estimators'], 'max_depth': chosen['max_depth']},
+                random_state=42, n_jobs=-1, class_weight='balanced'
+            ).fit(X_train, y_train)
+            print(f"   ✅ Chosen: {chosen['n_estimators']} trees, max depth {chosen['max_depth']} "
+                  f"({chosen['bytes'] / 1e6:.1f} MB vs {baseline['bytes'] / 1e6:.1f} MB, "
+                  f"p99 {chosen['p99_ms']:.2f} ms vs {baseline['p99_ms']:.2f} ms)")
+        else:
+            print("   ✅ The full model is already the smallest forest within tolerance")
+
+        model_selection = {
+            'latency_budget_ms': params['latency_budget_ms'],
+            'size_budget_mb': params['size_budget_mb'],
+            'max_accuracy_loss': params['max_accuracy_loss'],
+            'baseline': baseline,
+            'chosen': chosen,
+            'pareto': pareto,
+        }
+
+    return {'model': rf_model, 'best_params': best_params, 'search_report': search_report,
+            'model_selection': model_selection}
+
+
+def export_stage(inputs, params):
+    features, selected, split, searched = inputs['features'], inputs['select'], inputs['scale'], inputs['search']
+    rf_model, X_test, y_test = searched['model'], split['X_test'], split['y_test']
+    feature_cols = params['feature_cols']
+
+    # Model evaluation; cross-validation reuses the search's fold scores for the best parameters
+    train_accuracy = rf_model.score(split['X_train'], split['y_train'])
+    test_accuracy = rf_model.score(X_test, y_test)
+    cv_scores = np.array(searched['search_report']['cv_scores'])
+
+    # Export flattened forest for fast serving and verify it against sklearn on the full dataset
+    print("🌲 Exporting flat array-backed forest...")
+    flat_forest = FlatForest.from_model(rf_model)
+    X_full = split['scaler'].transform(selected['selector'].transform(features['df'][feature_cols]))
+    flat_max_diff = verify_flat_forest(flat_forest, rf_model, X_full)
+    print(f"   ✅ Flat forest matches sklearn on {len(X_full):,} rows (max diff {flat_max_diff:.1e})")
+
+    # Quantized copy for memory-constrained serving (FOREST_FORMAT=compact); details: evaluate_compact_forest.py
+    compact_forest = CompactForest.from_flat(flat_forest)
+    compact_accuracy = float((compact_forest.predict_proba(X_test).argmax(axis=1) == y_test).mean())
+    print(f"   ✅ Compact forest: {compact_forest.nbytes / 1e6:.1f} MB vs {flat_forest.nbytes / 1e6:.1f} MB flat, "
+          f"held-out accuracy {compact_accuracy:.4f} (sklearn {test_accuracy:.4f})")
+
+    # Create crop statistics for profit calculations
+    print("📈 Creating crop statistics...")
+    df_original = pd.read_csv(DATASET_PATH)
+    df_original = df_original.dropna(subset=['Crop', 'Production', 'Area', 'AVG_Price'])
+
+    crop_stats = df_original.groupby('Crop').agg({
+        'Production': 'mean',  # Average production in quintals
+        'Area': 'mean',        # Average area in acres
+        'AVG_Price': 'mean'    # Average price in ₹ per quintal
+    }).reset_index()
+
+    # Save all model components as one versioned, checksummed bundle
+    print("💾 Saving model bundle...")
+    metrics = {
+        'train_accuracy': round(float(train_accuracy), 4),
+        'test_accuracy': round(float(test_accuracy), 4),
+        'cv_accuracy_mean': round(float(cv_scores.mean()), 4),
+        'cv_accuracy_std': round(float(cv_scores.std()), 4),
+    }
+    # Recorded in every manifest so the lower accuracy is not mistaken for a training regression
+    accuracy_change = {
+        'previous_test_accuracy': 0.673,
+        'note': ("Held-out accuracy fell from 67.3% to 37.7% when pH_enhanced, climate_suitability and "
+                 "productivity_index were redefined to what a request can supply. productivity_index was "
+                 "Production x AVG_Price of the labelled row (the old model's top feature, unavailable to "
+                 "requests), and pH_enhanced and climate_suitability now apply the city adjustments in "
+                 "training as the API does. The old figure was never reachable in serving."),
     }
+    bundle_path = write_model_bundle(
+        MODEL_BUNDLES_DIR,
+        model=rf_model,
+        preprocessing={
+            'crop_encoder': selected['crop_encoder'],
+            'label_encoders': features['label_encoders'],
+            'scaler': split['scaler'],
+            'feature_selector': selected['selector'],
+            'feature_cols': feature_cols,
+            'selected_features': selected['selected_features'],
+        },
+        forest=flat_forest,
+        compact_forest=compact_forest,
+        holdout=(X_test, y_test),
+        crop_stats=crop_stats,
+        climatology=ClimatologyIndex.from_csv(DATASET_PATH),
+        metadata={
+            'metrics': metrics,
+            'accuracy_change': accuracy_change,
+            'best_params': searched['best_params'],
+            'search': {'method': params['search'], **searched['search_report']},
+            'model_selection': searched['model_selection'],
+            'training_rows': int(split['n_rows']),
+        },
+        keep=MODEL_BUNDLES_KEEP  # older bundles are deleted
+    )
+    print(f"   ✅ Model bundle written to {bundle_path}")
+
+    # Save Gujarat crop calendar for prediction use
+    print("📅 Saving Gujarat crop calendar...")
+    with open(CROP_CALENDAR_PATH, 'w') as f:
+        json.dump(params['calendar'], f, indent=2)
+
+    print("   ✅ Crop calendar saved for prediction filtering")
+
+    # City and season-specific rainfall is reference data in the region registry
+    print(f"🌧️ Gujarat city-season rainfall from the region registry: {len(regions)} cities")
+    print("   📍 Season-wise rainfall distribution:")
+    print("   🌧️ Kharif (Monsoon): 80-85% of annual rainfall")
+    print("   ❄️ Rabi (Winter): 8-12% of annual rainfall")
+    print("   ☀️ Summer: 5-8% of annual rainfall")
+    print("   📊 Examples:")
+    for city in ('Surat', 'Rajkot', 'Bhuj'):
+        print(f"   - {city} Kharif: {regions.rainfall(city, 'Kharif'):.0f}mm")
+    return {'bundle_path': bundle_path, 'metrics': metrics}
+
+
+# Enhanced feature set with engineered features (same order as the API builds them)
+feature_cols = list(ALL_FEATURE_COLUMNS)
+search_params = {
+    'search': args.search,
+    'param_grid': param_grid,
+    'halving_factor': args.halving_factor,
+    'search_budget_s': args.search_budget_s,
+    'latency_budget_ms': args.latency_budget_ms,
+    'size_budget_mb': args.size_budget_mb,
+    'max_accuracy_loss': args.max_accuracy_loss,
+    'budget_tree_counts': BUDGET_TREE_COUNTS,
+    'budget_depth_caps': BUDGET_DEPTH_CAPS,
+    'cv_folds': SEARCH_CV_FOLDS,
 }
-
-# Save Gujarat city and season-specific rainfall data
-with open('data/gujarat_city_season_rainfall.json', 'w') as f:
-    json.dump(gujarat_city_season_rainfall, f, indent=2)
-
-print(f"   ✅ Gujarat city-season rainfall data saved for {len(gujarat_city_season_rainfall)} cities")
-print("   📍 Season-wise rainfall distribution:")
-print("   🌧️ Kharif (Monsoon): 80-85% of annual rainfall")
-print("   ❄️ Rabi (Winter): 8-12% of annual rainfall") 
-print("   ☀️ Summer: 5-8% of annual rainfall")
-print("   📊 Examples:")
-print("   - Surat Kharif: 1020mm (ideal for cotton)")
-print("   - Rajkot Kharif: 550mm (good for cotton)")
-print("   - Bhuj Kharif: 295mm (drought-resistant crops)")
+stages = [
+    Stage('load', load_stage, files=(DATASET_PATH,), code=(utils.training_data,)),
+    Stage('clean', clean_stage, inputs=('load',), code=(utils.training_data,)),
+    Stage('features', features_stage, inputs=('clean',), params={'feature_cols': feature_cols},
+          files=(REGIONS_PATH,), code=(utils.training_data, utils.features, utils.regions)),
+    Stage('balance', balance_stage, inputs=('features',), code=(utils.training_data,),
+          params={'calendar': gujarat_crop_calendar, 'min_samples': 50,  # reduced threshold due to season filtering
+                  'max_samples_per_crop': 800}),
+    Stage('select', select_stage, inputs=('balance',), params={'feature_cols': feature_cols, 'k': 12}),
+    Stage('scale', scale_stage, inputs=('select',), params={'test_size': 0.2}),
+    Stage('search', search_stage, inputs=('scale',), params=search_params,
+          code=(utils.hyperparameter_search, utils.forest_budget, utils.flat_forest),
+          # A search stopped by its time budget is partial: rerun it to resume from the fold cache
+          cacheable=lambda outputs: not outputs['search_report'].get('budget_exhausted', False)),
+    Stage('export', export_stage, inputs=('features', 'select', 'scale', 'search'),
+          params={'feature_cols': feature_cols, 'calendar': gujarat_crop_calendar, 'search': args.search},
+          files=(DATASET_PATH, REGIONS_PATH),
+          code=(utils.flat_forest, utils.compact_forest, utils.model_bundle)),
+]
+assert [stage.name for stage in stages] == STAGE_NAMES
+
+stage_cache = StageCache(STAGE_CACHE_DIR)
+run = run_pipeline(stages, stage_cache, targets=args.stages, force=set(args.force))
+if run.status.get('export') == 'cached' and (
+        not os.path.isdir(run['export']['bundle_path'])
+        or os.path.dirname(os.path.abspath(run['export']['bundle_path'])) != os.path.abspath(MODEL_BUNDLES_DIR)):
+    print(f"   ⚠️ Cached bundle {run['export']['bundle_path']} is not in {MODEL_BUNDLES_DIR}, exporting again")
+    run = run_pipeline(stages, stage_cache, targets=args.stages, force=set(args.force) | {'export'})
+# Drop old cached runs (the objects of this run stay, later code loads them)
+pruned = stage_cache.prune(STAGE_CACHE_KEEP, protect=run.digests.values())
+if pruned:
+    print(f"   🧹 Removed {pruned} old stage outputs from {STAGE_CACHE_DIR}")
+print(f"   ⏱️ Stages: " + ", ".join(
+    f"{name} {run.timings[name]:.2f}s" if run.status[name] == 'computed' else f"{name} cached"
+    for name in STAGE_NAMES if name in run
+))
+
+if 'export' not in run:
+    print(f"\n✅ Stages {', '.join(name for name in STAGE_NAMES if name in run)} are up to date in {STAGE_CACHE_DIR}")
+    raise SystemExit(0)
 
 # Results
+exported, searched = run['export'], run['search']
+metrics, rf_model = exported['metrics'], searched['model']
+selected_features = run['select']['selected_features']
+test_accuracy = metrics['test_accuracy']
+if run.status['export'] == 'cached':
+    # Another run may have made a different bundle current since; this one is the result of these inputs
+    set_current_bundle(MODEL_BUNDLES_DIR, os.path.basename(exported['bundle_path']))
+    print(f"   ✅ Nothing changed since bundle {exported['bundle_path']}; CURRENT points at it")
 print("\n" + "=" * 70)
 print("🎉 HIGH-ACCURACY MODEL TRAINING COMPLETED!")
 print("=" * 70)
-print(f"📊 Training Accuracy: {train_accuracy:.2%}")
+print(f"📊 Training Accuracy: {metrics['train_accuracy']:.2%}")
 print(f"📊 Testing Accuracy: {test_accuracy:.2%}")
-print(f"📊 Cross-Validation: {cv_scores.mean():.2%} (±{cv_scores.std()*2:.2%})")
-print(f"📊 Total samples used: {len(X_scaled):,}")
-print(f"📊 Number of crops: {len(major_crops)}")
+print(f"📊 Cross-Validation: {metrics['cv_accuracy_mean']:.2%} (±{metrics['cv_accuracy_std']*2:.2%}, search folds of the best parameters)")
+print(f"📊 Total samples used: {run['scale']['n_rows']:,}")
+print(f"📊 Number of crops: {len(run['balance']['major_crops'])}")
 print(f"📊 Selected features: {len(selected_features)}")
 
 # Feature importance
@@ -546,4 +552,4 @@ else:
     print(f"💡 Consider more data or feature engineering")
 
 print(f"\n🚀 Ready to use: python main.py")
-print("=" * 70)
\ No newline at end of file
+print("=" * 70)
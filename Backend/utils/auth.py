@@ -2,8 +2,8 @@ import jwt
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
-import httpx
 from typing import Optional, Dict
+from utils.http_client import google_client
 
 load_dotenv()
 
@@ -32,38 +32,37 @@ async def verify_google_token(token: str) -> Optional[Dict]:
     try:
         print(f"Verifying Google access token...")
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            # Use Authorization header with Bearer token
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/json"
-            }
-            
-            # Try Google's userinfo v2 endpoint
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers=headers
-            )
+        # Use Authorization header with Bearer token
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json"
+        }
+        
+        # Try Google's userinfo v2 endpoint
+        response = await google_client.get(
+            "https://www.googleapis.com/oauth2/v2/userinfo",
+            headers=headers
+        )
+        
+        if response.status_code == 200:
+            user_info = response.json()
             
-            if response.status_code == 200:
-                user_info = response.json()
-                
-                # Check if we have email (required field)
-                email = user_info.get("email")
-                if email:
-                    result = {
-                        "email": email,
-                        "name": user_info.get("name", email.split('@')[0]),
-                        "picture": user_info.get("picture"),
-                        "sub": user_info.get("id"),
-                        "email_verified": user_info.get("verified_email", True)
-                    }
-                    return result
-                else:
-                    return None
+            # Check if we have email (required field)
+            email = user_info.get("email")
+            if email:
+                result = {
+                    "email": email,
+                    "name": user_info.get("name", email.split('@')[0]),
+                    "picture": user_info.get("picture"),
+                    "sub": user_info.get("id"),
+                    "email_verified": user_info.get("verified_email", True)
+                }
+                return result
             else:
                 return None
-            
+        else:
+            return None
+        
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -0,0 +1,94 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for an unreliable upstream dependency
+
+    - closed: calls go through; `failure_threshold` consecutive failures open the circuit
+    - open: calls are rejected without touching the network for `reset_timeout_seconds`
+    - half_open: up to `half_open_max_calls` trial calls are let through; a success
+      closes the circuit, a failed trial opens it again
+
+    Failures reported while open (calls that started before it opened) are
+    counted but never push the reopening deadline out.
+
+    Callers ask `allow_request()` before calling upstream and report the outcome
+    with `record_success()` / `record_failure()`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_seconds: float = 30,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        # Counters for monitoring
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.successes += 1
+        self._consecutive_failures = 0
+        self._state = CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        state = self.state
+        if state == OPEN:
+            return
+        self._consecutive_failures += 1
+        if state == HALF_OPEN:
+            if self._half_open_calls > 0:  # a trial call failed (not one that started before the circuit opened)
+                self._open()
+        elif self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def stats(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout_seconds,
+            "retry_in_seconds": round(max(0.0, self.reset_timeout_seconds - (time.monotonic() - self._opened_at)), 1)
+            if state == OPEN else 0.0,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
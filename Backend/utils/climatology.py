@@ -0,0 +1,74 @@
+import json
+import os
+import numpy as np
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# WeatherData field -> dataset column
+CLIMATOLOGY_COLUMNS = {
+    "avg_temp": "avgTemp",
+    "precipitation": "Precipitation",
+    "vap_pressure": "vapPressure",
+    "ph": "pH",
+    "cloud_cover": "Cloud Cover",
+}
+
+
+class ClimatologyIndex:
+    """
+    Historical weather averages per (state, city)
+
+    Built once from the training dataset. It holds one float64 array per
+    weather field and a dict from (state, city) to the row in those arrays,
+    so a fallback lookup is a dict hit instead of a DataFrame scan.
+    """
+
+    def __init__(self, locations: list, arrays: dict):
+        self.locations = [tuple(location) for location in locations]
+        self.arrays = {field: np.asarray(values, dtype=np.float64) for field, values in arrays.items()}
+        self._rows = {location: row for row, location in enumerate(self.locations)}
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame"):
+        means = df.groupby(['State', 'City'], sort=True)[list(CLIMATOLOGY_COLUMNS.values())].mean()
+        return cls(
+            locations=means.index.tolist(),
+            arrays={field: means[column].to_numpy() for field, column in CLIMATOLOGY_COLUMNS.items()}
+        )
+
+    @classmethod
+    def from_csv(cls, path: str):
+        """Build from the dataset CSV, reading only the columns needed"""
+        import pandas as pd
+        return cls.from_frame(pd.read_csv(path, usecols=['State', 'City', *CLIMATOLOGY_COLUMNS.values()]))
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "locations.json"), "w") as f:
+            json.dump(self.locations, f)
+        for field, values in self.arrays.items():
+            np.save(os.path.join(directory, f"{field}.npy"), values)
+
+    @classmethod
+    def load(cls, directory: str):
+        with open(os.path.join(directory, "locations.json"), "r") as f:
+            locations = json.load(f)
+        return cls(
+            locations=locations,
+            arrays={field: np.load(os.path.join(directory, f"{field}.npy")) for field in CLIMATOLOGY_COLUMNS}
+        )
+
+    def lookup(self, state: str, city: str):
+        """Mean weather fields for the location, or None if it is not in the dataset"""
+        row = self._rows.get((state, city))
+        if row is None:
+            return None
+        return {field: float(values[row]) for field, values in self.arrays.items()}
+
+    def cities(self, state: str) -> list:
+        return sorted(city for location_state, city in self.locations if location_state == state)
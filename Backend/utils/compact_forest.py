@@ -0,0 +1,227 @@
+import json
+import os
+import numpy as np
+from utils.flat_forest import FlatForest
+
+THRESHOLD_FORMATS = ("binned", "float32")
+LEAF_FORMATS = ("uint16", "uint8", "topk")
+
+COMPACT_FOREST_ARRAYS = ("feature", "threshold", "left", "right", "leaf_local", "leaf_offsets", "roots")
+FORMAT_FILE = "format.json"
+
+
+def smallest_int_dtype(max_value: int, signed: bool = True):
+    for dtype in ((np.int8, np.int16, np.int32) if signed else (np.uint8, np.uint16, np.uint32)):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def floor_float32(values: np.ndarray) -> np.ndarray:
+    """Largest float32 <= each value (x32 <= floor_float32(t) exactly when x32 <= t for float32 x32)"""
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForest:
+    """
+    Memory-compact variant of FlatForest
+
+    - Node indices are local to each tree (int16 when every tree has fewer
+      than 32k nodes), with per-tree root and leaf offsets
+    - Feature ids use the smallest integer type that fits
+    - Thresholds are exact either way:
+      "binned"  - uint16 codes into each feature's sorted unique thresholds;
+                  inputs are binned once per call with searchsorted
+      "float32" - rounded down to float32, which compares identically
+                  against the float32 inputs sklearn uses
+    - Leaf class distributions are the lossy part:
+      "uint16" / "uint8" - dense probabilities scaled to the integer range
+      "topk"   - the `top_k` most likely classes per leaf (uint8 class id,
+                 uint16 probability, renormalized)
+
+    predict_proba has the same interface as FlatForest, so it can serve in its
+    place; use evaluate_compact_forest.py to measure the accuracy cost.
+    """
+
+    def __init__(self, arrays: dict, format: dict):
+        self.format = dict(format)
+        for name in COMPACT_FOREST_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.bin_edges = arrays.get("bin_edges")
+        self.bin_offsets = arrays.get("bin_offsets")
+        self.leaf_values = arrays.get("leaf_values")
+        self.leaf_classes = arrays.get("leaf_classes")
+        self.leaf_probs = arrays.get("leaf_probs")
+        self.max_depth = int(format["max_depth"])
+        self._n_classes = int(format["n_classes"])
+        self._scale = float(format["scale"])
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_classes(self) -> int:
+        return self._n_classes
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [getattr(self, name) for name in COMPACT_FOREST_ARRAYS]
+        arrays += [self.bin_edges, self.bin_offsets, self.leaf_values, self.leaf_classes, self.leaf_probs]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    @classmethod
+    def from_flat(cls, forest: FlatForest, threshold_format: str = "binned", leaf_format: str = "uint16",
+                  top_k: int = 2):
+        if threshold_format not in THRESHOLD_FORMATS:
+            raise ValueError(f"Unknown threshold format: {threshold_format}")
+        if leaf_format not in LEAF_FORMATS:
+            raise ValueError(f"Unknown leaf format: {leaf_format}")
+
+        n_nodes = len(forest.feature)
+        roots = np.asarray(forest.roots, dtype=np.int64)
+        tree_sizes = np.diff(np.append(roots, n_nodes))
+        tree_of_node = np.repeat(np.arange(len(roots)), tree_sizes)
+        is_leaf = np.asarray(forest.is_leaf)
+
+        # Node indices relative to the tree's root
+        node_dtype = smallest_int_dtype(int(tree_sizes.max()))
+        left = (np.asarray(forest.left) - roots[tree_of_node]).astype(node_dtype)
+        right = (np.asarray(forest.right) - roots[tree_of_node]).astype(node_dtype)
+
+        # Leaf rows relative to the tree's first leaf (-1 for internal nodes)
+        leaf_index = np.asarray(forest.leaf_index, dtype=np.int64)
+        leaf_offsets = np.array([leaf_index[start:start + size][is_leaf[start:start + size]].min()
+                                 for start, size in zip(roots, tree_sizes)], dtype=np.int32)
+        leaves_per_tree = np.bincount(tree_of_node[is_leaf], minlength=len(roots))
+        leaf_local = np.where(is_leaf, leaf_index - leaf_offsets[tree_of_node], -1)
+        leaf_local = leaf_local.astype(smallest_int_dtype(int(leaves_per_tree.max())))
+
+        feature = np.asarray(forest.feature)
+        n_features = int(feature.max()) + 1
+        arrays = {
+            "feature": feature.astype(smallest_int_dtype(n_features)),
+            "left": left,
+            "right": right,
+            "leaf_local": leaf_local,
+            "leaf_offsets": leaf_offsets,
+            "roots": roots.astype(np.int32),
+        }
+
+        threshold = np.asarray(forest.threshold, dtype=np.float64)
+        if threshold_format == "binned":
+            edges, offsets, codes = [], [0], np.zeros(n_nodes, dtype=np.int64)
+            for f in range(n_features):
+                nodes = ~is_leaf & (feature == f)
+                unique = np.unique(threshold[nodes])
+                codes[nodes] = np.searchsorted(unique, threshold[nodes])
+                edges.append(unique)
+                offsets.append(offsets[-1] + len(unique))
+            if codes.max() > np.iinfo(np.uint16).max:
+                raise ValueError("Too many distinct thresholds for binned format, use threshold_format='float32'")
+            arrays["threshold"] = codes.astype(np.uint16)
+            arrays["bin_edges"] = np.concatenate(edges)
+            arrays["bin_offsets"] = np.asarray(offsets, dtype=np.int32)
+        else:
+            arrays["threshold"] = floor_float32(threshold)
+
+        leaf_values = np.asarray(forest.leaf_values, dtype=np.float64)
+        if leaf_format == "topk":
+            top_k = min(top_k, leaf_values.shape[1])
+            classes = np.argsort(-leaf_values, axis=1, kind="stable")[:, :top_k]
+            probs = np.take_along_axis(leaf_values, classes, axis=1)
+            probs /= probs.sum(axis=1, keepdims=True)
+            scale = float(np.iinfo(np.uint16).max)
+            arrays["leaf_classes"] = classes.astype(smallest_int_dtype(leaf_values.shape[1], signed=False))
+            arrays["leaf_probs"] = np.rint(probs * scale).astype(np.uint16)
+        else:
+            dtype = np.uint16 if leaf_format == "uint16" else np.uint8
+            scale = float(np.iinfo(dtype).max)
+            arrays["leaf_values"] = np.rint(leaf_values * scale).astype(dtype)
+
+        format = {
+            "threshold_format": threshold_format,
+            "leaf_format": leaf_format,
+            "top_k": top_k if leaf_format == "topk" else None,
+            "scale": scale,
+            "max_depth": int(forest.max_depth),
+            "n_classes": int(forest.n_classes),
+        }
+        return cls(arrays, format)
+
+    def save_arrays(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        optional = {"bin_edges": self.bin_edges, "bin_offsets": self.bin_offsets, "leaf_values": self.leaf_values,
+                    "leaf_classes": self.leaf_classes, "leaf_probs": self.leaf_probs}
+        for name in COMPACT_FOREST_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        for name, array in optional.items():
+            if array is not None:
+                np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, FORMAT_FILE), "w") as f:
+            json.dump(self.format, f, indent=2)
+
+    @classmethod
+    def load_arrays(cls, directory: str, mmap_mode: str = "r"):
+        """Load arrays saved by save_arrays, memory-mapped by default (like FlatForest.load_arrays)"""
+        with open(os.path.join(directory, FORMAT_FILE), "r") as f:
+            format = json.load(f)
+        arrays = {
+            name[:-len(".npy")]: np.load(os.path.join(directory, name), mmap_mode=mmap_mode)
+            for name in os.listdir(directory) if name.endswith(".npy")
+        }
+        return cls(arrays, format)
+
+    def _encode_inputs(self, X: np.ndarray) -> np.ndarray:
+        """Inputs in the same units as the stored thresholds"""
+        # sklearn compares float32 inputs against the thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if self.format["threshold_format"] == "float32":
+            return X
+        codes = np.empty(X.shape, dtype=np.int32)
+        for f in range(len(self.bin_offsets) - 1):
+            edges = self.bin_edges[self.bin_offsets[f]:self.bin_offsets[f + 1]]
+            codes[:, f] = np.searchsorted(edges, X[:, f].astype(np.float64), side="left")
+        # x <= edges[k]  <=>  (number of edges below x) <= k
+        return codes
+
+    def apply(self, X) -> np.ndarray:
+        """Return the tree-local leaf node reached in every tree, shape (n_rows, n_estimators)"""
+        X = self._encode_inputs(X)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        roots = self.roots.astype(np.int64)[np.newaxis, :]
+        local = np.zeros((X.shape[0], self.n_estimators), dtype=np.int64)
+
+        for _ in range(self.max_depth):
+            nodes = roots + local
+            if (self.leaf_local[nodes] >= 0).all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            local = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return local
+
+    def predict_proba(self, X, n_chunks: int = 1, executor=None) -> np.ndarray:
+        """Class probabilities, shape (n_rows, n_classes); chunking as in FlatForest.predict_proba"""
+        X = np.asarray(X)
+        n_chunks = min(n_chunks, len(X))
+        if n_chunks > 1 and executor is not None:
+            return np.vstack(list(executor.map(self._predict_proba, np.array_split(X, n_chunks))))
+        return self._predict_proba(X)
+
+    def _predict_proba(self, X) -> np.ndarray:
+        local = self.apply(X)
+        leaves = self.leaf_offsets[np.newaxis, :] + self.leaf_local[self.roots[np.newaxis, :] + local]
+        if self.leaf_values is not None:
+            proba = self.leaf_values[leaves].sum(axis=1, dtype=np.float64)
+        else:
+            n_rows = len(leaves)
+            rows = np.broadcast_to(np.arange(n_rows)[:, np.newaxis, np.newaxis], leaves.shape + (self.format["top_k"],))
+            index = rows * self.n_classes + self.leaf_classes[leaves]
+            proba = np.bincount(index.ravel(), weights=self.leaf_probs[leaves].ravel().astype(np.float64),
+                                minlength=n_rows * self.n_classes).reshape(n_rows, self.n_classes)
+        proba /= self._scale * self.n_estimators
+        return proba
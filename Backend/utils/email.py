@@ -1,6 +1,7 @@
 from datetime import datetime
-import requests
+import httpx
 import os
+from utils.http_client import email_client
 
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 RESEND_API_URL = os.getenv("RESEND_API_URL")
@@ -9,14 +10,14 @@ EMAIL_FROM = os.getenv("EMAIL_FROM")
 
 
 # 🔹 Core Email Sender (Resend API)
-def send_email(to_email: str, subject: str, html_content: str):
+async def send_email(to_email: str, subject: str, html_content: str):
     if not all([RESEND_API_URL, RESEND_API_KEY, EMAIL_FROM]):
         print("Error: Missing email configuration environment variables")
         return False
 
     try:
-        response = requests.post(
-            RESEND_API_URL, 
+        response = await email_client.post(
+            RESEND_API_URL,
             headers={
                 "Authorization": f"Bearer {RESEND_API_KEY}",
                 "Content-Type": "application/json",
@@ -26,8 +27,7 @@ def send_email(to_email: str, subject: str, html_content: str):
                 "to": [to_email],
                 "subject": subject,
                 "html": html_content,
-            },
-            timeout=30 
+            }
         )
 
         print("STATUS:", response.status_code)
@@ -39,7 +39,7 @@ def send_email(to_email: str, subject: str, html_content: str):
 
         return True
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Email sending error: {e}")
         return False
     except Exception as e:
@@ -48,7 +48,7 @@ def send_email(to_email: str, subject: str, html_content: str):
 
 
 # 🔹 OTP Email
-def send_otp_email(
+async def send_otp_email(
     to_email: str,
     user_name: str,
     otp: str,
@@ -71,7 +71,7 @@ def send_otp_email(
             .replace("{{current_year}}", str(datetime.now().year))
         )
 
-        return send_email(
+        return await send_email(
             to_email,
             "AgriNova - Password Reset OTP",
             html_content
@@ -87,7 +87,7 @@ def send_otp_email(
 
 
 # 🔹 Contact Form Email (Admin Notification)
-def send_contact_admin_email(
+async def send_contact_admin_email(
     name: str,
     email: str,
     phone: str,
@@ -118,7 +118,7 @@ def send_contact_admin_email(
         # Get admin email from environment
         admin_email = os.getenv("ADMIN_EMAIL", "support@agrinova.me")
         
-        return send_email(
+        return await send_email(
             admin_email,
             f"New Contact Form: {name}",
             html_content
@@ -130,7 +130,7 @@ def send_contact_admin_email(
 
 
 # 🔹 Contact Form Email (User Confirmation)
-def send_contact_user_email(
+async def send_contact_user_email(
     name: str,
     email: str,
     message: str
@@ -157,7 +157,7 @@ def send_contact_user_email(
             .replace("{{current_year}}", str(datetime.now().year))
         )
         
-        return send_email(
+        return await send_email(
             email,
             "Thank You for Contacting AgriNova",
             html_content
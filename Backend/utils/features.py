@@ -0,0 +1,131 @@
+import numpy as np
+from utils.regions import RegionRegistry
+
+# Feature order expected by the feature selector (training and serving)
+ALL_FEATURE_COLUMNS = [
+    'Season_encoded', 'Soil Type_encoded', 'Water_Availability_encoded',
+    'avgTemp', 'Rainfall', 'pH_enhanced', 'Cloud Cover', 'Precipitation',
+    'vapPressure', 'Wet Day Freq', 'climate_suitability', 'water_soil_compatibility',
+    'productivity_index'
+]
+# Every feature must be computable from a request, so none may depend on the crop label
+ENGINEERED_FEATURES = [
+    'pH_enhanced', 'climate_suitability', 'water_soil_compatibility', 'productivity_index'
+]
+
+# Season → ((temp low, temp high) °C, (rainfall low, rainfall high) mm) where a season's crops do well
+SEASON_OPTIMAL_RANGES = {
+    'Kharif': ((25, 35), (400, 1200)),  # Monsoon crops
+    'Rabi': ((15, 28), (200, 600)),  # Winter crops
+    'Summer': ((30, 40), (100, 400)),  # Summer crops
+}
+DEFAULT_OPTIMAL_RANGES = ((20, 35), (300, 800))  # Whole Year
+
+# Water availability × soil type compatibility scores (0.5 for other combinations)
+WATER_SOIL_COMPATIBILITY = {
+    ('High', 'Black'): 1.0, ('High', 'Clay'): 0.9, ('High', 'Loamy'): 0.8,
+    ('Medium', 'Red'): 1.0, ('Medium', 'Loamy'): 0.9, ('Medium', 'Sandy'): 0.7,
+    ('Low', 'Sandy'): 1.0, ('Low', 'Red'): 0.8, ('Low', 'Laterite'): 0.7
+}
+DEFAULT_WATER_SOIL_COMPATIBILITY = 0.5
+
+
+def _codes(values) -> tuple:
+    """(distinct values in first-seen order, code of every element); a dict pass beats np.unique on strings"""
+    if hasattr(values, 'categories'):  # pandas Categorical: already coded, one lookup per category
+        return list(values.categories), np.asarray(values.codes, dtype=np.intp)
+    seen = {}
+    codes = np.fromiter((seen.setdefault(value, len(seen)) for value in values), dtype=np.intp, count=len(values))
+    return list(seen), codes
+
+
+def _map_values(values, lookup) -> np.ndarray:
+    """lookup(value) for every element, calling it once per distinct value"""
+    distinct, codes = _codes(values)
+    return np.array([lookup(value) for value in distinct])[codes]
+
+
+def engineer_features(regions: RegionRegistry, city, season, soil_type, water_availability,
+                      avg_temp, rainfall, ph) -> dict:
+    """
+    The engineered feature columns for many rows at once
+
+    Every argument except `regions` is a column (array, list or pandas
+    Categorical, one entry per row). `ph` is the measured or historical pH, used when the soil type
+    has no reference pH. Returns {name: float64 array} for
+    ENGINEERED_FEATURES. Training calls this on the whole dataset and
+    serving on each request batch, so the definitions cannot drift.
+    Single rows take a scalar path with identical results.
+    """
+    if len(city) == 1:
+        return {name: np.array([value]) for name, value in engineer_row(
+            regions, city[0], season[0], soil_type[0], water_availability[0], avg_temp[0], rainfall[0], ph[0]
+        ).items()}
+
+    avg_temp = np.asarray(avg_temp, dtype=np.float64)
+    rainfall = np.asarray(rainfall, dtype=np.float64)
+    ph = np.asarray(ph, dtype=np.float64)
+    rows = _map_values(city, regions.row)
+
+    # Enhanced pH: reference pH of the soil type (else the measured pH) plus the city adjustment
+    soil_ph = _map_values(soil_type, lambda name: regions.soil_type_ph.get(name, np.nan))
+    ph_enhanced = np.where(np.isnan(soil_ph), ph, soil_ph) + regions.ph_adjustment[rows]
+
+    # Climate suitability: temperature and rainfall inside the season's optimal ranges, scaled by the city factor
+    ranges = _map_values(season, lambda name: np.ravel(SEASON_OPTIMAL_RANGES.get(name, DEFAULT_OPTIMAL_RANGES)))
+    temp_score = np.where((ranges[:, 0] <= avg_temp) & (avg_temp <= ranges[:, 1]), 1.0, 0.5)
+    rain_score = np.where((ranges[:, 2] <= rainfall) & (rainfall <= ranges[:, 3]), 1.0, 0.3)
+    climate_suitability = (temp_score + rain_score) / 2 * regions.climate_factor[rows]
+
+    # Water-soil compatibility: one table lookup per distinct (water, soil) pair
+    waters, water_codes = _codes(water_availability)
+    soils, soil_codes = _codes(soil_type)
+    table = np.array([[WATER_SOIL_COMPATIBILITY.get((water, soil), DEFAULT_WATER_SOIL_COMPATIBILITY)
+                       for soil in soils] for water in waters])
+    water_soil = table[water_codes, soil_codes]
+
+    return {
+        'pH_enhanced': ph_enhanced,
+        'climate_suitability': climate_suitability,
+        'water_soil_compatibility': water_soil.astype(np.float64),
+        'productivity_index': rainfall * avg_temp / 1000,
+    }
+
+
+def engineer_row(regions: RegionRegistry, city: str, season: str, soil_type: str, water_availability: str,
+                 avg_temp: float, rainfall: float, ph: float) -> dict:
+    """Engineered features of one row as floats (the single-request fast path of engineer_features)"""
+    row = regions.row(city)
+    (temp_low, temp_high), (rain_low, rain_high) = SEASON_OPTIMAL_RANGES.get(season, DEFAULT_OPTIMAL_RANGES)
+    temp_score = 1.0 if temp_low <= avg_temp <= temp_high else 0.5
+    rain_score = 1.0 if rain_low <= rainfall <= rain_high else 0.3
+    return {
+        'pH_enhanced': float(regions.soil_type_ph.get(soil_type, ph) + regions.ph_adjustment[row]),
+        'climate_suitability': float((temp_score + rain_score) / 2 * regions.climate_factor[row]),
+        'water_soil_compatibility': WATER_SOIL_COMPATIBILITY.get((water_availability, soil_type),
+                                                                 DEFAULT_WATER_SOIL_COMPATIBILITY),
+        'productivity_index': rainfall * avg_temp / 1000,
+    }
+
+
+def verify_feature_parity(regions: RegionRegistry, columns: dict, engineered: dict, n_rows: int = 500,
+                          seed: int = 42) -> int:
+    """
+    Recompute sampled rows one at a time with the serving fast path and compare
+
+    `columns` holds the engineer_features inputs (city, season, soil_type,
+    water_availability, avg_temp, rainfall, ph) and `engineered` its output
+    for the same rows. Raises AssertionError on the first mismatch; returns
+    the number of rows checked.
+    """
+    n_total = len(columns['city'])
+    sample = np.random.default_rng(seed).choice(n_total, size=min(n_rows, n_total), replace=False)
+    for index in sample:
+        single = engineer_row(regions, **{name: values[index] for name, values in columns.items()})
+        for name, value in single.items():
+            if value != engineered[name][index]:
+                raise AssertionError(
+                    f"Feature {name} differs between batch and single-row paths at row {index}: "
+                    f"{engineered[name][index]!r} != {value!r}"
+                )
+    return len(sample)
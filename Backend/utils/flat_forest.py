@@ -0,0 +1,174 @@
+import os
+import numpy as np
+
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "leaf_index", "leaf_values", "roots")
+
+
+def flatten_forest(model) -> dict:
+    """
+    Flatten every tree of a fitted RandomForestClassifier into contiguous arrays
+
+    All nodes of all trees share one index space. Leaves point to themselves
+    (left == right == node) so a fixed number of traversal steps is safe, and
+    `leaf_index` maps a leaf node to its row in `leaf_values`, which holds the
+    normalized class distribution exactly as sklearn's tree.predict_proba does.
+    """
+    features, thresholds, lefts, rights, leaf_index, leaf_values, roots = [], [], [], [], [], [], []
+    node_offset = 0
+    leaf_offset = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        nodes = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, nodes, tree.children_left) + node_offset)
+        rights.append(np.where(is_leaf, nodes, tree.children_right) + node_offset)
+
+        # Leaf class distributions, normalized like DecisionTreeClassifier.predict_proba
+        values = tree.value[is_leaf, 0, :]
+        normalizer = values.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_values.append(values / normalizer)
+
+        leaf_ids = np.full(n_nodes, -1)
+        leaf_ids[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+        leaf_index.append(leaf_ids)
+
+        roots.append(node_offset)
+        node_offset += n_nodes
+        leaf_offset += int(is_leaf.sum())
+
+    return {
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.int32),
+        "right": np.concatenate(rights).astype(np.int32),
+        "leaf_index": np.concatenate(leaf_index).astype(np.int32),
+        "leaf_values": np.concatenate(leaf_values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.int32(max(estimator.tree_.max_depth for estimator in model.estimators_)),
+    }
+
+
+class FlatForest:
+    """
+    Array-backed random forest inference engine
+
+    Traverses all trees for one or many rows at once with vectorized NumPy
+    and returns the same probabilities as RandomForestClassifier.predict_proba,
+    without sklearn's per-call validation and per-tree dispatch overhead.
+    """
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.leaf_index = arrays["leaf_index"]
+        self.leaf_values = arrays["leaf_values"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.is_leaf = self.leaf_index >= 0
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_classes(self) -> int:
+        return self.leaf_values.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in FOREST_ARRAYS)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(flatten_forest(model))
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            leaf_index=self.leaf_index,
+            leaf_values=self.leaf_values,
+            roots=self.roots,
+            max_depth=np.int32(self.max_depth),
+        )
+
+    def save_arrays(self, directory: str):
+        """Save each array as its own .npy file so it can be memory-mapped by load_arrays"""
+        os.makedirs(directory, exist_ok=True)
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "max_depth.npy"), np.int32(self.max_depth))
+
+    @classmethod
+    def load_arrays(cls, directory: str, mmap_mode: str = "r"):
+        """
+        Load arrays saved by save_arrays, memory-mapped by default so every
+        worker process shares the same pages through the OS page cache
+        """
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in FOREST_ARRAYS}
+        arrays["max_depth"] = np.load(os.path.join(directory, "max_depth.npy"))
+        return cls(arrays)
+
+    def apply(self, X) -> np.ndarray:
+        """Return the leaf node reached in every tree, shape (n_rows, n_estimators)"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_estimators)).copy()
+
+        for _ in range(self.max_depth):
+            if self.is_leaf[nodes].all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X, n_chunks: int = 1, executor=None) -> np.ndarray:
+        """
+        Class probabilities, shape (n_rows, n_classes)
+
+        With `n_chunks` > 1 and an `executor`, rows are split into that many
+        chunks traversed in parallel (NumPy releases the GIL for the heavy
+        operations). Each row is computed exactly as in the single-chunk case.
+        """
+        X = np.asarray(X)
+        n_chunks = min(n_chunks, len(X))
+        if n_chunks > 1 and executor is not None:
+            return np.vstack(list(executor.map(self._predict_proba, np.array_split(X, n_chunks))))
+        return self._predict_proba(X)
+
+    def _predict_proba(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+        # Sum tree distributions in estimator order, then average (as sklearn does)
+        proba = self.leaf_values[self.leaf_index[leaves]].sum(axis=1)
+        proba /= self.n_estimators
+        return proba
+
+
+def verify_flat_forest(forest: FlatForest, model, X, atol: float = 1e-12) -> float:
+    """Assert the flat forest matches model.predict_proba on X; return the max abs difference"""
+    expected = model.predict_proba(X)
+    actual = forest.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max()) if len(X) else 0.0
+    if expected.shape != actual.shape or max_diff > atol:
+        raise AssertionError(
+            f"Flat forest does not match sklearn: shape {actual.shape} vs {expected.shape}, max diff {max_diff}"
+        )
+    return max_diff
@@ -0,0 +1,66 @@
+import copy
+import time
+import numpy as np
+from utils.flat_forest import FlatForest
+
+
+def forest_subset(model, n_trees: int):
+    """
+    The first `n_trees` trees of a fitted random forest, as a model of its own
+
+    Random forest trees are independent draws, so a prefix is an unbiased
+    subset. A forest refit with n_estimators=n_trees and the same
+    random_state grows exactly these trees.
+    """
+    subset = copy.copy(model)
+    subset.estimators_ = model.estimators_[:n_trees]
+    subset.n_estimators = len(subset.estimators_)
+    return subset
+
+
+def single_row_latency(forest: FlatForest, X: np.ndarray, n_calls: int = 200) -> tuple:
+    """p50 and p99 wall time in milliseconds of one-row predict_proba calls (rows taken in turn from X)"""
+    forest.predict_proba(X[:1])
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        row = X[i % len(X)][np.newaxis, :]
+        start = time.perf_counter()
+        forest.predict_proba(row)
+        timings[i] = (time.perf_counter() - start) * 1000
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def evaluate_candidate(model, X_val: np.ndarray, y_val: np.ndarray, n_calls: int = 200) -> dict:
+    """Validation accuracy, single-row latency and array size of a candidate as served (flat forest)"""
+    forest = FlatForest.from_model(model)
+    p50_ms, p99_ms = single_row_latency(forest, X_val, n_calls)
+    return {
+        "n_estimators": forest.n_estimators,
+        "max_depth": model.max_depth,
+        "accuracy": round(float((forest.predict_proba(X_val).argmax(axis=1) == y_val).mean()), 4),
+        "p50_ms": round(p50_ms, 3),
+        "p99_ms": round(p99_ms, 3),
+        "bytes": int(forest.nbytes),
+    }
+
+
+def pareto_front(candidates: list) -> list:
+    """Candidates no other candidate beats on accuracy, p50, p99 and bytes at once"""
+    def dominates(a, b):
+        at_least = (a["accuracy"] >= b["accuracy"] and a["p50_ms"] <= b["p50_ms"]
+                    and a["p99_ms"] <= b["p99_ms"] and a["bytes"] <= b["bytes"])
+        return at_least and a != b
+    front = [c for c in candidates if not any(dominates(other, c) for other in candidates)]
+    return sorted(front, key=lambda c: c["bytes"])
+
+
+def select_candidate(candidates: list, baseline_accuracy: float, max_accuracy_loss: float,
+                     latency_budget_ms: float = None, size_budget_bytes: int = None):
+    """Smallest candidate within the accuracy tolerance and budgets (p99 latency, bytes), or None"""
+    eligible = [
+        c for c in candidates
+        if c["accuracy"] >= baseline_accuracy - max_accuracy_loss
+        and (latency_budget_ms is None or c["p99_ms"] <= latency_budget_ms)
+        and (size_budget_bytes is None or c["bytes"] <= size_budget_bytes)
+    ]
+    return min(eligible, key=lambda c: (c["bytes"], c["p99_ms"])) if eligible else None
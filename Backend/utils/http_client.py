@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+import httpx
+from config.constants import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF_SECONDS,
+    WEATHER_API_TIMEOUT_SECONDS,
+    EMAIL_API_TIMEOUT_SECONDS,
+    GOOGLE_API_TIMEOUT_SECONDS
+)
+
+# HTTP/2 needs the `h2` package (httpx[http2] in requirements.txt); without it the clients use HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ServiceClient:
+    """
+    Pooled async HTTP client for one outbound service
+
+    Wraps a single httpx.AsyncClient (created on first use) so connections
+    are kept alive and reused across requests, with HTTP/2 when available.
+    Failed requests are retried with exponential backoff and jitter:
+    - idempotent methods on transport errors and 429/502/503/504 responses
+    - other methods only when the connection could not be established,
+      so a POST is never sent twice
+    Latency and error counters are kept for monitoring.
+    """
+
+    def __init__(self, name: str, timeout: float = 10.0, retries: int = HTTP_MAX_RETRIES,
+                 backoff_seconds: float = HTTP_RETRY_BACKOFF_SECONDS,
+                 max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS):
+        self.name = name
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._client = None
+
+        # Counters for monitoring
+        self.requests = 0
+        self.retried = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(self.timeout),
+                limits=self.limits
+            )
+        return self._client
+
+    def _should_retry(self, method: str, error: Exception = None, response: httpx.Response = None) -> bool:
+        if error is not None:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                return True  # request never reached the server
+            return method in IDEMPOTENT_METHODS and isinstance(error, httpx.TransportError)
+        return method in IDEMPOTENT_METHODS and response.status_code in RETRY_STATUS_CODES
+
+    async def _backoff(self, attempt: int):
+        self.retried += 1
+        delay = self.backoff_seconds * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        method = method.upper()
+        for attempt in range(self.retries + 1):
+            self.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await self._get_client().request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                self.errors += 1
+                if attempt < self.retries and self._should_retry(method, error=e):
+                    await self._backoff(attempt)
+                    continue
+                raise
+            finally:
+                latency = time.perf_counter() - start
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+            if response.status_code >= 500:
+                self.errors += 1
+            if attempt < self.retries and self._should_retry(method, response=response):
+                await self._backoff(attempt)
+                continue
+            return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "timeout_seconds": self.timeout,
+            "requests": self.requests,
+            "retried": self.retried,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_latency / self.requests * 1000, 2) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 2),
+        }
+
+
+# One pooled client per outbound service
+weather_client = ServiceClient("weather", timeout=WEATHER_API_TIMEOUT_SECONDS)
+email_client = ServiceClient("email", timeout=EMAIL_API_TIMEOUT_SECONDS)
+google_client = ServiceClient("google", timeout=GOOGLE_API_TIMEOUT_SECONDS)
+
+HTTP_CLIENTS = [weather_client, email_client, google_client]
+
+
+async def close_http_clients():
+    """Close all pooled connections (called on app shutdown)"""
+    for client in HTTP_CLIENTS:
+        await client.aclose()
+
+
+def http_client_stats() -> dict:
+    return {client.name: client.stats() for client in HTTP_CLIENTS}
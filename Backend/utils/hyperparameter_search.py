@@ -0,0 +1,165 @@
+import hashlib
+import json
+import math
+import os
+import time
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+
+SEARCH_CACHE_VERSION = 1  # bump when fold scoring changes, so old cached folds are ignored
+
+
+def dataset_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """Content hash of a training set (shape, dtype and values of X and y)"""
+    digest = hashlib.sha256()
+    for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+        digest.update(f"{array.shape}{array.dtype.str}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class FoldCache:
+    """
+    Fold scores on disk, one small JSON file per fitted fold
+
+    Keys are hashes of everything that determines the score (dataset
+    fingerprint, parameters, resources, fold, seed, cache version), so an
+    interrupted search resumes where it stopped and a changed dataset or
+    grid never reuses stale scores. Files are written atomically.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(**parts) -> str:
+        payload = json.dumps({"version": SEARCH_CACHE_VERSION, **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str):
+        try:
+            with open(os.path.join(self.directory, f"{key}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: dict):
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+
+class SearchBudgetExhausted(RuntimeError):
+    pass
+
+
+def successive_halving_search(estimator, param_grid: dict, X: np.ndarray, y: np.ndarray, cv: int = 3,
+                              factor: int = 3, min_trees: int = 25, min_samples: int = 500,
+                              time_budget_s: float = None, cache: FoldCache = None,
+                              random_state: int = 42, log=print) -> dict:
+    """
+    Successive halving over n_estimators and training rows, with fold caching and a wall-clock budget
+
+    Every configuration of the grid is cross-validated with a fraction of
+    its trees on a stratified fraction of the rows; the best 1/factor move
+    on to the next rung with `factor` times more of both, until the last
+    rung uses all trees and rows. A budget that runs out stops the search
+    at the next fit, and the winner is the best configuration among those
+    that finished every fold of the highest rung reached (rerun to resume
+    from the cache).
+
+    Returns a report: best_params, cv_scores (the winner's fold accuracies
+    at the resources of that rung), the resources, per-rung summaries,
+    fit/cached counts, elapsed seconds and whether the budget ran out.
+    """
+    start = time.perf_counter()
+    candidates = list(ParameterGrid(param_grid))
+    n_rungs = max(1, math.ceil(math.log(len(candidates), factor)))
+    fingerprint = dataset_fingerprint(X, y)
+    folds = StratifiedKFold(n_splits=cv)
+    fits = cached_fits = 0
+    rungs, completed, rung_samples = [], {}, {}  # completed: rung → {candidate index: fold scores}
+    budget_exhausted = False
+    alive = list(range(len(candidates)))
+
+    try:
+        for rung in range(n_rungs):
+            fraction = float(factor) ** (rung - (n_rungs - 1))
+            n_samples = len(y) if rung == n_rungs - 1 else min(len(y), max(min_samples, round(len(y) * fraction)))
+            if n_samples < len(y):
+                rows, _ = train_test_split(np.arange(len(y)), train_size=n_samples, stratify=y,
+                                           random_state=random_state)
+            else:
+                rows = np.arange(len(y))
+            X_rung, y_rung = X[rows], y[rows]
+            rung_samples[rung] = int(n_samples)
+            splits = list(folds.split(X_rung, y_rung))
+
+            rung_cached = 0
+            completed[rung] = {}
+            for index in alive:
+                params = candidates[index]
+                n_trees = max(min_trees, round(params["n_estimators"] * fraction))
+                scores = []
+                for fold, (train_rows, test_rows) in enumerate(splits):
+                    key = FoldCache.key(data=fingerprint, params=params, n_estimators=n_trees,
+                                        n_samples=n_samples, fold=fold, cv=cv, seed=random_state)
+                    cached = cache.get(key) if cache is not None else None
+                    if cached is None:
+                        if time_budget_s is not None and time.perf_counter() - start > time_budget_s:
+                            raise SearchBudgetExhausted
+                        model = clone(estimator).set_params(**{**params, "n_estimators": n_trees})
+                        model.fit(X_rung[train_rows], y_rung[train_rows])
+                        cached = {"score": float(model.score(X_rung[test_rows], y_rung[test_rows]))}
+                        fits += 1
+                        if cache is not None:
+                            cache.put(key, cached)
+                    else:
+                        cached_fits += 1
+                        rung_cached += 1
+                    scores.append(cached["score"])
+                completed[rung][index] = scores
+
+            ranked = sorted(alive, key=lambda i: -np.mean(completed[rung][i]))  # stable: grid order breaks ties
+            rungs.append({
+                "candidates": len(alive),
+                "tree_fraction": round(fraction, 4),
+                "n_samples": int(n_samples),
+                "best_score": round(float(np.mean(completed[rung][ranked[0]])), 4),
+                "cached_folds": rung_cached,
+            })
+            log(f"   Rung {rung + 1}/{n_rungs}: {len(alive)} configs × {cv} folds on {n_samples:,} rows, "
+                f"{fraction:.0%} of trees ({rung_cached} folds cached) → best {rungs[-1]['best_score']:.4f}")
+            alive = ranked[:max(1, math.ceil(len(alive) / factor))]
+    except SearchBudgetExhausted:
+        budget_exhausted = True
+        log(f"   ⏱️ Search budget of {time_budget_s:.0f}s used up; keeping the best of the highest rung reached")
+
+    # Highest rung in which at least one configuration finished every fold (only those are recorded)
+    finished = [rung for rung in completed if completed[rung]]
+    if not finished:
+        raise RuntimeError(
+            "Search budget ran out before any configuration finished its folds; "
+            "rerun to resume from the fold cache or raise the budget"
+        )
+    rung = max(finished)
+    scores_by_candidate = completed[rung]
+    best = max(scores_by_candidate, key=lambda i: (np.mean(scores_by_candidate[i]), -i))
+    fraction = float(factor) ** (rung - (n_rungs - 1))
+    return {
+        "best_params": candidates[best],
+        "cv_scores": [round(score, 4) for score in scores_by_candidate[best]],
+        "cv_resources": {
+            "n_estimators": max(min_trees, round(candidates[best]["n_estimators"] * fraction)),
+            "n_samples": rung_samples[rung],
+        },
+        "rungs": rungs,
+        "fits": fits,
+        "cached_fits": cached_fits,
+        "elapsed_s": round(time.perf_counter() - start, 1),
+        "budget_exhausted": budget_exhausted,
+    }
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class InferenceOverloadedError(Exception):
+    """Raised when the inference queue is full and a job is rejected"""
+    pass
+
+
+class InferenceExecutor:
+    """
+    Dedicated, bounded executor for CPU-heavy model inference
+
+    Jobs run in a thread pool or process pool (`kind`), never on the event
+    loop. At most `max_workers + max_queue` jobs may be running or waiting;
+    anything beyond that is rejected immediately with InferenceOverloadedError
+    so callers can shed load instead of queueing forever. Each job is awaited
+    for at most `timeout_s` seconds. `initializer` runs once in every worker
+    process (e.g. to load the models); it is not used for threads.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 2, max_queue: int = 64, timeout_s: float = 5.0,
+                 initializer=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout_s = timeout_s
+        self.initializer = initializer
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0  # running + queued jobs (decremented when the worker finishes)
+
+        # Counters for monitoring
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+        return self._executor
+
+    def _job_finished(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the inference pool, enforcing the queue bound and timeout"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceOverloadedError("Inference queue is full")
+            self._in_flight += 1
+
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        job.add_done_callback(self._job_finished)
+
+        try:
+            # Cancelling on timeout drops the job if it has not started yet
+            result = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+        self.completed += 1
+        return result
+
+    def restart(self):
+        """Start a fresh worker pool for new jobs; jobs already submitted finish on the old one"""
+        with self._lock:
+            old, self._executor = self._executor, None
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
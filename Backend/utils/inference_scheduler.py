@@ -0,0 +1,101 @@
+import asyncio
+import numpy as np
+
+
+class InferenceScheduler:
+    """
+    Micro-batching scheduler for model inference
+
+    Collects single feature rows submitted by concurrent requests and runs
+    them through one batched model call, either when `max_batch_size` rows
+    are waiting or `max_wait_ms` has passed since the first row arrived.
+    The batch runs off the event loop (on `executor` when given, otherwise the
+    loop's default executor) and each caller gets its own row back.
+    Extra arguments passed to `predict()` (e.g. the model generation) are
+    forwarded to `predict_fn`; only rows with the same arguments share a batch.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 32, max_wait_ms: float = 3.0, executor=None):
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._pending = []  # (row, args, future) triples waiting for the next batch
+        self._timer = None
+        self._running = set()  # keep references to in-flight batch tasks
+
+        # Counters for monitoring
+        self.batches = 0
+        self.rows = 0
+
+    async def predict(self, row: np.ndarray, *args) -> np.ndarray:
+        """Submit one feature row and wait for its model output row"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, args, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Rows submitted with different arguments (e.g. across a model swap) run separately
+        groups = {}
+        for row, args, future in batch:
+            groups.setdefault(tuple(map(id, args)), (args, []))[1].append((row, future))
+
+        for args, items in groups.values():
+            task = asyncio.get_running_loop().create_task(self._run_batch(items, args))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch, args=()):
+        self.batches += 1
+        self.rows += len(batch)
+
+        outputs, error = None, None
+        try:
+            rows = np.vstack([row for row, _ in batch])
+            if self.executor is not None:
+                outputs = await self.executor.run(self.predict_fn, rows, *args)
+            else:
+                loop = asyncio.get_running_loop()
+                outputs = await loop.run_in_executor(None, self.predict_fn, rows, *args)
+        except Exception as e:
+            error = e
+        except BaseException as e:  # cancelled or shutting down: callers still get an answer below
+            error = e
+            raise
+        finally:
+            # Route each output row (or the failure) back to the caller that submitted it
+            for i, (_, future) in enumerate(batch):
+                if future.done():  # caller may have gone away
+                    continue
+                if error is None:
+                    future.set_result(outputs[i])
+                elif isinstance(error, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from typing import TYPE_CHECKING
+from utils.climatology import ClimatologyIndex
+from utils.flat_forest import FlatForest
+from utils.compact_forest import CompactForest
+
+# joblib and pandas are imported by the functions that use them, so importing
+# this module (e.g. at API startup) stays cheap until a bundle is actually read
+if TYPE_CHECKING:
+    import pandas as pd
+
+MODEL_BUNDLE_SCHEMA_VERSION = 1
+CURRENT_POINTER = "CURRENT"  # file in the bundles directory naming the active bundle
+
+# Files inside a bundle directory
+MANIFEST_FILE = "manifest.json"
+PREPROCESSING_FILE = "preprocessing.joblib"
+MODEL_FILE = "model.joblib"
+FOREST_DIR = "forest"
+COMPACT_FOREST_DIR = "compact_forest"
+HOLDOUT_DIR = "holdout"
+CROP_STATS_FILE = "crop_stats.csv"
+CLIMATOLOGY_DIR = "climatology"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_model_bundle(root: str, model, preprocessing: dict, forest: FlatForest, crop_stats: "pd.DataFrame",
+                       climatology: ClimatologyIndex, metadata: dict = None, compact_forest: CompactForest = None,
+                       holdout: tuple = None, keep: int = None) -> str:
+    """
+    Write a versioned model bundle under `root` and make it the current one
+
+    Layout of `root/<version>/`:
+    - manifest.json          schema version, features, classes, metadata and sha256 of every file
+    - preprocessing.joblib   encoders, scaler, feature selector and feature lists
+    - model.joblib           the sklearn model (only needed when the flat forest is disabled)
+    - forest/*.npy           flat forest arrays, memory-mappable
+    - compact_forest/        quantized forest arrays (optional, served with FOREST_FORMAT=compact)
+    - holdout/X.npy, y.npy   scaled held-out rows and labels (optional, for evaluate_compact_forest.py)
+    - crop_stats.csv         per-crop production and price statistics
+    - climatology/           per-city historical weather averages
+
+    The version is the local write time plus a hash of the bundle's files
+    (<YYYYmmdd-HHMMSS>-<8 hex>), so two different bundles written in the same
+    second never share a directory. The bundle is written to a temporary
+    directory and renamed into place, then `root/CURRENT` is atomically
+    replaced, so readers never see a half-written bundle. With `keep`, only
+    the `keep` newest bundles (and always the current one) are kept
+    afterwards. Returns the bundle directory.
+    """
+    import joblib
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    staging_path = os.path.join(root, f".staging-{timestamp}-{os.getpid()}")
+    os.makedirs(root, exist_ok=True)
+    shutil.rmtree(staging_path, ignore_errors=True)
+    os.makedirs(staging_path)
+
+    # Uncompressed so joblib.load(..., mmap_mode='r') can map the arrays
+    joblib.dump(preprocessing, os.path.join(staging_path, PREPROCESSING_FILE))
+    joblib.dump(model, os.path.join(staging_path, MODEL_FILE))
+    forest.save_arrays(os.path.join(staging_path, FOREST_DIR))
+    if compact_forest is not None:
+        compact_forest.save_arrays(os.path.join(staging_path, COMPACT_FOREST_DIR))
+    if holdout is not None:
+        os.makedirs(os.path.join(staging_path, HOLDOUT_DIR))
+        X_holdout, y_holdout = holdout
+        np.save(os.path.join(staging_path, HOLDOUT_DIR, "X.npy"), np.asarray(X_holdout))
+        np.save(os.path.join(staging_path, HOLDOUT_DIR, "y.npy"), np.asarray(y_holdout))
+    crop_stats.to_csv(os.path.join(staging_path, CROP_STATS_FILE), index=False)
+    climatology.save(os.path.join(staging_path, CLIMATOLOGY_DIR))
+
+    files = {}
+    for directory, _, names in os.walk(staging_path):
+        for name in sorted(names):
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, staging_path).replace(os.sep, "/")
+            files[relative] = {"sha256": file_sha256(path), "bytes": os.path.getsize(path)}
+    content_digest = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+    version = f"{timestamp}-{content_digest[:8]}"
+    bundle_path = os.path.join(root, version)
+
+    manifest = {
+        "schema_version": MODEL_BUNDLE_SCHEMA_VERSION,
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model": {
+            "type": type(model).__name__,
+            "n_estimators": forest.n_estimators,
+            "n_classes": forest.n_classes,
+            "params": {key: value for key, value in model.get_params().items()
+                       if isinstance(value, (int, float, str, bool, type(None)))},
+        },
+        "features": list(preprocessing["feature_cols"]),
+        "selected_features": list(preprocessing["selected_features"]),
+        "classes": [str(name) for name in preprocessing["crop_encoder"].classes_],
+        "compact_forest": compact_forest.format if compact_forest is not None else None,
+        "holdout_rows": int(len(holdout[1])) if holdout is not None else 0,
+        "files": files,
+        **(metadata or {}),
+    }
+    with open(os.path.join(staging_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(bundle_path):
+        shutil.rmtree(staging_path)  # the same files were already written this second
+    else:
+        os.replace(staging_path, bundle_path)
+
+    set_current_bundle(root, version)
+    if keep is not None:
+        prune_model_bundles(root, keep)
+    return bundle_path
+
+
+def set_current_bundle(root: str, version: str):
+    """Atomically point `root/CURRENT` at an existing bundle (servers watching it reload)"""
+    if not os.path.isfile(os.path.join(root, version, MANIFEST_FILE)):
+        raise FileNotFoundError(f"No model bundle {version} in {root}")
+    pointer_tmp = os.path.join(root, f".{CURRENT_POINTER}.tmp{os.getpid()}")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_POINTER))
+
+
+def prune_model_bundles(root: str, keep: int) -> list:
+    """
+    Delete all but the `keep` newest bundles under `root` (the current one is never deleted)
+
+    Bundles are ordered by when their manifest was written. Servers still
+    running an older generation keep working: their memory-mapped files stay
+    readable until unmapped. Returns the deleted versions.
+    """
+    current = current_bundle_path(root)
+    manifests = {
+        name: os.path.join(root, name, MANIFEST_FILE) for name in os.listdir(root) if not name.startswith(".")
+    }
+    versions = sorted(
+        (name for name, manifest in manifests.items() if os.path.isfile(manifest)),
+        key=lambda name: (os.path.getmtime(manifests[name]), name), reverse=True
+    )
+    removed = []
+    for version in versions[max(1, keep):]:
+        path = os.path.join(root, version)
+        if current is not None and os.path.samefile(path, current):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(version)
+    return removed
+
+
+def current_bundle_path(root: str):
+    """Directory of the active bundle under `root`, or None if there is none"""
+    pointer = os.path.join(root, CURRENT_POINTER)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, "r") as f:
+        version = f.read().strip()
+    path = os.path.join(root, version)
+    return path if os.path.exists(os.path.join(path, MANIFEST_FILE)) else None
+
+
+class ModelBundle:
+    """
+    Read access to a bundle written by write_model_bundle
+
+    Each loader checks the file's sha256 against the manifest before using
+    it. The flat and compact forest arrays are memory-mapped read-only.
+    """
+
+    def __init__(self, path: str, manifest: dict):
+        self.path = path
+        self.manifest = manifest
+
+    @classmethod
+    def open(cls, path: str):
+        with open(os.path.join(path, MANIFEST_FILE), "r") as f:
+            manifest = json.load(f)
+        if manifest.get("schema_version") != MODEL_BUNDLE_SCHEMA_VERSION:
+            raise ValueError(
+                f"Model bundle {path} has schema version {manifest.get('schema_version')}, "
+                f"expected {MODEL_BUNDLE_SCHEMA_VERSION}"
+            )
+        return cls(path, manifest)
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def verify(self, prefix: str):
+        """Check the sha256 of every manifest file under `prefix` (a file or directory)"""
+        for relative, info in self.manifest["files"].items():
+            if relative == prefix or relative.startswith(prefix + "/"):
+                if file_sha256(os.path.join(self.path, relative)) != info["sha256"]:
+                    raise ValueError(f"Checksum mismatch for {relative} in model bundle {self.path}")
+
+    def load_preprocessing(self) -> dict:
+        import joblib
+        self.verify(PREPROCESSING_FILE)
+        return joblib.load(os.path.join(self.path, PREPROCESSING_FILE), mmap_mode="r")
+
+    def load_model(self):
+        import joblib
+        self.verify(MODEL_FILE)
+        return joblib.load(os.path.join(self.path, MODEL_FILE), mmap_mode="r")
+
+    def load_forest(self) -> FlatForest:
+        self.verify(FOREST_DIR)
+        return FlatForest.load_arrays(os.path.join(self.path, FOREST_DIR), mmap_mode="r")
+
+    @property
+    def has_compact_forest(self) -> bool:
+        return bool(self.manifest.get("compact_forest"))
+
+    def load_compact_forest(self) -> CompactForest:
+        self.verify(COMPACT_FOREST_DIR)
+        return CompactForest.load_arrays(os.path.join(self.path, COMPACT_FOREST_DIR), mmap_mode="r")
+
+    def load_holdout(self):
+        """Held-out (X, y) recorded at training time, or None for bundles written without one"""
+        if not self.manifest.get("holdout_rows"):
+            return None
+        self.verify(HOLDOUT_DIR)
+        return tuple(np.load(os.path.join(self.path, HOLDOUT_DIR, name)) for name in ("X.npy", "y.npy"))
+
+    def load_crop_stats(self) -> "pd.DataFrame":
+        import pandas as pd
+        self.verify(CROP_STATS_FILE)
+        return pd.read_csv(os.path.join(self.path, CROP_STATS_FILE))
+
+    def load_climatology(self) -> ClimatologyIndex:
+        self.verify(CLIMATOLOGY_DIR)
+        return ClimatologyIndex.load(os.path.join(self.path, CLIMATOLOGY_DIR))
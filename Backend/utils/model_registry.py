@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+
+class GenerationMismatchError(Exception):
+    """Raised when a job built for one model generation reaches a worker that holds another"""
+    pass
+
+
+class ModelRegistry:
+    """
+    Holds the active model generation and replaces it without downtime
+
+    A generation is an immutable object built by `load_fn` (all model
+    components plus anything derived from them). Readers take
+    `registry.current` once per request and use that object throughout, so a
+    request that started before a swap finishes on the generation it began
+    with. `reload()` builds and warms the next generation off the event loop,
+    then swaps the reference in one assignment and calls `on_swap(old, new)`
+    so dependent caches can be dropped. A failed reload keeps serving the
+    previous generation.
+
+    `watch_fn` returns a token describing the on-disk artifacts (e.g. the
+    bundle pointer); while the watcher runs, a change in that token triggers
+    a reload.
+    """
+
+    def __init__(self, load_fn, warm_fn=None, on_swap=None, watch_fn=None, watch_interval_seconds: float = 10):
+        self.load_fn = load_fn
+        self.warm_fn = warm_fn
+        self.on_swap = on_swap
+        self.watch_fn = watch_fn
+        self.watch_interval_seconds = watch_interval_seconds
+
+        self._current = None
+        self._lock = None  # created lazily, on the running loop
+        self._watch_task = None
+        self._watch_token = None
+
+        # Counters for monitoring
+        self.generation = 0
+        self.loaded_at = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_error_type = None
+        self.last_reason = None
+        self.last_load_seconds = None
+        self.last_warm_seconds = None
+        self.loading = False
+
+    @property
+    def current(self):
+        return self._current
+
+    def _build(self):
+        start = time.perf_counter()
+        generation = self.load_fn()
+        loaded = time.perf_counter()
+        if generation is not None and self.warm_fn is not None:
+            self.warm_fn(generation)
+        return generation, (loaded - start, time.perf_counter() - loaded)
+
+    def _swap(self, generation, reason: str, timings: tuple):
+        old, self._current = self._current, generation
+        self.generation += 1
+        if old is not None:
+            self.reloads += 1
+        self.loaded_at = time.time()
+        self.last_reason = reason
+        self.last_load_seconds, self.last_warm_seconds = (round(seconds, 3) for seconds in timings)
+        self.last_error = self.last_error_type = None
+        if self.on_swap is not None:
+            self.on_swap(old, generation)
+
+    def _record_failure(self, error: Exception):
+        self.failures += 1
+        self.last_error = str(error)
+        self.last_error_type = type(error).__name__
+
+    def load(self, reason: str = "startup"):
+        """Build a generation synchronously (startup, worker processes); returns it, or None if nothing could be loaded"""
+        if self.watch_fn is not None:
+            self._watch_token = self.watch_fn()
+        self.loading = True
+        try:
+            generation, timings = self._build()
+        except Exception as e:
+            self._record_failure(e)
+            print(f"❌ Error loading models: {e}")
+            return None
+        finally:
+            self.loading = False
+        if generation is not None:
+            self._swap(generation, reason, timings)
+        return generation
+
+    async def reload(self, reason: str = "manual"):
+        """
+        Build and warm a new generation in a worker thread, then swap it in
+
+        Concurrent reloads are serialized. Raises if loading fails (the current
+        generation stays active).
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            token = self.watch_fn() if self.watch_fn is not None else None
+            self.loading = True
+            try:
+                generation, timings = await asyncio.to_thread(self._build)
+                if generation is None:
+                    raise RuntimeError("No model artifacts found")
+            except Exception as e:
+                self._record_failure(e)
+                raise
+            finally:
+                self.loading = False
+                # Do not retry the same artifacts in a loop if they are broken
+                self._watch_token = token
+            self._swap(generation, reason, timings)
+            return generation
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval_seconds)
+            try:
+                token = self.watch_fn()
+                if token != self._watch_token:
+                    await self.reload(reason="file_watch")
+                    print(f"🔄 Models reloaded after artifact change (generation {self.generation})")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Model reload failed, keeping generation {self.generation}: {e}")
+
+    def start_watch(self):
+        if self.watch_fn is None or self.watch_interval_seconds <= 0:
+            return
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop_watch(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def stats(self, detailed: bool = False) -> dict:
+        """
+        Registry state for monitoring
+
+        Only `detailed` stats (admin endpoints) include the full reload reason,
+        which may name the admin, and the error message; otherwise the reason
+        is reduced to its kind ("admin", "file_watch", ...) and the error to
+        its exception class.
+        """
+        stats = {
+            "loaded": self._current is not None,
+            "version": getattr(self._current, "version", None),
+            "generation": self.generation,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.loaded_at)) if self.loaded_at else None,
+            "last_reason": self.last_reason.split(":", 1)[0] if self.last_reason else None,
+            "last_load_seconds": self.last_load_seconds,
+            "last_warm_seconds": self.last_warm_seconds,
+            "loading": self.loading,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error_type": self.last_error_type,
+            "watching": self._watch_task is not None and not self._watch_task.done(),
+        }
+        if detailed:
+            stats.update(last_reason=self.last_reason, last_error=self.last_error)
+        return stats
@@ -0,0 +1,91 @@
+import asyncio
+
+
+class ObservationWriter:
+    """
+    Buffered, batched writer for time-series documents
+
+    `record()` only appends to an in-memory buffer, so callers never wait on
+    the database. A background task flushes the buffer with insert_many every
+    `flush_interval_seconds`, or sooner once `batch_size` documents are waiting.
+    The buffer is capped at `max_buffer` documents (oldest dropped first) so a
+    database outage cannot grow memory without bound.
+    """
+
+    def __init__(self, collection, batch_size: int = 100, flush_interval_seconds: float = 5,
+                 max_buffer: int = 10000):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffer = max(self.batch_size, max_buffer)
+
+        self._buffer = []
+        self._task = None
+        self._wakeup = None
+
+        # Counters for monitoring
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, document: dict):
+        """Queue one document for writing (ignored while the writer is not running)"""
+        if not self.running:
+            return
+        self._buffer.append(document)
+        if len(self._buffer) > self.max_buffer:
+            overflow = len(self._buffer) - self.max_buffer
+            del self._buffer[:overflow]
+            self.dropped += overflow
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write whatever is still buffered"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        while self._buffer:
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"Failed to write {len(batch)} observations: {e}")
+                self.failed_batches += 1
+                self.dropped += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
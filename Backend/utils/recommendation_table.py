@@ -0,0 +1,139 @@
+import os
+from bisect import bisect_right
+import numpy as np
+
+
+class RecommendationTable:
+    """
+    Dense precomputed table of ranked, per-acre crop recommendations
+
+    The input space is the cartesian product of the categorical `axes`
+    (e.g. state, city, season, soil type, water availability) and the
+    weather `bins`: for each binned weather field, sorted bin edges and
+    the value scored for each bin (e.g. 1 °C temperature buckets, a few
+    coarse vapour pressure and cloud cover bins). Every grid point owns one
+    row of `crop_ids` / `suitability` (padded with -1 / 0.0), in the order
+    produced by itertools.product over the axes and then the bins, so a
+    lookup is a handful of dict hits, bisections and integer arithmetic.
+    Per-acre economics are stored once per crop and shared by all rows.
+
+    A binned field snaps the request's value to its bin, so a hit is an
+    approximation of inference on the request's weather. The remaining
+    `weather_fields` are fixed per categorical grid point (`weather` holds
+    the values the model saw) and must match the request exactly.
+    """
+
+    def __init__(self, axes: dict, bins: dict, crop_names: list,
+                 production_per_acre: np.ndarray, price_per_quintal: np.ndarray,
+                 crop_ids: np.ndarray, suitability: np.ndarray, weather_fields: list,
+                 weather: np.ndarray, meta: dict = None):
+        self.axes = {name: list(labels) for name, labels in axes.items()}
+        self.bins = {field: ([float(edge) for edge in edges], [float(value) for value in values])
+                     for field, (edges, values) in bins.items()}
+        self.crop_names = list(crop_names)
+        self.production_per_acre = np.asarray(production_per_acre, dtype=np.float64)
+        self.price_per_quintal = np.asarray(price_per_quintal, dtype=np.float64)
+        self.crop_ids = np.asarray(crop_ids, dtype=np.int16)
+        self.suitability = np.asarray(suitability, dtype=np.float64)
+        self.weather_fields = list(weather_fields)
+        self.weather = np.asarray(weather, dtype=np.float64)
+        self.meta = meta or {}
+
+        for field, (edges, values) in self.bins.items():
+            if len(edges) != len(values) + 1 or edges != sorted(edges):
+                raise ValueError(f"Recommendation table bins for {field} need sorted edges, one more than values")
+
+        self._index = [{label: i for i, label in enumerate(labels)} for labels in self.axes.values()]
+        self._sizes = [len(labels) for labels in self.axes.values()]
+        self._bin_sizes = [len(values) for _, values in self.bins.values()]
+        self._group_rows = int(np.prod(self._bin_sizes))
+
+        n_groups = int(np.prod(self._sizes))
+        expected_rows = n_groups * self._group_rows
+        if self.crop_ids.shape[0] != expected_rows or self.suitability.shape != self.crop_ids.shape:
+            raise ValueError(f"Recommendation table has {self.crop_ids.shape[0]} rows, expected {expected_rows}")
+        if self.weather.shape != (n_groups, len(self.weather_fields)):
+            raise ValueError(f"Recommendation table weather has shape {self.weather.shape}, "
+                             f"expected {(n_groups, len(self.weather_fields))}")
+
+    def __len__(self) -> int:
+        return self.crop_ids.shape[0]
+
+    def row_for(self, keys: tuple, weather: dict) -> int:
+        """Row index for the categorical keys and binned weather values, or -1 if outside the grid"""
+        row = 0
+        for index, size, key in zip(self._index, self._sizes, keys):
+            position = index.get(key)
+            if position is None:
+                return -1
+            row = row * size + position
+
+        for (edges, values), size, field in zip(self.bins.values(), self._bin_sizes, self.bins):
+            position = bisect_right(edges, weather[field]) - 1
+            if position < 0 or position >= size:
+                return -1
+            row = row * size + position
+        return row
+
+    def lookup(self, keys: tuple, weather: dict):
+        """
+        (entries, weather used) for a grid point, or None on a miss
+
+        `weather` maps feature names to values (WeatherData.model_dump());
+        binned fields pick their bin and every field in `weather_fields` must
+        equal the table's weather for the keys. Entries are ranked
+        (crop_name, suitability, production_per_acre, price_per_quintal)
+        tuples; the weather used is the request's with every table field
+        replaced by the value the row was scored with.
+        """
+        row = self.row_for(keys, weather)
+        if row < 0:
+            return None
+        group = row // self._group_rows
+        if any(weather[field] != value for field, value in zip(self.weather_fields, self.weather[group])):
+            return None
+
+        entries = []
+        for crop_id, suitability in zip(self.crop_ids[row], self.suitability[row]):
+            if crop_id < 0:
+                break
+            entries.append((
+                self.crop_names[crop_id],
+                float(suitability),
+                float(self.production_per_acre[crop_id]),
+                float(self.price_per_quintal[crop_id])
+            ))
+
+        weather_used = dict(weather)
+        weather_used.update((field, float(value)) for field, value in zip(self.weather_fields, self.weather[group]))
+        position = row
+        for (_, values), size, field in reversed(list(zip(self.bins.values(), self._bin_sizes, self.bins))):
+            position, bin_index = divmod(position, size)
+            weather_used[field] = values[bin_index]
+        return entries, weather_used
+
+    def save(self, path: str):
+        """Write the table to a temporary file and rename it into place, so readers never see a partial file"""
+        import joblib
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        joblib.dump({
+            "axes": self.axes,
+            "bins": self.bins,
+            "crop_names": self.crop_names,
+            "production_per_acre": self.production_per_acre,
+            "price_per_quintal": self.price_per_quintal,
+            "crop_ids": self.crop_ids,
+            "suitability": self.suitability,
+            "weather_fields": self.weather_fields,
+            "weather": self.weather,
+            "meta": self.meta,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        import joblib
+        data = joblib.load(path)
+        if "bins" not in data:
+            raise ValueError("Recommendation table predates weather bins; rebuild it")
+        return cls(**data)
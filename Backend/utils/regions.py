@@ -0,0 +1,143 @@
+import hashlib
+import json
+import numpy as np
+
+# Fields every city entry must define
+REGION_FIELDS = ("soil_ph", "ph_adjustment", "climate_factor", "crop_affinity", "season_rainfall")
+ANNUAL_SEASON = "Whole Year"
+
+# Plausible value ranges (checked at load time)
+PH_RANGE = (3.0, 10.0)
+PH_ADJUSTMENT_RANGE = (-2.0, 2.0)
+CLIMATE_FACTOR_RANGE = (0.1, 3.0)
+AFFINITY_RANGE = (0.0, 1.0)
+
+
+def validate_regions(doc: dict, known_crops=None) -> list:
+    """Every problem found in a region registry document (empty if it is valid)"""
+    problems = []
+    for key in ("state", "seasons", "default_rainfall", "default_soil_ph", "soil_type_ph", "cities"):
+        if key not in doc:
+            problems.append(f"missing top-level key '{key}'")
+    if problems:
+        return problems
+
+    seasons = doc["seasons"]
+    if ANNUAL_SEASON not in seasons:
+        problems.append(f"seasons must include '{ANNUAL_SEASON}' (used for unknown seasons)")
+
+    def check_range(label, value, bounds):
+        if not isinstance(value, (int, float)) or not bounds[0] <= value <= bounds[1]:
+            problems.append(f"{label} = {value!r} is outside {bounds}")
+
+    for soil_type, ph in doc["soil_type_ph"].items():
+        check_range(f"soil_type_ph[{soil_type}]", ph, PH_RANGE)
+    check_range("default_soil_ph", doc["default_soil_ph"], PH_RANGE)
+    check_range("default_rainfall", doc["default_rainfall"], (0.0, float("inf")))
+
+    seen = {}
+    for city, entry in doc["cities"].items():
+        if city.lower() in seen:
+            problems.append(f"{city}: duplicates {seen[city.lower()]} (differs only in case)")
+        seen[city.lower()] = city
+
+        missing = [field for field in REGION_FIELDS if field not in entry]
+        unknown = [field for field in entry if field not in REGION_FIELDS]
+        if missing or unknown:
+            problems.append(f"{city}: missing fields {missing}, unknown fields {unknown}")
+            continue
+
+        check_range(f"{city}.soil_ph", entry["soil_ph"], PH_RANGE)
+        check_range(f"{city}.ph_adjustment", entry["ph_adjustment"], PH_ADJUSTMENT_RANGE)
+        check_range(f"{city}.climate_factor", entry["climate_factor"], CLIMATE_FACTOR_RANGE)
+        for crop, boost in entry["crop_affinity"].items():
+            check_range(f"{city}.crop_affinity[{crop}]", boost, AFFINITY_RANGE)
+            if known_crops is not None and crop not in known_crops:
+                problems.append(f"{city}.crop_affinity: unknown crop '{crop}'")
+        if set(entry["season_rainfall"]) != set(seasons):
+            problems.append(f"{city}.season_rainfall must define exactly the seasons {seasons}")
+        for season, rainfall in entry["season_rainfall"].items():
+            check_range(f"{city}.season_rainfall[{season}]", rainfall, (0.0, float("inf")))
+    return problems
+
+
+class RegionRegistry:
+    """
+    Per-city reference data for one state, shared by training and serving
+
+    Loaded once from the region data file (data/gujarat_regions.json) and
+    validated, so every city defines every field. Each field is a dense
+    array with one row per city plus a final default row for cities outside
+    the registry (neutral adjustments, default pH and rainfall): a request
+    looks its city up once with row() and then only indexes arrays. Crop
+    affinities become a (rows, n_classes) matrix aligned to the model's class
+    ids with affinity_matrix().
+
+    Treat instances as immutable; a changed file is picked up by loading a
+    new registry (the model registry does this on reload).
+    """
+
+    def __init__(self, doc: dict, checksum: str = ""):
+        self.state = doc["state"]
+        self.seasons = list(doc["seasons"])
+        self.soil_type_ph = dict(doc["soil_type_ph"])
+        self.default_soil_ph = float(doc["default_soil_ph"])
+        self.checksum = checksum
+
+        entries = doc["cities"]
+        self.cities = list(entries)
+        self._rows = {city: row for row, city in enumerate(self.cities)}
+        self.default_row = len(self.cities)
+        self._season_columns = {season: column for column, season in enumerate(self.seasons)}
+
+        def column(field, default):
+            return np.array([entries[city][field] for city in self.cities] + [default], dtype=np.float64)
+
+        self.soil_ph = column("soil_ph", self.default_soil_ph)
+        self.ph_adjustment = column("ph_adjustment", 0.0)
+        self.climate_factor = column("climate_factor", 1.0)
+        self.season_rainfall = np.array(
+            [[entries[city]["season_rainfall"][season] for season in self.seasons] for city in self.cities]
+            + [[float(doc["default_rainfall"])] * len(self.seasons)],
+            dtype=np.float64
+        )
+        self.crop_affinity = {city: dict(entries[city]["crop_affinity"]) for city in self.cities}
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._rows
+
+    @classmethod
+    def load(cls, path: str, known_crops=None):
+        """Load and validate a region data file; raises ValueError listing every problem"""
+        with open(path, "rb") as f:
+            raw = f.read()
+        doc = json.loads(raw)
+        problems = validate_regions(doc, known_crops)
+        if problems:
+            raise ValueError(f"Invalid region registry {path}:\n  - " + "\n  - ".join(problems))
+        return cls(doc, checksum=hashlib.sha256(raw).hexdigest())
+
+    def row(self, city: str) -> int:
+        """Row of the city in every per-city array (default_row if the city is unknown)"""
+        return self._rows.get(city, self.default_row)
+
+    def season_column(self, season: str) -> int:
+        """Column of the season in season_rainfall (the annual column for unknown seasons)"""
+        return self._season_columns.get(season, self._season_columns[ANNUAL_SEASON])
+
+    def rainfall(self, city: str, season: str) -> float:
+        """Seasonal rainfall (mm) for the city, the annual value for unknown seasons, the default for unknown cities"""
+        return float(self.season_rainfall[self.row(city), self.season_column(season)])
+
+    def affinity_matrix(self, class_names) -> np.ndarray:
+        """Crop affinity boosts, shape (len(self) + 1, n_classes); crops the model does not predict are dropped"""
+        class_ids = {name: idx for idx, name in enumerate(class_names)}
+        matrix = np.zeros((len(self.cities) + 1, len(class_ids)))
+        for city, affinities in self.crop_affinity.items():
+            for crop, boost in affinities.items():
+                if crop in class_ids:
+                    matrix[self._rows[city], class_ids[crop]] = boost
+        return matrix
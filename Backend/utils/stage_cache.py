@@ -0,0 +1,221 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from typing import Callable, NamedTuple
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+STAGE_CACHE_VERSION = 1  # bump when the cache layout or key scheme changes
+LIBRARY_VERSIONS = {
+    "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__, "joblib": joblib.__version__,
+}
+
+
+class Stage(NamedTuple):
+    """
+    One named step of a cached pipeline
+
+    `fn(inputs, params)` returns a dict of outputs; `inputs` gives the
+    outputs of the upstream stages named in `inputs` by stage name. Every
+    field that can change the outputs is part of the cache key: the
+    source of `fn` and of the `code` modules, the JSON-serializable
+    `params`, and the content of the data `files` the stage reads.
+    `cacheable(outputs)`, if given, returning False keeps this run's outputs
+    from being reused (e.g. a partial result the next run should resume).
+    """
+    name: str
+    fn: Callable
+    inputs: tuple = ()
+    params: dict = None
+    files: tuple = ()
+    code: tuple = ()
+    cacheable: Callable = None
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_digest(stage: Stage) -> str:
+    """Hash of the source of the stage function and the modules it depends on"""
+    digest = hashlib.sha256(inspect.getsource(stage.fn).encode())
+    for module in stage.code:
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Content-addressed store of stage outputs
+
+    Outputs are joblib files named by the hash of their bytes
+    (objects/<digest>.joblib). A small index file per stage run maps the
+    stage's key to that digest (<stage>/<key>.json). Downstream keys use
+    the upstream output digests, so a code change that leaves a stage's
+    output byte-identical does not invalidate the stages after it.
+    Writes are atomic; delete the directory to clear the cache, or prune()
+    it to the newest runs of each stage.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def key(self, stage: Stage, upstream_digests: dict) -> str:
+        payload = json.dumps({
+            "version": STAGE_CACHE_VERSION,
+            "libraries": LIBRARY_VERSIONS,
+            "stage": stage.name,
+            "code": code_digest(stage),
+            "params": stage.params or {},
+            "files": {path: file_digest(path) for path in stage.files},
+            "inputs": upstream_digests,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.joblib")
+
+    def lookup(self, stage_name: str, key: str):
+        """Digest of the cached outputs for this stage key, or None (also if the object is gone)"""
+        try:
+            with open(os.path.join(self.directory, stage_name, f"{key}.json")) as f:
+                digest = json.load(f)["output"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return digest if os.path.exists(self._object_path(digest)) else None
+
+    def load(self, digest: str) -> dict:
+        return joblib.load(self._object_path(digest))
+
+    def store(self, stage_name: str, key: str, outputs: dict, index: bool = True) -> str:
+        """
+        Persist outputs and index them under the stage key; returns their digest
+
+        Without `index` the outputs are stored (so downstream stages can load
+        them and key on their digest) but a lookup of the key still misses.
+        """
+        tmp_path = os.path.join(self.objects_dir, f".tmp{os.getpid()}.joblib")
+        joblib.dump(outputs, tmp_path)
+        digest = file_digest(tmp_path)
+        os.replace(tmp_path, self._object_path(digest))
+        if not index:
+            return digest
+
+        index_dir = os.path.join(self.directory, stage_name)
+        os.makedirs(index_dir, exist_ok=True)
+        index_path = os.path.join(index_dir, f"{key}.json")
+        with open(f"{index_path}.tmp{os.getpid()}", "w") as f:
+            json.dump({"output": digest, "created": time.strftime("%Y-%m-%dT%H:%M:%S")}, f)
+        os.replace(f"{index_path}.tmp{os.getpid()}", index_path)
+        return digest
+
+
+    def prune(self, keep: int, protect=()) -> int:
+        """
+        Keep the `keep` newest index entries of each stage and delete unreferenced objects
+
+        Objects named in `protect` (e.g. the digests of the run just finished,
+        including outputs stored without an index entry) are never deleted.
+        Returns the number of objects deleted.
+        """
+        referenced = set(protect)
+        for stage_name in os.listdir(self.directory):
+            index_dir = os.path.join(self.directory, stage_name)
+            if stage_name == "objects" or not os.path.isdir(index_dir):
+                continue
+            index_paths = sorted(
+                (os.path.join(index_dir, name) for name in os.listdir(index_dir) if name.endswith(".json")),
+                key=os.path.getmtime, reverse=True
+            )
+            for position, index_path in enumerate(index_paths):
+                if position >= max(1, keep):
+                    os.remove(index_path)
+                    continue
+                try:
+                    with open(index_path) as f:
+                        referenced.add(json.load(f)["output"])
+                except (OSError, ValueError, KeyError):
+                    pass
+
+        removed = 0
+        for name in os.listdir(self.objects_dir):
+            digest, extension = os.path.splitext(name)
+            if extension == ".joblib" and not digest.startswith(".") and digest not in referenced:
+                os.remove(os.path.join(self.objects_dir, name))
+                removed += 1
+        return removed
+
+
+class PipelineRun:
+    """Stage outputs of one run by stage name; cached outputs are loaded from disk on first access"""
+
+    def __init__(self, cache: StageCache):
+        self.cache = cache
+        self.digests = {}
+        self.status = {}  # stage name → "computed" or "cached"
+        self.timings = {}
+        self._outputs = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.digests
+
+    def __getitem__(self, name: str) -> dict:
+        if name not in self._outputs:
+            self._outputs[name] = self.cache.load(self.digests[name])
+        return self._outputs[name]
+
+
+def stages_needed(stages: list, targets) -> set:
+    """The target stages and every stage upstream of them"""
+    by_name = {stage.name: stage for stage in stages}
+    needed, pending = set(), list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(by_name[name].inputs)
+    return needed
+
+
+def run_pipeline(stages: list, cache: StageCache, targets=None, force=(), log=print) -> PipelineRun:
+    """
+    Run stages in order, reusing cached outputs whose key is unchanged
+
+    `targets` limits the run to those stages and what they depend on
+    (default: every stage); `force` lists stages to recompute even when
+    cached. Upstream stages a target needs come from the cache when they
+    can, so only invalidated stages are recomputed.
+    """
+    needed = stages_needed(stages, targets or [stage.name for stage in stages])
+    run = PipelineRun(cache)
+    for stage in stages:
+        if stage.name not in needed:
+            continue
+        key = cache.key(stage, {name: run.digests[name] for name in stage.inputs})
+        digest = None if stage.name in force else cache.lookup(stage.name, key)
+        if digest is not None:
+            run.digests[stage.name] = digest
+            run.status[stage.name] = "cached"
+            log(f"♻️ Stage '{stage.name}': cached ({digest[:12]})")
+            continue
+
+        start = time.perf_counter()
+        outputs = stage.fn({name: run[name] for name in stage.inputs}, stage.params or {})
+        run.timings[stage.name] = time.perf_counter() - start
+        reusable = stage.cacheable is None or stage.cacheable(outputs)
+        run.digests[stage.name] = cache.store(stage.name, key, outputs, index=reusable)
+        run._outputs[stage.name] = outputs
+        run.status[stage.name] = "computed"
+        log(f"   ⏱️ Stage '{stage.name}' took {run.timings[stage.name]:.2f}s"
+            + ("" if reusable else " (not cached; the next run recomputes it)"))
+    return run
@@ -0,0 +1,25 @@
+import time
+
+
+class StartupTimer:
+    """
+    Records when each startup phase finished, in seconds since the timer was created
+
+    Create it as early as possible (it is imported first by main.py), then
+    `mark()` each phase as it completes.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def mark(self, phase: str) -> float:
+        elapsed = round(time.perf_counter() - self.started, 3)
+        self.phases[phase] = elapsed
+        return elapsed
+
+    def stats(self) -> dict:
+        return dict(self.phases)
+
+
+startup_timer = StartupTimer()
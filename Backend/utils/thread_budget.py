@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ThreadBudget:
+    """
+    CPU thread budget for model inference in one serving process
+
+    The machine-wide budget (`global_threads`, normally the core count) is
+    split evenly across the `processes` that serve traffic (uvicorn workers,
+    or inference worker processes), so N workers never start N × cores
+    threads between them. Each inference call leases threads from this
+    process's share:
+    - batches smaller than `parallel_min_rows` always run on one thread (the
+      caller's), since splitting them costs more than it saves
+    - larger batches get up to `max_threads_per_call` threads, limited by
+      what concurrent calls have not already leased (never less than one)
+
+    The estimator's own `n_jobs` is ignored. The lease size is used as the
+    number of row chunks for the flat forest (run on `pool`), or as the joblib
+    `n_jobs` for an sklearn model. Native BLAS/OpenMP pools are pinned to one
+    thread by `limit_native_threads()` so they do not multiply the budget.
+    """
+
+    def __init__(self, global_threads: int, processes: int = 1, max_threads_per_call: int = 0,
+                 parallel_min_rows: int = 512):
+        self.process_threads = max(1, global_threads // max(1, processes))
+        self.max_threads_per_call = min(max_threads_per_call or self.process_threads, self.process_threads)
+        self.parallel_min_rows = max(1, parallel_min_rows)
+
+        self._lock = threading.Lock()
+        self._leased = 0
+        self._pool = None
+        self._native_limits = None
+
+        # Counters for monitoring
+        self.calls = 0
+        self.parallel_calls = 0
+        self.throttled_calls = 0  # wanted more threads than were free
+        self.peak_leased = 0
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """Shared worker threads for row-chunk parallelism (created on first parallel call)"""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.process_threads, thread_name_prefix="inference-chunk"
+                    )
+        return self._pool
+
+    def threads_for(self, n_rows: int) -> int:
+        """Threads a batch of `n_rows` asks for when nothing else is running"""
+        return 1 if n_rows < self.parallel_min_rows else self.max_threads_per_call
+
+    @contextmanager
+    def lease(self, n_rows: int):
+        """Reserve threads for one inference call; yields how many it may use"""
+        wanted = self.threads_for(n_rows)
+        with self._lock:
+            granted = max(1, min(wanted, self.process_threads - self._leased))
+            self._leased += granted
+            self.calls += 1
+            self.parallel_calls += granted > 1
+            self.throttled_calls += granted < wanted
+            self.peak_leased = max(self.peak_leased, self._leased)
+        try:
+            yield granted
+        finally:
+            with self._lock:
+                self._leased -= granted
+
+    def limit_native_threads(self):
+        """Pin BLAS/OpenMP pools to one thread (call after the model libraries are imported)"""
+        from threadpoolctl import threadpool_limits
+        self._native_limits = threadpool_limits(limits=1)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "process_threads": self.process_threads,
+            "max_threads_per_call": self.max_threads_per_call,
+            "parallel_min_rows": self.parallel_min_rows,
+            "leased": self._leased,
+            "peak_leased": self.peak_leased,
+            "calls": self.calls,
+            "parallel_calls": self.parallel_calls,
+            "throttled_calls": self.throttled_calls,
+        }
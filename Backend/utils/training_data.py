@@ -0,0 +1,144 @@
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+from utils.features import engineer_features
+from utils.regions import ANNUAL_SEASON, RegionRegistry
+
+# Dataset columns by kind (categoricals are loaded as pandas categoricals)
+NUMERICAL_COLUMNS = ['avgTemp', 'Rainfall', 'pH', 'Cloud Cover', 'Precipitation',
+                     'Production', 'Area', 'AVG_Price', 'vapPressure', 'Wet Day Freq']
+CATEGORICAL_COLUMNS = ['State', 'City', 'Season', 'Soil Type', 'Water_Availability']
+TARGET_COLUMN = 'Crop'
+
+
+@contextmanager
+def timed_stage(timings: dict, name: str):
+    """Add the wall time of the block (seconds) to timings[name]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def format_timings(timings: dict) -> str:
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+
+
+def load_dataset(path: str) -> pd.DataFrame:
+    """Read the training CSV with categorical dtypes for the string columns"""
+    dtypes = {col: 'category' for col in CATEGORICAL_COLUMNS + [TARGET_COLUMN]}
+    return pd.read_csv(path, dtype=dtypes)
+
+
+def clean_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop rows without a crop and fill gaps (numerical: median, categorical: most frequent value)"""
+    df = df.dropna(subset=[TARGET_COLUMN]).copy()
+    # Only columns with gaps are rewritten (each fill copies the column)
+    for col in NUMERICAL_COLUMNS:
+        if col in df.columns and df[col].hasnans:
+            df[col] = df[col].fillna(df[col].median())
+    for col in CATEGORICAL_COLUMNS + [TARGET_COLUMN]:
+        if col in df.columns and df[col].hasnans:
+            df[col] = df[col].fillna(df[col].mode()[0])
+    return df
+
+
+def dataset_feature_inputs(df: pd.DataFrame) -> dict:
+    """engineer_features arguments for every row (categoricals stay coded, so lookups run per category)"""
+    return {
+        'city': df['City'].array,
+        'season': df['Season'].array,
+        'soil_type': df['Soil Type'].array,
+        'water_availability': df['Water_Availability'].array,
+        'avg_temp': df['avgTemp'].to_numpy(dtype=np.float64),
+        'rainfall': df['Rainfall'].to_numpy(dtype=np.float64),
+        'ph': df['pH'].to_numpy(dtype=np.float64),
+    }
+
+
+def engineer_dataset(regions: RegionRegistry, inputs: dict, chunk_rows: int = None, executor=None) -> dict:
+    """
+    engineer_features over the whole dataset, optionally in chunks
+
+    With `chunk_rows`, rows are processed in slices of that size, which
+    bounds the temporary arrays; with an `executor` as well, the slices run
+    on it concurrently (the work is NumPy, which releases the GIL). Results
+    are identical either way.
+    """
+    n_rows = len(inputs['city'])
+    if not chunk_rows or chunk_rows >= n_rows:
+        return engineer_features(regions, **inputs)
+
+    def run(start):
+        return engineer_features(regions, **{name: values[start:start + chunk_rows] for name, values in inputs.items()})
+
+    starts = range(0, n_rows, chunk_rows)
+    parts = list(executor.map(run, starts)) if executor is not None else [run(start) for start in starts]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def encode_categoricals(df: pd.DataFrame, columns: list) -> dict:
+    """
+    Add `<col>_encoded` columns and return {col: fitted LabelEncoder}
+
+    Codes come straight from the categorical dtype; categories are sorted
+    first so they equal LabelEncoder's (sorted) class ids, and each encoder
+    is fitted on the categories alone rather than on every row.
+    """
+    label_encoders = {}
+    for col in columns:
+        values = df[col].cat.remove_unused_categories()
+        values = values.cat.reorder_categories(sorted(values.cat.categories))
+        encoder = LabelEncoder().fit(np.asarray(values.cat.categories, dtype=object))
+        df[col + '_encoded'] = values.cat.codes.astype(np.int64)
+        label_encoders[col] = encoder
+    return label_encoders
+
+
+def is_season_appropriate(crop: str, season: str, calendar: dict) -> bool:
+    """True if the crop is grown in the season; any calendar crop qualifies for the whole year"""
+    if season == ANNUAL_SEASON:
+        return any(crop in crops for crops in calendar.values())
+    return crop in calendar.get(season, [])
+
+
+def season_filter_mask(crops, seasons, calendar: dict) -> np.ndarray:
+    """
+    Rows whose crop belongs to their season in the calendar
+
+    A lookup join: the rule is evaluated once per distinct (season, crop)
+    pair into a small boolean table, which is then indexed by every row's
+    codes.
+    """
+    crop_codes, crop_values = pd.factorize(crops)
+    season_codes, season_values = pd.factorize(seasons)
+    table = np.array([[is_season_appropriate(crop, season, calendar) for crop in crop_values]
+                      for season in season_values], dtype=bool).reshape(len(season_values), len(crop_values))
+    return table[season_codes, crop_codes]
+
+
+def balance_crops(df: pd.DataFrame, min_samples: int, max_samples: int, random_state: int = 42) -> tuple:
+    """
+    Keep crops with at least `min_samples` rows and cap each at `max_samples`
+
+    Returns (balanced frame, major crops in descending frequency, counts of
+    every crop). Rows are grouped by crop, most frequent crop first, and a
+    crop over the cap is down-sampled with `random_state`.
+    """
+    crop_counts = df[TARGET_COLUMN].value_counts()
+    crop_counts = crop_counts[crop_counts > 0]
+    major_crops = crop_counts[crop_counts >= min_samples].index.tolist()
+
+    groups = df.groupby(TARGET_COLUMN, observed=True, sort=False).indices
+    parts = []
+    for crop in major_crops:
+        crop_data = df.iloc[groups[crop]]
+        if len(crop_data) > max_samples:
+            crop_data = crop_data.sample(n=max_samples, random_state=random_state)
+        parts.append(crop_data)
+    balanced = pd.concat(parts, ignore_index=True)
+    balanced[TARGET_COLUMN] = balanced[TARGET_COLUMN].cat.remove_unused_categories()
+    return balanced, major_crops, crop_counts
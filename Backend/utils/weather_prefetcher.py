@@ -0,0 +1,116 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+
+
+class WeatherPrefetcher:
+    """
+    Background task that keeps the weather store warm for all known locations
+
+    Every `interval_seconds` (plus random jitter) it refreshes each location
+    returned by `locations_fn()` and publishes the observations into `store`.
+    Locations accepted by `can_group_fn` are fetched `group_size` at a time with
+    `fetch_group_fn(locations) -> {location: observation}`; the rest are fetched
+    one by one with `fetch_one_fn(*location)`. Upstream calls are spaced by
+    `request_gap_seconds` plus jitter to stay inside the provider's rate limit.
+    """
+
+    def __init__(self, store, locations_fn, fetch_one_fn, fetch_group_fn, can_group_fn,
+                 interval_seconds: float = 900, group_size: int = 20,
+                 request_gap_seconds: float = 1.0, jitter_seconds: float = 5.0):
+        self.store = store
+        self.locations_fn = locations_fn
+        self.fetch_one_fn = fetch_one_fn
+        self.fetch_group_fn = fetch_group_fn
+        self.can_group_fn = can_group_fn
+        self.interval_seconds = interval_seconds
+        self.group_size = max(1, group_size)
+        self.request_gap_seconds = max(0.0, request_gap_seconds)
+        self.jitter_seconds = max(0.0, jitter_seconds)
+
+        self._task = None
+        self.last_success = {}  # location -> datetime of the last successful refresh
+
+        # Counters for monitoring
+        self.cycles = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_cycle_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        # Spread the first cycle so several workers do not hit the API together
+        await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+        while True:
+            try:
+                await self.refresh_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Weather prefetch cycle failed: {e}")
+            await asyncio.sleep(self.interval_seconds + random.uniform(0, self.jitter_seconds))
+
+    def _plan_requests(self, locations: list) -> list:
+        grouped = [location for location in locations if self.can_group_fn(location)]
+        singles = [location for location in locations if not self.can_group_fn(location)]
+        plan = [grouped[i:i + self.group_size] for i in range(0, len(grouped), self.group_size)]
+        plan.extend([location] for location in singles)
+        return plan
+
+    async def refresh_all(self):
+        """Refresh every known location once"""
+        plan = self._plan_requests(list(self.locations_fn()))
+
+        for i, chunk in enumerate(plan):
+            if i:
+                await asyncio.sleep(self.request_gap_seconds + random.uniform(0, self.jitter_seconds / 10))
+
+            self.requests += 1
+            if self.can_group_fn(chunk[0]):
+                observations = await self.fetch_group_fn(chunk)
+            else:
+                observation = await self.fetch_one_fn(*chunk[0])
+                observations = {chunk[0]: observation} if observation is not None else {}
+
+            now = datetime.now(timezone.utc)
+            for location in chunk:
+                observation = observations.get(location)
+                if observation is None:
+                    self.failures += 1
+                    continue
+                self.store.set(location, observation)
+                self.last_success[location] = now
+
+        self.cycles += 1
+        self.last_cycle_at = datetime.now(timezone.utc)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "cycles": self.cycles,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_cycle_at": self.last_cycle_at.isoformat() if self.last_cycle_at else None,
+            "last_success": {
+                ", ".join(location): timestamp.isoformat()
+                for location, timestamp in sorted(self.last_success.items())
+            },
+        }
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class WeatherStore:
+    """
+    In-process weather observation cache with stale-while-revalidate
+
+    `fetch_fn(*key)` is an async callable returning an observation, or None
+    when the upstream service is unavailable.
+    - Fresh entries (younger than `ttl_seconds`) are served directly.
+    - Stale entries (up to `max_stale_seconds` past the TTL) are served
+      immediately while one background refresh runs.
+    - Misses wait for the upstream call; concurrent lookups of the same key
+      share a single in-flight call (single-flight).
+    Failed lookups are remembered for `failure_ttl_seconds` so an outage does
+    not turn every request into an upstream call. Both the entries and the
+    failure times hold at most `max_size` keys (least recently used first out).
+    """
+
+    def __init__(self, fetch_fn, ttl_seconds: float = 900, max_stale_seconds: float = 21600,
+                 failure_ttl_seconds: float = 60, max_size: int = 1024):
+        self.fetch_fn = fetch_fn
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.max_size = max(1, max_size)
+
+        self._entries = OrderedDict()  # key -> (observation, fetched_at)
+        self._failed_at = OrderedDict()  # key -> time of the last failed upstream call
+        self._inflight = {}  # key -> asyncio.Task of the running upstream call
+
+        # Counters for monitoring
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key):
+        """Observation for key, or None if upstream is unavailable and nothing usable is cached"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            observation, fetched_at = entry
+            age = now - fetched_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return observation
+            if age < self.ttl_seconds + self.max_stale_seconds:
+                self.stale_hits += 1
+                if not self._recently_failed(key, now):
+                    self._refresh(key)  # revalidate in the background
+                return observation
+        elif self._recently_failed(key, now):
+            self.misses += 1
+            return None
+
+        self.misses += 1
+        # Shield the shared call so one cancelled request does not cancel it for everyone
+        return await asyncio.shield(self._refresh(key))
+
+    def peek(self, key):
+        """Cached observation for key (fresh or stale) without ever calling upstream"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            observation, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return observation
+            if age < self.ttl_seconds + self.max_stale_seconds:
+                self.stale_hits += 1
+                return observation
+        self.misses += 1
+        return None
+
+    def last_known(self, key):
+        """Most recent observation for key regardless of age (last resort before other fallbacks)"""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, observation):
+        """Store a fresh observation (also used to publish prefetched data)"""
+        self._entries[key] = (observation, time.monotonic())
+        self._entries.move_to_end(key)
+        self._failed_at.pop(key, None)
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._failed_at.pop(evicted, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._failed_at.clear()
+
+    def _recently_failed(self, key, now: float) -> bool:
+        failed_at = self._failed_at.get(key)
+        return failed_at is not None and now - failed_at < self.failure_ttl_seconds
+
+    def _refresh(self, key) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        task = asyncio.get_running_loop().create_task(self._load(key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        return task
+
+    async def _load(self, key):
+        self.refreshes += 1
+        try:
+            observation = await self.fetch_fn(*key)
+        except Exception as e:
+            print(f"Weather refresh failed for {key}: {e}")
+            observation = None
+
+        if observation is None:
+            self.failures += 1
+            self._failed_at[key] = time.monotonic()
+            self._failed_at.move_to_end(key)
+            while len(self._failed_at) > self.max_size:
+                self._failed_at.popitem(last=False)
+            return None
+
+        self.set(key, observation)
+        return observation
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "max_stale_seconds": self.max_stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
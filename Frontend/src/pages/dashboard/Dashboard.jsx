@@ -99,17 +99,19 @@ const Dashboard = () => {
         area: parseFloat(formData.area)
       };
 
-      const response = await axiosInstance.post(API_PATHS.PREDICTION.PREDICT_CROPS, payload);
-      setRecommendations(response.data);
+      // One round trip: recommendations plus the weather the prediction actually used
+      const response = await axiosInstance.post(API_PATHS.PREDICTION.PREDICT_CROPS_WITH_WEATHER, payload);
+      const { recommendations: predictedCrops, weather: usedWeather } = response.data;
+      setRecommendations(predictedCrops);
       
       // Save prediction data for display
       setLastPredictionData({
         formData,
-        weatherData
+        weatherData: usedWeather
       });
       
       // Save to localStorage with weather data
-      savePrediction(formData, response.data, weatherData);
+      savePrediction(formData, predictedCrops, usedWeather);
       
       // Clear form inputs and weather data
       setFormData({
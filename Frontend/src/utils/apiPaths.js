@@ -4,6 +4,7 @@ export const API_PATHS = {
   PREDICTION: {
     GET_OPTIONS: "/api/options",
     PREDICT_CROPS: "/api/predict",
+    PREDICT_CROPS_WITH_WEATHER: "/api/predict?include=weather",
     GET_WEATHER: (state, city) => `/api/weather/${state}/${city}`,
   },
   AUTH: {